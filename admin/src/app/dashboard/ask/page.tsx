@@ -4,8 +4,9 @@
  * Route: /dashboard/ask
  *
  * Ask a question, get ranked source cards pulled from your workspace via
- * the backend's full-text search (websearch_to_tsquery + ts_rank on
- * Postgres). This is deliberately retrieval-only: when LLM synthesis
+ * the backend's streaming /notes/ask endpoint: full-text hits
+ * (websearch_to_tsquery + ts_rank_cd on Postgres) arrive first, then fuzzy
+ * and related-by-tag expansions. This is deliberately retrieval-only: when LLM synthesis
  * lands, the generated answer will sit above these same source cards and
  * cite them — no citation, no answer.
  */
@@ -26,9 +27,9 @@ import { Reveal } from "@/components/motion";
 import { Alert, AlertDescription } from "@/components/ui/alert";
 import { Chip } from "@/components/ui/chip";
 import { formatDate } from "@/lib/format";
-import { searchNotes } from "@/lib/note-api";
+import { askNotes } from "@/lib/note-api";
 import { previewText } from "@/lib/notes";
-import type { Note } from "@/types/notes";
+import type { AskSource } from "@/types/notes";
 
 const RECENT_QUESTIONS_KEY = "devnotes-ask-recent";
 const MAX_RECENT_QUESTIONS = 6;
@@ -117,7 +118,7 @@ export default function AskWorkspacePage() {
   const [question, setQuestion] = useState("");
   const [askedQuestion, setAskedQuestion] = useState("");
   const [noteType, setNoteType] = useState("");
-  const [sources, setSources] = useState<Note[]>([]);
+  const [sources, setSources] = useState<AskSource[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [recentQuestions, setRecentQuestions] = useState<string[]>([]);
@@ -162,16 +163,20 @@ export default function AskWorkspacePage() {
       setAskedQuestion(trimmed);
       setLoading(true);
       setError("");
+      setSources([]);
       rememberQuestion(trimmed);
 
       try {
-        const page = await searchNotes(trimmed, controller.signal, {
+        await askNotes(trimmed, {
           noteType: type || undefined,
           limit: SOURCE_LIMIT,
+          signal: controller.signal,
+          onSource: (source) => {
+            if (!controller.signal.aborted) {
+              setSources((previous) => [...previous, source]);
+            }
+          },
         });
-        if (!controller.signal.aborted) {
-          setSources(page.items);
-        }
       } catch (askError: unknown) {
         if (
           !(askError instanceof DOMException && askError.name === "AbortError")
@@ -305,7 +310,7 @@ export default function AskWorkspacePage() {
               </span>
             </div>
 
-            {loading ? (
+            {loading && sources.length === 0 ? (
               <div className="flex items-center gap-3 p-6 text-sm text-[var(--text-secondary)]">
                 <Loader2
                   size={15}
@@ -348,6 +353,11 @@ export default function AskWorkspacePage() {
                         >
                           {source.title}
                         </Link>
+                        {source.stage !== "lexical" && (
+                          <span className="dev-chip px-2 py-0.5 text-[0.62rem] uppercase tracking-[0.12em] text-[var(--text-secondary)]">
+                            {source.stage}
+                          </span>
+                        )}
                         <span className="dev-chip px-2 py-0.5 text-[0.62rem] uppercase tracking-[0.12em] text-[var(--text-secondary)]">
                           {source.note_type ?? "note"}
                         </span>
@@ -16,8 +16,12 @@ import { CopyProfileLinkButton } from "@/components/CopyProfileLinkButton";
 import { backendFetch } from "@/lib/backend";
 import { formatDate, formatNoteDate } from "@/lib/format";
 import { previewText } from "@/lib/notes";
-import { noteKindLabel, readingTimeMinutes } from "@/lib/reading";
-import type { AuthorProfile, Note } from "@/types/notes";
+import { noteKindLabel, readingTimeFromLength } from "@/lib/reading";
+import type {
+  AuthorProfile,
+  PaginatedProfileNotesResponse,
+  ProfileNote,
+} from "@/types/notes";
 
 async function getAuthorProfile(
   username: string,
@@ -34,11 +38,27 @@ async function getAuthorProfile(
   }
 }
 
+async function getProfileNotesPage(
+  username: string,
+  cursor: string,
+): Promise<PaginatedProfileNotesResponse | null> {
+  try {
+    const res = await backendFetch(
+      `/u/${encodeURIComponent(username)}/notes?cursor=${encodeURIComponent(cursor)}`,
+      { method: "GET", cache: "no-store" },
+    );
+    if (!res.ok) return null;
+    return await res.json();
+  } catch {
+    return null;
+  }
+}
+
 function formatJoined(date: string) {
   return formatDate(date, "monthYear");
 }
 
-function getTopTags(notes: Note[]) {
+function getTopTags(notes: ProfileNote[]) {
   const counts = new Map<string, number>();
   for (const note of notes) {
     for (const tag of note.tags) {
@@ -50,7 +70,7 @@ function getTopTags(notes: Note[]) {
     .slice(0, 8);
 }
 
-function notesForTag(notes: Note[], tag: string) {
+function notesForTag(notes: ProfileNote[], tag: string) {
   return notes.filter((note) => note.tags.includes(tag)).slice(0, 2);
 }
 
@@ -75,25 +95,26 @@ export async function generateMetadata({
 
 export default async function AuthorProfilePage({
   params,
+  searchParams,
 }: {
   params: Promise<{ username: string }>;
+  searchParams: Promise<{ cursor?: string }>;
 }) {
   const { username } = await params;
+  const { cursor } = await searchParams;
   const profile = await getAuthorProfile(username);
 
   if (!profile) notFound();
 
-  const publicNotes = profile.public_notes.filter((note) => note.share_uuid);
+  // The profile carries the first page; older pages come from /u/{username}/notes.
+  const page = cursor ? await getProfileNotesPage(username, cursor) : null;
+  const notes = page ? page.data : profile.public_notes;
+  const nextCursor = page ? page.next_cursor : profile.next_cursor;
+  const publicNotes = notes.filter((note) => note.share_uuid);
   const topTags = getTopTags(publicNotes);
-  const totalLikes = publicNotes.reduce(
-    (sum, note) => sum + (note.like_count ?? 0),
-    0,
-  );
-  const totalViews = publicNotes.reduce(
-    (sum, note) => sum + (note.view_count ?? 0),
-    0,
-  );
-  const featuredNote = publicNotes[0];
+  const totalLikes = profile.like_count;
+  const totalViews = profile.view_count;
+  const featuredNote = cursor ? undefined : publicNotes[0];
 
   return (
     <div className="min-h-screen overflow-hidden bg-[var(--bg)] text-[var(--text-primary)]">
@@ -183,7 +204,7 @@ export default async function AuthorProfilePage({
                   {formatJoined(profile.created_at)}
                 </span>
                 <span className="inline-flex items-center gap-2 rounded-none border border-[var(--border)] bg-[var(--bg)]/60 px-3 py-1.5">
-                  <FileText size={13} /> {publicNotes.length} public notes
+                  <FileText size={13} /> {profile.note_count} public notes
                 </span>
               </div>
             </div>
@@ -191,7 +212,7 @@ export default async function AuthorProfilePage({
             <div className="grid grid-cols-3 gap-3 lg:grid-cols-1">
               <div className="rounded-none border border-[var(--border)] bg-[var(--bg)]/65 p-4">
                 <p className="text-2xl font-semibold tracking-[-0.04em]">
-                  {publicNotes.length}
+                  {profile.note_count}
                 </p>
                 <p className="mt-1 text-xs uppercase tracking-[0.16em] text-[var(--text-secondary)]">
                   notes
@@ -233,7 +254,9 @@ export default async function AuthorProfilePage({
                   {noteKindLabel(featuredNote.note_type)}
                 </span>
                 <span>·</span>
-                <span>{readingTimeMinutes(featuredNote.content)} min read</span>
+                <span>
+                  {readingTimeFromLength(featuredNote.content_length)} min read
+                </span>
                 {featuredNote.language && (
                   <>
                     <span>·</span>
@@ -249,7 +272,7 @@ export default async function AuthorProfilePage({
                 {featuredNote.title || "untitled"}
               </h2>
               <p className="mt-3 line-clamp-2 text-sm leading-6 text-[var(--text-secondary)]">
-                {previewText(featuredNote.content) || "empty note"}
+                {previewText(featuredNote.excerpt) || "empty note"}
               </p>
             </Link>
           </section>
@@ -342,20 +365,31 @@ export default async function AuthorProfilePage({
                 )}
 
                 <p className="mt-4 line-clamp-3 text-sm leading-6 text-[var(--text-secondary)]">
-                  {previewText(note.content) || "empty note"}
+                  {previewText(note.excerpt) || "empty note"}
                 </p>
 
                 <div className="mt-5 flex items-center justify-between text-xs text-[var(--text-secondary)]">
                   <span className="inline-flex items-center gap-1">
                     <Heart size={13} /> {note.like_count ?? 0}
                   </span>
-                  <span>{readingTimeMinutes(note.content)} min read</span>
+                  <span>{readingTimeFromLength(note.content_length)} min read</span>
                   <span className="text-[var(--accent)]">Read note →</span>
                 </div>
               </Link>
             ))}
           </section>
         )}
+
+        {nextCursor !== null && (
+          <div className="mt-8 flex justify-center">
+            <Link
+              href={`/u/${encodeURIComponent(profile.username)}?cursor=${nextCursor}`}
+              className="rounded-none border border-[var(--border)] bg-[var(--bg-secondary)]/60 px-4 py-2 text-sm text-[var(--text-secondary)] transition-colors hover:border-[var(--accent)]/50 hover:text-[var(--accent)]"
+            >
+              Older notes →
+            </Link>
+          </div>
+        )}
       </main>
     </div>
   );
@@ -296,6 +296,7 @@ export function NoteSearchPalette({
           noteType: parsed.noteType,
           tag: parsed.tag,
           language: parsed.language,
+          mode: "prefix",
         });
         setFullResults(results.items ?? []);
       } catch (err: unknown) {
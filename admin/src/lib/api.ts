@@ -153,8 +153,28 @@ class ApiClient {
   private async request<T>(
     endpoint: string,
     options: RequestInit = {},
-    allowRefresh = true,
   ): Promise<T> {
+    const response = await this.send(endpoint, options);
+
+    // Handle 204 No Content — returned by DELETE endpoints
+    // Calling response.json() on a 204 would crash (no body to parse)
+    if (response.status === 204) {
+      return undefined as T;
+    }
+
+    // Parse and return the JSON response body
+    return response.json();
+  }
+
+  /**
+   * Sends the request and returns the successful Response unread; throws
+   * ApiError otherwise, after one transparent token refresh on a 401.
+   */
+  private async send(
+    endpoint: string,
+    options: RequestInit,
+    allowRefresh = true,
+  ): Promise<Response> {
     // Auth rides the HttpOnly auth_token cookie; the /api proxy converts it
     // to an Authorization header before forwarding to FastAPI.
     const headers: HeadersInit = {
@@ -184,7 +204,7 @@ class ApiClient {
       ) {
         const refreshed = await refreshAccessToken();
         if (refreshed) {
-          return this.request<T>(endpoint, options, false);
+          return this.send(endpoint, options, false);
         }
         notifyAuthExpired();
       } else if (response.status === 401) {
@@ -193,14 +213,7 @@ class ApiClient {
       throw new ApiError(message, response.status, details);
     }
 
-    // Handle 204 No Content — returned by DELETE endpoints
-    // Calling response.json() on a 204 would crash (no body to parse)
-    if (response.status === 204) {
-      return undefined as T;
-    }
-
-    // Parse and return the JSON response body
-    return response.json();
+    return response;
   }
 
   /** GET request — for fetching data (notes list, single note, etc.) */
@@ -208,6 +221,19 @@ class ApiClient {
     return this.request<T>(endpoint, { ...options, method: "GET" });
   }
 
+  /**
+   * GET for Server-Sent Events endpoints (e.g. /notes/ask): same auth and
+   * error handling as get(), but returns the Response so the caller can
+   * read the body as it streams in.
+   */
+  async stream(endpoint: string, options: RequestInit = {}): Promise<Response> {
+    return this.send(endpoint, {
+      ...options,
+      method: "GET",
+      headers: { Accept: "text/event-stream", ...options.headers },
+    });
+  }
+
   /** POST request — for creating resources (login, register, create note) */
   async post<T>(endpoint: string, body: unknown): Promise<T> {
     return this.request<T>(endpoint, {
@@ -1,10 +1,12 @@
 import { api } from "@/lib/api";
 import type {
+  AskSource,
   CreateNoteInput,
   Note,
   NoteVersion,
   NoteVersionSummary,
   PaginatedNotesResponse,
+  SearchNotesResponse,
 } from "@/types/notes";
 
 function normalizePage(
@@ -113,6 +115,13 @@ export interface SearchNotesFilters {
   tag?: string;
   language?: string;
   limit?: number;
+  /**
+   * "prefix" matches partial words and near-miss titles as you type;
+   * "hybrid" adds embedding similarity (no highlight support).
+   */
+  mode?: "fulltext" | "prefix" | "hybrid";
+  /** Also return per-type/tag/language match counts (`facets`). */
+  facets?: boolean;
 }
 
 export async function searchNotes(
@@ -125,11 +134,16 @@ export async function searchNotes(
   if (filters.tag) params.set("tag", filters.tag);
   if (filters.language) params.set("language", filters.language);
   if (filters.limit) params.set("limit", String(filters.limit));
-  const response = await api.get<Note[] | PaginatedNotesResponse>(
+  if (filters.mode) params.set("mode", filters.mode);
+  if (filters.facets) params.set("facets", "true");
+  const response = await api.get<Note[] | SearchNotesResponse>(
     `/notes/search?${params.toString()}`,
     { signal },
   );
-  return normalizePage(response);
+  return {
+    ...normalizePage(response),
+    facets: Array.isArray(response) ? null : (response.facets ?? null),
+  };
 }
 
 export async function likeNote(noteId: number) {
@@ -146,3 +160,54 @@ export async function getNoteVersions(noteId: number) {
 export async function getNoteVersion(noteId: number, versionId: number) {
   return api.get<NoteVersion>(`/notes/${noteId}/versions/${versionId}`);
 }
+
+export interface AskNotesOptions {
+  noteType?: string;
+  limit?: number;
+  signal?: AbortSignal;
+  /** Called for every source card as soon as it arrives. */
+  onSource: (source: AskSource) => void;
+}
+
+/**
+ * Streams Ask Workspace sources from GET /notes/ask (Server-Sent Events):
+ * full-text hits first, then fuzzy and related expansions. Resolves with
+ * the total once the `done` event arrives.
+ */
+export async function askNotes(
+  question: string,
+  { noteType, limit, signal, onSource }: AskNotesOptions,
+): Promise<number> {
+  const params = new URLSearchParams({ q: question });
+  if (noteType) params.set("note_type", noteType);
+  if (limit) params.set("limit", String(limit));
+  const response = await api.stream(`/notes/ask?${params.toString()}`, {
+    signal,
+  });
+  if (!response.body) throw new Error("Ask stream has no body");
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (event === "source") onSource(JSON.parse(data) as AskSource);
+      if (event === "done") return (JSON.parse(data) as { count: number }).count;
+    }
+  }
+  throw new Error("Ask stream ended before it was done");
+}
@@ -8,6 +8,14 @@ export function readingTimeMinutes(content: string, wordsPerMinute = 220) {
   return Math.max(1, Math.ceil(countWords(content) / wordsPerMinute));
 }
 
+/** Estimate from a character count when only an excerpt is loaded. */
+export function readingTimeFromLength(
+  contentLength: number,
+  wordsPerMinute = 220,
+) {
+  return Math.max(1, Math.ceil(contentLength / 6 / wordsPerMinute));
+}
+
 export function noteKindLabel(noteType?: string | null) {
   if (!noteType) return "note";
   return noteType.replace(/_/g, " ");
@@ -19,6 +19,12 @@ export interface Note {
   liked_by_me?: boolean;
 }
 
+/** One `source` event of the /notes/ask stream. */
+export interface AskSource extends Note {
+  stage: "lexical" | "fuzzy" | "related";
+  score: number | null;
+}
+
 export interface CreateNoteInput {
   title: string;
   content: string;
@@ -34,6 +40,23 @@ export interface PaginatedNotesResponse {
   next_cursor: number | null;
 }
 
+export interface FacetCount {
+  value: string;
+  count: number;
+}
+
+/** Match counts over the whole result set, most matches first. */
+export interface SearchFacets {
+  note_type: FacetCount[];
+  tags: FacetCount[];
+  language: FacetCount[];
+}
+
+export interface SearchNotesResponse extends PaginatedNotesResponse {
+  /** Only present with `facets=true`. */
+  facets?: SearchFacets | null;
+}
+
 /** GET /notes/{id}/versions returns summaries only — no content/tags. */
 export interface NoteVersionSummary {
   id: number;
@@ -58,5 +81,21 @@ export interface AuthorProfile {
   twitter_url?: string | null;
   avatar_url?: string | null;
   created_at: string;
-  public_notes: Note[];
+  note_count: number;
+  like_count: number;
+  view_count: number;
+  public_notes: ProfileNote[];
+  next_cursor: number | null;
+}
+
+/** Profile list projection: an excerpt instead of the full note body. */
+export interface ProfileNote
+  extends Omit<Note, "content" | "author_name" | "author_username"> {
+  excerpt: string;
+  content_length: number;
+}
+
+export interface PaginatedProfileNotesResponse {
+  data: ProfileNote[];
+  next_cursor: number | null;
 }
@@ -12,7 +12,9 @@ from app.database import Base
 # Any new model must be imported here, or it won't be picked up.
 from app.models.user import User
 from app.models.note import Note
+from app.models.note_embedding import NoteEmbedding
 from app.models.note_like import NoteLike
+from app.models.note_related import NoteRelated
 from app.models.note_version import NoteVersion
 from app.models.user_session import UserSession
 
@@ -0,0 +1,48 @@
+"""Add note_related materialization
+
+Revision ID: a2c6e8f0b4d7
+Revises: f1a8d4c2b6e9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2c6e8f0b4d7"
+down_revision: Union[str, Sequence[str], None] = "f1a8d4c2b6e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: the first read of each note's related list computes it
+    # live and queues a background refresh that fills this table.
+    op.create_table(
+        "note_related",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("related_note_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["note_id"], ["notes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["related_note_id"], ["notes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("note_id", "related_note_id", name="uq_note_related_note_id_related_note_id"),
+    )
+    op.create_index(op.f("ix_note_related_id"), "note_related", ["id"], unique=False)
+    op.create_index("ix_note_related_note_id_rank", "note_related", ["note_id", "rank"], unique=False)
+    op.create_index(op.f("ix_note_related_related_note_id"), "note_related", ["related_note_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_note_related_related_note_id"), table_name="note_related")
+    op.drop_index("ix_note_related_note_id_rank", table_name="note_related")
+    op.drop_index(op.f("ix_note_related_id"), table_name="note_related")
+    op.drop_table("note_related")
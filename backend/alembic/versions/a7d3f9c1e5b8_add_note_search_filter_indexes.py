@@ -0,0 +1,38 @@
+"""Add btree indexes for structured search filters
+
+Revision ID: a7d3f9c1e5b8
+Revises: e6a2c8f4b1d3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3f9c1e5b8"
+down_revision: Union[str, Sequence[str], None] = "e6a2c8f4b1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serve the lang: and updated: clauses of /notes/search next to the
+    # owner filter. The expressions must match note_repo._search_base_query.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notes_user_language "
+            "ON notes (user_id, lower(language))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notes_user_edited "
+            "ON notes (user_id, coalesce(updated_at, created_at))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_user_edited", table_name="notes")
+    op.drop_index("ix_notes_user_language", table_name="notes")
@@ -0,0 +1,38 @@
+"""Add stored note excerpt
+
+Revision ID: b3d9f6a1c8e5
+Revises: a2c6e8f0b4d7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d9f6a1c8e5"
+down_revision: Union[str, Sequence[str], None] = "a2c6e8f0b4d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a STORED generated column rewrites the table once; afterwards
+    # Postgres keeps it in step with content on every write.
+    op.add_column(
+        "notes",
+        sa.Column(
+            "excerpt",
+            sa.Text(),
+            sa.Computed("left(content, 280)", persisted=True),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notes", "excerpt")
@@ -0,0 +1,39 @@
+"""Add note_related_refreshes
+
+Revision ID: b8e4a1c7d2f6
+Revises: a7d3f9c1e5b8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4a1c7d2f6"
+down_revision: Union[str, Sequence[str], None] = "a7d3f9c1e5b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "note_related_refreshes",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["note_id"], ["notes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("note_id"),
+    )
+    # Notes materialized before this table existed keep their stored lists.
+    op.execute(
+        "INSERT INTO note_related_refreshes (note_id, refreshed_at) "
+        "SELECT note_id, min(refreshed_at) FROM note_related GROUP BY note_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("note_related_refreshes")
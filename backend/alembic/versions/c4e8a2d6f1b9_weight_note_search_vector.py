@@ -0,0 +1,84 @@
+"""Weight note search vector by field
+
+Revision ID: c4e8a2d6f1b9
+Revises: b3d9f6a1c8e5
+Create Date: 2026-10-17 00:00:00.000000
+
+Locking: adding a STORED generated column rewrites the whole notes table
+under an ACCESS EXCLUSIVE lock, so every read and write of notes (not just
+search) blocks until the rewrite finishes — roughly the time of a full
+table copy. Run it in a maintenance window on large tables. The GIN index
+is then built CONCURRENTLY (no write lock), and the final swap is a short
+metadata-only transaction. The downgrade does the same rewrite.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e8a2d6f1b9"
+down_revision: Union[str, Sequence[str], None] = "b3d9f6a1c8e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# array_to_string is only STABLE, which generated columns reject; the
+# wrapper is safe to declare IMMUTABLE because text[] output never varies.
+TAGS_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION notes_tags_text(tags text[]) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT coalesce(array_to_string(tags, ' '), '') $$
+"""
+
+WEIGHTED_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', notes_tags_text(tags::text[])), 'B') || "
+    "setweight(to_tsvector('english', coalesce(language, '') || ' ' || coalesce(note_type, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'D')"
+)
+
+PLAIN_VECTOR = "to_tsvector('english', title || ' ' || content)"
+
+
+def _swap_search_vector(expression: str) -> None:
+    # Build the new column and its index next to the old ones, then swap
+    # names. The add_column is the table rewrite described above; after it
+    # commits, queries run normally (on the old column) while the index
+    # builds, and only the swap takes the lock again, briefly.
+    op.add_column(
+        "notes",
+        sa.Column(
+            "search_vector_next",
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notes_search_vector_next",
+            "notes",
+            ["search_vector_next"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_notes_search_vector", table_name="notes", postgresql_using="gin")
+    op.drop_column("notes", "search_vector")
+    op.alter_column("notes", "search_vector_next", new_column_name="search_vector")
+    op.execute("ALTER INDEX ix_notes_search_vector_next RENAME TO ix_notes_search_vector")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(TAGS_TEXT_FUNCTION)
+    _swap_search_vector(WEIGHTED_VECTOR)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _swap_search_vector(PLAIN_VECTOR)
+    op.execute("DROP FUNCTION IF EXISTS notes_tags_text(text[])")
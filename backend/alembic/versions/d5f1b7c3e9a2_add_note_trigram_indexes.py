@@ -0,0 +1,39 @@
+"""Add trigram indexes for prefix search
+
+Revision ID: d5f1b7c3e9a2
+Revises: c4e8a2d6f1b9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5f1b7c3e9a2"
+down_revision: Union[str, Sequence[str], None] = "c4e8a2d6f1b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serve `'query' <% title` / `<% notes_tags_text(tags)` for
+    # /notes/search?mode=prefix. Built CONCURRENTLY so writes keep flowing.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notes_title_trgm "
+            "ON notes USING gin (title gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notes_tags_trgm "
+            "ON notes USING gin (notes_tags_text(tags::text[]) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_tags_trgm", table_name="notes")
+    op.drop_index("ix_notes_title_trgm", table_name="notes")
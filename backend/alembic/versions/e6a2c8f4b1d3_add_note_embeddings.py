@@ -0,0 +1,58 @@
+"""Add note_embeddings for hybrid search
+
+Revision ID: e6a2c8f4b1d3
+Revises: d5f1b7c3e9a2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a2c8f4b1d3"
+down_revision: Union[str, Sequence[str], None] = "d5f1b7c3e9a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # No backfill here: scripts/backfill_embeddings.py queues existing notes
+    # for the background indexer, which embeds them in batches.
+    op.create_table(
+        "note_embeddings",
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(length=64), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["note_id"], ["notes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("note_id"),
+    )
+    # vector(256) has no SQLAlchemy type here; add it with plain DDL.
+    op.execute("ALTER TABLE note_embeddings ADD COLUMN embedding vector(256) NOT NULL")
+    op.create_index("ix_note_embeddings_user_id", "note_embeddings", ["user_id"], unique=False)
+    op.create_index(
+        "ix_note_embeddings_embedding_hnsw",
+        "note_embeddings",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_note_embeddings_embedding_hnsw", table_name="note_embeddings")
+    op.drop_index("ix_note_embeddings_user_id", table_name="note_embeddings")
+    op.drop_table("note_embeddings")
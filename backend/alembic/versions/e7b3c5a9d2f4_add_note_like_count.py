@@ -0,0 +1,60 @@
+"""Add denormalized like_count to notes
+
+Revision ID: e7b3c5a9d2f4
+Revises: d8e5f2a9b1c3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3c5a9d2f4"
+down_revision: Union[str, Sequence[str], None] = "d8e5f2a9b1c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes",
+        sa.Column("like_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Backfill from the source of truth; notes without likes keep the default 0.
+    op.execute(
+        """
+        UPDATE notes
+        SET like_count = counts.like_count
+        FROM (
+            SELECT note_id, COUNT(*) AS like_count
+            FROM note_likes
+            GROUP BY note_id
+        ) AS counts
+        WHERE notes.id = counts.note_id
+        """
+    )
+    op.create_index(
+        "ix_notes_community_feed",
+        "notes",
+        [sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_community AND is_published"),
+    )
+    op.create_index(
+        "ix_notes_user_published",
+        "notes",
+        ["user_id", sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_published"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_user_published", table_name="notes")
+    op.drop_index("ix_notes_community_feed", table_name="notes")
+    op.drop_column("notes", "like_count")
@@ -0,0 +1,33 @@
+"""Add GIN index on notes.tags
+
+Revision ID: f1a8d4c2b6e9
+Revises: e7b3c5a9d2f4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a8d4c2b6e9"
+down_revision: Union[str, Sequence[str], None] = "e7b3c5a9d2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_notes_tags",
+        "notes",
+        ["tags"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_tags", table_name="notes", postgresql_using="gin")
@@ -0,0 +1,109 @@
+"""
+In-process caches shared by the request path.
+
+Every uvicorn worker has its own copy — these are not a shared store.
+Entries expire after a short TTL, so a write handled by one worker is
+visible to the others within that window even without invalidation.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from app.config import get_settings
+
+
+class TTLCache:
+    """
+    Bounded LRU map whose entries expire `ttl` seconds after being set.
+
+    Thread-safe: sync routes run on Starlette's threadpool, so several
+    requests can read and write the same cache at once.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class UserGenerations:
+    """
+    Per-user generation numbers, for invalidating everything cached for a
+    user at once: entries record the owner's generation when they are
+    built and count only while it is still current, so bump() makes all of
+    them unreachable without finding them. The LRU evicts them later.
+    """
+
+    def __init__(self) -> None:
+        self._generations: dict[int, int] = {}
+        # Globally increasing, so a user's generation never repeats, even
+        # after clear().
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: int) -> int:
+        """Read before building an entry: a write that lands mid-build then
+        leaves the entry stale instead of caching it as current."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def bump(self, user_id: int) -> None:
+        with self._lock:
+            self._generations[user_id] = next(self._counter)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations.clear()
+
+
+_settings = get_settings()
+
+# user_id → Principal (see dependencies.py). Invalidated by user_repo
+# whenever the row it was built from changes.
+principal_cache = TTLCache(
+    maxsize=_settings.PRINCIPAL_CACHE_SIZE,
+    ttl=_settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -1,5 +1,6 @@
 from functools import lru_cache
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -29,10 +30,110 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 1800
 
+    # Async request path (psycopg3 AsyncEngine). Off by default so the same
+    # deployment can be A/B tested by flipping one env var and restarting.
+    DB_ASYNC_MODE: bool = False
+
     # Auth settings (add SECRET_KEY to your .env file)
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Also mirror the current refresh token hash into users.refresh_token,
+    # which predates user_sessions. Off, login/refresh/logout touch only the
+    # session row; turn it on only while rolling back to a pre-session build
+    # is still possible.
+    REFRESH_TOKEN_LEGACY_COLUMN: bool = False
+
+    # Password hashing process pool (per worker). MAX_PENDING is how many
+    # hashes may queue or run at once before auth requests get a 503;
+    # 0 workers hashes on a thread instead.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Password hash scheme and cost. New hashes use PASSWORD_HASH_SCHEME
+    # ("bcrypt" or "argon2", which is argon2id and needs argon2-cffi);
+    # stored hashes with another scheme or other parameters are rehashed on
+    # the user's next successful login. Pick costs with
+    # scripts/benchmark_password_hash.py. Argon2 memory cost is in KiB.
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 4
+
+    # Session reaper: deletes user_sessions rows that expired or were revoked
+    # more than RETENTION_DAYS ago, BATCH_SIZE rows per DELETE. Runs every
+    # INTERVAL seconds in each worker; 0 leaves it to scripts/reap_sessions.py.
+    SESSION_REAPER_INTERVAL_SECONDS: int = 3600
+    SESSION_REAPER_RETENTION_DAYS: int = 7
+    SESSION_REAPER_BATCH_SIZE: int = 1000
+
+    # Active-session cache for /auth/refresh and /auth/logout (per worker).
+    # Writes are guarded by the stored hash, so the TTL only bounds memory
+    # and may outlast an access token; it is sized so the next refresh hits.
+    # CHANNEL fans revocations out: "inprocess", "postgres" (LISTEN/NOTIFY)
+    # or "module:factory". 0 size disables the cache.
+    SESSION_CACHE_SIZE: int = 10000
+    SESSION_CACHE_TTL_SECONDS: int = 2700
+    SESSION_CACHE_CHANNEL: str = "inprocess"
+
+    # Authenticated-user cache (per worker). TTL bounds how long another
+    # worker can serve a stale profile after an update; 0 size disables it.
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Write-behind view counter: flush buffered views every N seconds,
+    # or as soon as this many views are pending, whichever comes first.
+    VIEW_FLUSH_INTERVAL_SECONDS: int = 10
+    VIEW_FLUSH_THRESHOLD: int = 500
+
+    # Materialized related notes (note_related): how many to store per note,
+    # how often the background refresher drains its queue, and how old a
+    # stored list may get before a read schedules a refresh anyway.
+    NOTE_RELATED_SIZE: int = 10
+    NOTE_RELATED_REFRESH_INTERVAL_SECONDS: int = 5
+    NOTE_RELATED_MAX_AGE_SECONDS: int = 3600
+
+    # Public note/profile response cache (per worker). Writes invalidate
+    # their own worker's entries only; the TTL bounds staleness on the
+    # others. That includes privacy: after a note is unpublished or deleted,
+    # or a profile changes, other workers can keep serving the cached public
+    # page for up to PUBLIC_CACHE_TTL_SECONDS. Lower it (0 disables the
+    # cache) if that window is too long.
+    PUBLIC_CACHE_SIZE: int = 5000
+    PUBLIC_CACHE_TTL_SECONDS: int = 30
+
+    # /notes/search?highlight=true: ts_headline fragment shape per hit.
+    # ts_headline rejects MinWords >= MaxWords, and MinWords is at least 1.
+    SEARCH_HEADLINE_MAX_FRAGMENTS: int = 2
+    SEARCH_HEADLINE_MAX_WORDS: int = Field(default=24, ge=2)
+
+    # /notes/search?facets=true: how many of the most common tags to count.
+    SEARCH_FACET_TAGS: int = 10
+
+    # Non-Postgres search fallback: per-user inverted indexes kept in memory
+    # (per worker). Size is how many users' indexes to keep; 0 disables them
+    # and falls back to scanning ILIKE candidates.
+    SEARCH_INDEX_SIZE: int = 256
+    SEARCH_INDEX_TTL_SECONDS: int = 300
+
+    # Ranked search pages cached per user (per worker): note ids only, rows
+    # are reloaded by primary key. Note writes invalidate their owner's
+    # entries; the TTL bounds staleness on other workers. 0 size disables it.
+    SEARCH_CACHE_SIZE: int = 2000
+    SEARCH_CACHE_TTL_SECONDS: int = 60
+
+    # Hybrid search (mode=hybrid): how many hits each of the lexical and
+    # vector rankers contributes, and the reciprocal-rank-fusion constant.
+    SEARCH_HYBRID_CANDIDATES: int = 100
+    SEARCH_RRF_K: int = 60
+
+    # Note embeddings. EMBEDDING_DIMENSIONS must match note_embeddings.embedding
+    # (vector(256)). Provider is a registered name or "module:factory".
+    EMBEDDING_PROVIDER: str = "hashing"
+    EMBEDDING_DIMENSIONS: int = 256
+    EMBEDDING_INDEX_INTERVAL_SECONDS: int = 5
+    EMBEDDING_BATCH_SIZE: int = 64
 
     @property
     def DATABASE_URL(self) -> str:
@@ -48,6 +149,16 @@ class Settings(BaseSettings):
             f"?sslmode={self.DB_SSL_MODE}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """
+        Same database, psycopg3 async driver.
+
+        psycopg3 understands libpq's sslmode query parameter,
+        so the URL only differs in the driver prefix.
+        """
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+
 @lru_cache()
 def get_settings() -> Settings:
     """
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import get_settings
 
@@ -74,6 +75,43 @@ SessionLocal = sessionmaker(
 )
 
 
+# ============================================
+# ASYNC ENGINE (optional) — DB_ASYNC_MODE=true
+# ============================================
+#
+# Sync routes run on Starlette's threadpool (40 threads by default), so a
+# burst of slow queries exhausts the threads long before Aurora is busy.
+# In async mode the read-heavy routes run on the event loop and wait on
+# psycopg3's async driver instead of parking a thread per request.
+#
+# Built alongside the sync engine, not instead of it: writes, Alembic and
+# scripts keep using `engine`. Same pool settings, so the A/B comparison
+# measures the request path and not a different pool size.
+#
+# expire_on_commit=False → async code cannot lazy-load expired attributes
+#                          after a commit (that would be hidden I/O), so
+#                          objects keep the values they had when committed.
+
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker | None = None
+
+if settings.DB_ASYNC_MODE:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=False,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
 # ============================================
 # BASE CLASS FOR MODELS
 # ============================================
@@ -1,8 +1,13 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
+from app import database
+from app.cache import principal_cache
 from app.database import SessionLocal
 from app.services.auth_service import verify_access_token
 from app.models.user import User
@@ -15,6 +20,45 @@ from app.repositories import user_repo
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Detached, read-only snapshot of the authenticated user.
+
+    Safe to share across requests (unlike an ORM User bound to one
+    session) and deliberately leaves out hashed_password/refresh_token,
+    so a cached copy never holds credentials.
+    """
+
+    id: int
+    name: str
+    email: str
+    username: str | None
+    bio: str | None
+    website_url: str | None
+    github_url: str | None
+    twitter_url: str | None
+    avatar_url: str | None
+    role: str
+    created_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            username=user.username,
+            bio=user.bio,
+            website_url=user.website_url,
+            github_url=user.github_url,
+            twitter_url=user.twitter_url,
+            avatar_url=user.avatar_url,
+            role=user.role,
+            created_at=user.created_at,
+        )
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Creates a database session for a single request.
@@ -37,6 +81,38 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async twin of get_db() for DB_ASYNC_MODE routes.
+
+    Same lifecycle: one AsyncSession per request, rolled back on error,
+    always closed. Services written against a sync Session run on it via
+    `await db.run_sync(service_fn, ...)` — the sync code executes inside
+    SQLAlchemy's greenlet bridge while the driver I/O is truly awaited,
+    so no threadpool thread is held for the request.
+    """
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database session requested but DB_ASYNC_MODE is off")
+    db = database.AsyncSessionLocal()
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+def _user_id_from_token(token: str) -> int:
+    # Verify the JWT signature and expiration, then extract the user ID
+    # from the "sub" (subject) claim
+    payload = verify_access_token(token)
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return int(user_id)
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
@@ -63,16 +139,10 @@ def get_current_user(
     oauth2_scheme → token → get_current_user → your route function
     """
     try:
-        # Verify the JWT signature and expiration
-        payload = verify_access_token(token)
-
-        # Extract user ID from the "sub" (subject) claim
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
+        user_id = _user_id_from_token(token)
 
         # Look up the user in the database
-        user = user_repo.get_by_id(db, user_id=int(user_id))
+        user = user_repo.get_by_id(db, user_id=user_id)
         if user is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -81,3 +151,54 @@ def get_current_user(
         raise
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid credentials") from e
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Like get_current_user(), but served from the in-process principal cache.
+
+    Use it for routes that only need the caller's id/profile fields and never
+    mutate the User row. On a cache hit the request makes zero DB round-trips
+    for auth (the lazily-connected session is never even checked out); on a
+    miss it does the same single lookup as get_current_user() and caches it.
+    Routes that modify the user (e.g. PATCH /auth/profile) must keep using
+    get_current_user(), which returns the live ORM object.
+    """
+    try:
+        user_id = _user_id_from_token(token)
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            user = user_repo.get_by_id(db, user_id=user_id)
+            if user is None:
+                raise HTTPException(status_code=401, detail="Invalid credentials")
+            principal = Principal.from_user(user)
+            principal_cache.set(user_id, principal)
+        return principal
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=401, detail="Invalid credentials") from e
+
+
+async def get_current_principal_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """Async twin of get_current_principal() — shares the same cache, same 401s."""
+    try:
+        user_id = _user_id_from_token(token)
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            user = await user_repo.get_by_id_async(db, user_id=user_id)
+            if user is None:
+                raise HTTPException(status_code=401, detail="Invalid credentials")
+            principal = Principal.from_user(user)
+            principal_cache.set(user_id, principal)
+        return principal
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=401, detail="Invalid credentials") from e
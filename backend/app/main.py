@@ -17,16 +17,24 @@ Architecture:
     main.py (CORS + routing) → routers/ (endpoints) → services/ (business logic)
     → repositories/ (database queries) → models/ (ORM) → PostgreSQL
 """
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 
+from app import database
 from app.database import engine
 from app.config import get_settings
 from app.rate_limit import configure_rate_limiting
+from app.services.embedding_indexer import embedding_indexer
+from app.services.password_hasher import password_hasher
+from app.services.related_notes import related_notes_refresher
+from app.services.session_reaper import session_reaper
+from app.services.view_counter import view_counter
+from app.session_cache import session_cache
 
 # ── Import routers ──
 from app.routers import auth
@@ -35,13 +43,36 @@ from app.routers import profiles
 from fastapi.middleware.cors import CORSMiddleware
 
 
+async def run_periodically(interval: float, job, name: str, wait=None) -> None:
+    """Runs a blocking background job every `interval` seconds.
+
+    Jobs do their own DB I/O, so they run on a worker thread to keep the
+    event loop free. A failed run is logged and retried on the next tick
+    (jobs re-queue their own work when they fail). `wait(interval)`, if
+    given, replaces the sleep so the job can be woken early.
+    """
+    while True:
+        if wait is None:
+            await asyncio.sleep(interval)
+        else:
+            await asyncio.to_thread(wait, interval)
+        try:
+            await asyncio.to_thread(job)
+        except Exception as e:
+            print(f"Background job {name} failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Runs on app startup and shutdown.
 
     Startup:  Test the Aurora connection — fail fast if DB is unreachable.
-    Shutdown: Clean up the connection pool.
+              Start the view-count flusher, related-notes refresher,
+              embedding indexer, session reaper and the session cache's
+              invalidation listener.
+    Shutdown: Flush buffered views, stop the password hashing pool and the
+              invalidation listener, then clean up the connection pool.
     """
     # ── STARTUP ──
     settings = get_settings()
@@ -54,10 +85,65 @@ async def lifespan(app: FastAPI):
         print("   Check: local PostgreSQL service, credentials, endpoint URL")
         raise
 
+    background_jobs = [
+        asyncio.create_task(
+            run_periodically(
+                settings.VIEW_FLUSH_INTERVAL_SECONDS,
+                view_counter.flush,
+                "view_counter.flush",
+                wait=view_counter.wait_for_flush,
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(
+                settings.NOTE_RELATED_REFRESH_INTERVAL_SECONDS,
+                related_notes_refresher.run_pending,
+                "related_notes_refresher.run_pending",
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(
+                settings.EMBEDDING_INDEX_INTERVAL_SECONDS,
+                embedding_indexer.run_pending,
+                "embedding_indexer.run_pending",
+            )
+        ),
+    ]
+    session_cache.start()
+    if settings.SESSION_REAPER_INTERVAL_SECONDS > 0:
+        background_jobs.append(
+            asyncio.create_task(
+                run_periodically(
+                    settings.SESSION_REAPER_INTERVAL_SECONDS,
+                    session_reaper.run,
+                    "session_reaper.run",
+                )
+            )
+        )
+
     yield  # ← App runs here, handles all requests
 
     # ── SHUTDOWN ──
+    # The view flusher's wait runs on a thread; wake it so it can exit.
+    view_counter.request_flush()
+    for job in background_jobs:
+        job.cancel()
+        with suppress(asyncio.CancelledError):
+            await job
+    # Queued related-note refreshes are simply dropped: they are rebuilt
+    # on demand by the next read of a missing or stale list. Queued
+    # embeddings are dropped too; scripts/backfill_embeddings.py catches up.
+    # Last flush BEFORE disposing the pool, or buffered views are lost.
+    try:
+        flushed = await asyncio.to_thread(view_counter.flush)
+        print(f"Flushed {flushed} buffered views.")
+    except Exception as e:
+        print(f"Final view count flush failed: {e}")
+    password_hasher.shutdown()
+    session_cache.stop()
     engine.dispose()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
     print("Connection pool closed.")
 
 
@@ -113,6 +199,13 @@ app.add_middleware(
 )
 
 # ── Register routers ──
+# Async twins go first so their paths win the route match (Starlette
+# takes the first route that matches); everything they don't cover falls
+# through to the sync routers below.
+if get_settings().DB_ASYNC_MODE:
+    app.include_router(auth.async_router)
+    app.include_router(notes.async_router)
+    app.include_router(profiles.async_router)
 app.include_router(auth.router)
 app.include_router(notes.router)
 app.include_router(profiles.router)
@@ -136,3 +229,39 @@ def health_db():
         return {"database": "healthy"}
     except Exception:
         return {"database": "unhealthy"}
+
+
+@app.get("/health/views")
+def health_views():
+    """
+    Write-behind view counter metrics for this worker.
+    pending_views is how many views would be lost if it crashed right now.
+    """
+    return view_counter.stats()
+
+
+@app.get("/health/password-hasher")
+def health_password_hasher():
+    """
+    Password hashing pool metrics for this worker.
+    rejected counts auth requests shed with a 503 since startup.
+    """
+    return password_hasher.stats()
+
+
+@app.get("/health/session-reaper")
+def health_session_reaper():
+    """
+    Session reaper metrics for this worker.
+    last_purged is how many stale user_sessions rows the last run deleted.
+    """
+    return session_reaper.stats()
+
+
+@app.get("/health/session-cache")
+def health_session_cache():
+    """
+    Active-session cache metrics for this worker.
+    invalidations_received counts revocations fanned out to it.
+    """
+    return session_cache.stats()
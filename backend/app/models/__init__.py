@@ -4,6 +4,8 @@
 #   from app.models.user import User
 from app.models.user import User
 from app.models.note import Note
+from app.models.note_embedding import NoteEmbedding
 from app.models.note_like import NoteLike
+from app.models.note_related import NoteRelated, NoteRelatedRefresh
 from app.models.note_version import NoteVersion
 from app.models.user_session import UserSession
@@ -1,9 +1,14 @@
-from sqlalchemy import Boolean, Column, Computed, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Computed, Index, Integer, String, Text, DateTime, ForeignKey, text
 from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.database import Base
 
 
+# Characters kept in notes.excerpt, the stored prefix list endpoints return.
+EXCERPT_LENGTH = 280
+
+
 class Note(Base):
     """
     This Python class = the "notes" table in Aurora PostgreSQL.
@@ -21,6 +26,37 @@ class Note(Base):
     );
     """
     __tablename__ = "notes"    # ← Actual table name in the database
+    __table_args__ = (
+        # Community feed: WHERE is_community AND is_published ORDER BY id DESC.
+        # The partial index holds only feed rows, so each page is a short
+        # backwards range scan instead of a filter over every note.
+        Index(
+            "ix_notes_community_feed",
+            text("id DESC"),
+            postgresql_where=text("is_community AND is_published"),
+        ),
+        # Public profile: WHERE user_id = ? AND is_published ORDER BY id DESC.
+        Index(
+            "ix_notes_user_published",
+            "user_id",
+            text("id DESC"),
+            postgresql_where=text("is_published"),
+        ),
+        # Related notes: WHERE tags && :source_tags (array overlap); also
+        # the search planner's tag: clauses (tags @> ...).
+        Index("ix_notes_tags", "tags", postgresql_using="gin"),
+        # Search planner: lang: and updated: clauses within one user's notes.
+        Index("ix_notes_user_language", "user_id", text("lower(language)")),
+        Index("ix_notes_user_edited", "user_id", text("coalesce(updated_at, created_at)")),
+        # Prefix/typo search (mode=prefix): pg_trgm word_similarity on title
+        # and tags. The tags one is an expression index, see migration d5f1b7c3e9a2.
+        Index(
+            "ix_notes_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -36,10 +72,30 @@ class Note(Base):
     is_published = Column(Boolean, default=False, nullable=False)
     is_community = Column(Boolean, default=False, nullable=False)
     view_count = Column(Integer, nullable=False, server_default="0", default=0)
-    search_vector = Column(
-        TSVECTOR,
-        Computed("to_tsvector('english', title || ' ' || content)", persisted=True),
+    # Denormalized COUNT(*) of note_likes, kept in step by note_repo.create_like /
+    # delete_like in the same transaction as the like row itself.
+    like_count = Column(Integer, nullable=False, server_default="0", default=0)
+    # List endpoints in summary mode ship this instead of content.
+    excerpt = Column(
+        Text,
+        Computed(f"left(content, {EXCERPT_LENGTH})", persisted=True),
         nullable=True,
     )
+    # Field-weighted document for ts_rank_cd: title A, tags B, language/type C,
+    # body D. notes_tags_text() is an IMMUTABLE array_to_string wrapper created
+    # by migration c4e8a2d6f1b9. Only ever used inside SQL, so it is deferred.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', notes_tags_text(tags::text[])), 'B') || "
+                "setweight(to_tsvector('english', coalesce(language, '') || ' ' || coalesce(note_type, '')), 'C') || "
+                "setweight(to_tsvector('english', coalesce(content, '')), 'D')",
+                persisted=True,
+            ),
+            nullable=True,
+        )
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,64 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
+
+from app.database import Base
+
+
+class Vector(UserDefinedType):
+    """pgvector's `vector(n)` column type.
+
+    Values travel as pgvector's text form ('[0.1,0.2,...]'), so no client
+    library is needed on either side.
+    """
+
+    cache_ok = True
+
+    def __init__(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+
+    def get_col_spec(self, **kw) -> str:
+        return f"vector({self.dimensions})"
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            return "[" + ",".join(repr(float(component)) for component in value) + "]"
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            return [float(component) for component in value.strip("[]").split(",") if component]
+
+        return process
+
+
+class NoteEmbedding(Base):
+    """
+    One embedding per note for the vector half of hybrid search.
+
+    Written in the background by services/embedding_indexer.py after a note
+    is created or edited. `model` records which embedder produced the
+    vector, so switching EMBEDDING_PROVIDER never mixes incompatible spaces.
+    """
+
+    __tablename__ = "note_embeddings"
+    __table_args__ = (
+        # Approximate nearest neighbour by cosine distance (embedding <=> :q).
+        Index(
+            "ix_note_embeddings_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    model = Column(String(64), nullable=False)
+    embedding = Column(Vector(256), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class NoteRelated(Base):
+    """
+    Materialized "related notes" for published notes.
+
+    One row per (note, related note), ordered by rank. Refreshed in the
+    background by services/related_notes.py so the public related endpoint
+    is a single indexed read instead of a ranking query per page view.
+    """
+
+    __tablename__ = "note_related"
+    __table_args__ = (
+        UniqueConstraint("note_id", "related_note_id", name="uq_note_related_note_id_related_note_id"),
+        Index("ix_note_related_note_id_rank", "note_id", "rank"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False)
+    related_note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, index=True)
+    rank = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class NoteRelatedRefresh(Base):
+    """
+    When a note's related list was last materialized, one row per source
+    note. It exists even when the list came out empty, so an empty list
+    reads as fresh instead of as "never built".
+    """
+
+    __tablename__ = "note_related_refreshes"
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
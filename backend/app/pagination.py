@@ -0,0 +1,26 @@
+"""
+Keyset pagination shared by the note and profile endpoints.
+
+List endpoints take `cursor` (the last id of the previous page) and
+`limit`, fetch limit + 1 rows, and return {"data": [...], "next_cursor": id}
+where next_cursor is None on the last page.
+"""
+
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def item_id(item) -> int:
+    if isinstance(item, dict):
+        return item["id"]
+    return item.id
+
+
+def paginate(items: list, limit: int) -> dict:
+    """`items` holds up to limit + 1 rows; the extra one only signals a next page."""
+    data = items[:limit]
+    next_cursor = item_id(data[-1]) if len(items) > limit and data else None
+    return {"data": data, "next_cursor": next_cursor}
@@ -9,20 +9,30 @@ Pattern:  Router → Service (business logic) → Repository (THIS FILE) → Dat
 The repository does NOT check ownership or authorization.
 That's the service layer's job (note_service.py).
 """
-import re
+import html
+import itertools
+import math
+from collections import Counter
+from datetime import datetime
 
-from sqlalchemy import desc, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, String, Text, and_, any_, case, cast, desc, exists, func, literal, or_, select, union, union_all, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
+from sqlalchemy.orm import Session, defer
 
 from app.models.note import Note
+from app.models.note_embedding import NoteEmbedding, Vector
 from app.models.note_like import NoteLike
+from app.models.note_related import NoteRelated, NoteRelatedRefresh
 from app.models.note_version import NoteVersion
 from app.models.user import User
+from app.search_index import UserSearchIndex, fallback_search_index, tokenize
+from app.search_query import SearchQuery, parse_query
 
 
 def _search_terms(search_query: str) -> list[str]:
     """Extract normalized terms used by fallback retrieval and tests."""
-    return [term for term in re.findall(r"[\w#+.-]+", search_query.lower()) if term]
+    return tokenize(search_query)
 
 
 def _fallback_search_score(note: Note, terms: list[str]) -> int:
@@ -31,6 +41,9 @@ def _fallback_search_score(note: Note, terms: list[str]) -> int:
     Title and tags are weighted above body matches because they represent explicit
     intent. Phrase matches receive an additional boost so searches like
     "docker compose" rank exact notes above scattered token hits.
+
+    _fallback_search_scores is the batch form used for retrieval; a change
+    here must be mirrored there (test_search_ranking checks they agree).
     """
     if not terms:
         return 0
@@ -65,6 +78,84 @@ def _fallback_search_score(note: Note, terms: list[str]) -> int:
     return score
 
 
+# Notes scored per slice: small enough that a slice's lowercased text stays
+# in CPU cache across the per-term scans.
+_SCORE_CHUNK = 256
+
+
+def _lowered(values) -> list[str]:
+    return list(map(str.lower, values))
+
+
+def _positions(flags) -> list[int]:
+    return list(itertools.compress(itertools.count(), flags))
+
+
+def _fallback_search_scores(notes: list[Note], terms: list[str]) -> list[int]:
+    """_fallback_search_score for a whole candidate set, in the same order.
+
+    Same weights and rules, evaluated column-wise (see _score_chunk) so the
+    text scans run as C-level maps and Python only visits actual hits.
+    Only _fallback_ranked calls this, so it runs only with the in-memory
+    index disabled (SEARCH_INDEX_SIZE=0) on a non-Postgres database, over
+    at most max(limit * 4, 40) candidates (4 * _FACET_SCAN_LIMIT for
+    facets). scripts/benchmark_fallback_search.py times it at those sizes.
+    """
+    if not terms:
+        return [0] * len(notes)
+    scores: list[int] = []
+    for start in range(0, len(notes), _SCORE_CHUNK):
+        scores.extend(_score_chunk(notes[start:start + _SCORE_CHUNK], terms))
+    return scores
+
+
+def _score_chunk(notes: list[Note], terms: list[str]) -> list[int]:
+    titles = _lowered([note.title or "" for note in notes])
+    contents = _lowered([note.content or "" for note in notes])
+    # "\x01" can not occur in a term, so a hit never spans two tags.
+    tags = _lowered(["\x01".join(note.tags or []) for note in notes])
+    exact: dict[str, list[int]] = {}
+    for index, note in enumerate(notes):
+        note_type = getattr(note, "note_type", "")
+        if isinstance(note_type, str):
+            exact.setdefault(note_type, []).append(index)
+        if language := getattr(note, "language", None):
+            exact.setdefault(language.lower(), []).append(index)
+
+    scores = [0] * len(notes)
+    # Notes containing every term so far: only they can contain the phrase.
+    phrase_titles: set[int] | None = None
+    phrase_contents: set[int] | None = None
+    for term in terms:
+        repeated = itertools.repeat(term)
+        title_hits = _positions(map(str.__contains__, titles, repeated))
+        for index in title_hits:
+            scores[index] += 16 if titles[index].startswith(term) else 12
+        for index in _positions(map(str.__contains__, tags, repeated)):
+            scores[index] += 18
+        # One count per body is both the "in content" test and the count.
+        counts = list(map(str.count, contents, repeated))
+        content_hits = _positions(counts)
+        for index in content_hits:
+            scores[index] += 3 + min(counts[index], 5)
+        for index in exact.get(term, ()):
+            scores[index] += 4
+
+        phrase_titles = set(title_hits) if phrase_titles is None else phrase_titles.intersection(title_hits)
+        phrase_contents = (
+            set(content_hits) if phrase_contents is None else phrase_contents.intersection(content_hits)
+        )
+
+    phrase = " ".join(terms)
+    for index in phrase_titles:
+        if phrase in titles[index]:
+            scores[index] += 24
+    for index in phrase_contents:
+        if phrase in contents[index]:
+            scores[index] += 8
+    return scores
+
+
 def create(
     db: Session,
     user_id: int,
@@ -95,6 +186,7 @@ def create(
     db.add(oNote)
     db.commit()
     db.refresh(oNote)
+    _reindex(oNote)
     return oNote
 
 def get_by_note_id(db: Session, note_id: int) -> Note | None:
@@ -152,6 +244,7 @@ def update(
             oNote.share_uuid = share_uuid
         db.commit()
         db.refresh(oNote)
+        _reindex(oNote)
         return oNote
     return None
 
@@ -242,22 +335,78 @@ def delete(db: Session, note_id: int) -> None:
     if oNote:
         db.delete(oNote)
         db.commit()
+        if (index := fallback_search_index.get(oNote.user_id)) is not None:
+            index.remove(note_id)
     return None
 
+def get_notes_by_ids(
+    db: Session,
+    user_id: int,
+    note_ids: list[int],
+    summary: bool = False,
+) -> list[Note]:
+    """The user's notes with these ids, in the given order; missing ids are skipped."""
+    if not note_ids:
+        return []
+    query = db.query(Note).filter(Note.user_id == user_id, Note.id.in_(note_ids))
+    if summary:
+        query = query.options(defer(Note.content))
+    notes = {note.id: note for note in query.all()}
+    return [notes[note_id] for note_id in note_ids if note_id in notes]
+
+
+def get_notes_sharing_tags(
+    db: Session,
+    user_id: int,
+    tags: list[str],
+    exclude_ids: list[int],
+    limit: int,
+    note_type: str | None = None,
+) -> list[tuple[int, Note]]:
+    """The user's notes with any of `tags`, as (shared tag count, note), most shared first."""
+    if not tags:
+        return []
+    query = db.query(Note).filter(Note.user_id == user_id)
+    if exclude_ids:
+        query = query.filter(Note.id.notin_(exclude_ids))
+    if note_type:
+        query = query.filter(Note.note_type == note_type)
+
+    wanted = set(tags)
+    if _is_postgres(db):
+        # Tags are stored lowercase (normalize_tags), so && is exact.
+        candidates = query.filter(Note.tags.overlap(list(wanted))).order_by(Note.id.desc()).limit(limit * 4).all()
+    else:
+        candidates = [
+            note
+            for note in query.order_by(Note.id.desc()).limit(200).all()
+            if wanted.intersection(note.tags or [])
+        ]
+    ranked = [(len(wanted.intersection(note.tags or [])), note) for note in candidates]
+    ranked.sort(key=lambda item: (item[0], item[1].id), reverse=True)
+    return ranked[:limit]
+
+
 def get_my_notes(
     db:Session,
     user_id: int,
     cursor: int | None = None,
     limit: int = 20,
     note_type: str | None = None,
+    summary: bool = False,
 ) -> list[Note]:
     """
     Fetches all notes belonging to a specific user.
 
     Uses .filter(Note.user_id == user_id) to ensure users
     only see their own notes (data isolation).
+
+    With summary=True the content column is deferred; callers must only
+    read the stored `excerpt`, or each row lazy-loads its body.
     """
     query = db.query(Note).filter(Note.user_id == user_id)
+    if summary:
+        query = query.options(defer(Note.content))
     if note_type:
         query = query.filter(Note.note_type == note_type)
     if cursor is not None:
@@ -265,62 +414,742 @@ def get_my_notes(
     return query.order_by(Note.id.desc()).limit(limit).all()
 
 
+def _last_edited():
+    # Must match the ix_notes_user_edited expression for the index to apply.
+    return func.coalesce(Note.updated_at, Note.created_at)
+
+
+def _search_base_query(db: Session, user_id: int, plan: SearchQuery, *entities):
+    """The search planner's filter half: each field clause on its own index.
+
+    type:, lang: and updated: are btree range/equality lookups next to
+    user_id (ix_notes_note_type, ix_notes_user_language, ix_notes_user_edited);
+    tag: is an array-contains on the GIN ix_notes_tags. The fallback has no
+    array operators, so there tags are checked in Python instead. Free text
+    is _ranked_match's.
+    """
+    query = db.query(*(entities or (Note,))).filter(Note.user_id == user_id)
+    if plan.note_type:
+        query = query.filter(Note.note_type == plan.note_type)
+    if plan.language:
+        query = query.filter(func.lower(Note.language) == plan.language)
+    if plan.updated_from:
+        query = query.filter(_last_edited() >= plan.updated_from)
+    if plan.updated_until:
+        query = query.filter(_last_edited() < plan.updated_until)
+    if plan.tags and _is_postgres(db):
+        # Tags are normalized to lowercase on write (normalize_tags),
+        # so an exact array-contains match is safe here.
+        query = query.filter(Note.tags.contains(plan.tags))
+    return query
+
+
+def _after_rank(rank, after: tuple[float, int] | None):
+    """Keyset predicate for ORDER BY rank DESC, id DESC resuming after `after`."""
+    if after is None:
+        return None
+    after_rank, after_id = after
+    return or_(rank < after_rank, and_(rank == after_rank, Note.id < after_id))
+
+
+def _is_postgres(db: Session) -> bool:
+    return bool(db.bind and db.bind.dialect.name == "postgresql")
+
+
+# Text search configuration of notes.search_vector. Every tsquery matched
+# against it, and ts_headline, must use the same one, or stemmed hits stop
+# matching (or stop being highlighted).
+SEARCH_CONFIG = "english"
+
+# ts_rank_cd weights for the {D, C, B, A} labels of notes.search_vector:
+# body, language/type, tags, title.
+SEARCH_RANK_WEIGHTS = (0.1, 0.2, 0.4, 1.0)
+
+
+def _search_rank(ts_query):
+    weights = cast(postgresql.array(SEARCH_RANK_WEIGHTS), ARRAY(REAL))
+    return func.ts_rank_cd(weights, Note.search_vector, ts_query, type_=REAL)
+
+
+def _cursor_rank(rank):
+    """The rank as double precision, for both the selected value and the
+    keyset comparison. ts_rank_cd is float4; the cursor carries the float8
+    the driver parsed, and float4 = float8 compares in float8, so without
+    the cast a tied row never equals its own cursor."""
+    return cast(rank, Float(53))
+
+
+def _tags_text():
+    # Must match the ix_notes_tags_trgm expression for the index to apply.
+    return func.notes_tags_text(cast(Note.tags, ARRAY(Text)))
+
+
+# pg_trgm pads each word with two spaces, so one or two typed characters
+# produce trigrams that most titles share: the <% bitmap covers nearly every
+# row and all of them are ranked. Shorter input is matched by lexeme prefix only.
+_TRIGRAM_MIN_CHARS = 3
+
+
+def _prefix_tsquery(terms: list[str]):
+    """Every term as a lexeme prefix, in two forms OR'ed together.
+
+    search_vector stores 'english' stems, so a finished word is stemmed
+    before the prefix applies ("compose" -> 'compos':*, "notes" -> 'note':*);
+    matched as typed it would stop finding the body as the user types its
+    last letters. The 'simple' form keeps a half-typed word as typed, since
+    the stemmer can cut a fragment to something that is not a prefix of the
+    full word's stem. Terms come from _search_terms, so they never contain
+    quotes.
+    """
+    ts_query = None
+    for term in terms:
+        pattern = f"'{term}':*"
+        either = func.to_tsquery("simple", pattern).op("||")(func.to_tsquery(SEARCH_CONFIG, pattern))
+        ts_query = either if ts_query is None else ts_query.op("&&")(either)
+    return ts_query
+
+
+def _ranked_match(query, plan: SearchQuery, prefix: bool = False):
+    """Adds the free-text match and returns (query, ts_query, rank).
+
+    Words, "phrases" and -exclusions all go through the tsvector (GIN). A
+    plan with no free text is a filtered listing: nothing is matched and
+    every row ranks 0, so pages come newest first.
+
+    prefix=True is the as-you-type mode: every word matches as a lexeme
+    prefix, and a trigram word_similarity on title/tags (GIN, pg_trgm)
+    catches typos once at least _TRIGRAM_MIN_CHARS have been typed. Both
+    predicates are index-backed, so Postgres plans a BitmapOr instead of
+    scanning the user's notes. Phrases and exclusions still apply exactly.
+    """
+    if not plan.has_text:
+        return query, func.websearch_to_tsquery(SEARCH_CONFIG, ""), _cursor_rank(literal(0.0))
+    if not prefix:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, plan.websearch_text())
+        query = query.filter(Note.search_vector.op("@@")(ts_query))
+        return query, ts_query, _cursor_rank(_search_rank(ts_query))
+
+    required = None
+    if plan.phrases or plan.excluded:
+        required = func.websearch_to_tsquery(SEARCH_CONFIG, plan.websearch_text(words=False))
+        query = query.filter(Note.search_vector.op("@@")(required))
+    terms = plan.terms
+    if not terms:
+        return query, required, _cursor_rank(_search_rank(required))
+
+    typed_text = " ".join(plan.words)
+    ts_query = _prefix_tsquery(terms)
+    if len(typed_text) < _TRIGRAM_MIN_CHARS:
+        query = query.filter(Note.search_vector.op("@@")(ts_query))
+        if required is not None:
+            ts_query = ts_query.op("&&")(required)
+        return query, ts_query, _cursor_rank(_search_rank(ts_query))
+
+    typed = literal(typed_text, Text)
+    query = query.filter(
+        or_(
+            Note.search_vector.op("@@")(ts_query),
+            typed.op("<%")(Note.title),
+            typed.op("<%")(_tags_text()),
+        )
+    )
+    if required is not None:
+        ts_query = ts_query.op("&&")(required)
+    rank = _search_rank(ts_query) + func.word_similarity(typed, Note.title, type_=REAL)
+    return query, ts_query, _cursor_rank(rank)
+
+
+def _matches_text(note: Note, plan: SearchQuery) -> bool:
+    """Python check of a plan's tags, phrases and exclusions, for ILIKE candidates."""
+    if plan.tags and not set(plan.tags) <= {t.lower() for t in (note.tags or [])}:
+        return False
+    if not (plan.phrases or plan.excluded):
+        return True
+    words = f" {' '.join(_search_terms(f'{note.title} {note.content}'))} "
+    return all(f" {' '.join(tokens)} " in words for tokens in plan.phrase_terms) and not any(
+        f" {' '.join(tokens)} " in words for tokens in plan.excluded_terms
+    )
+
+
+def _fallback_ranked(
+    base_query,
+    plan: SearchQuery,
+    limit: int,
+    after: tuple[float, int] | None = None,
+) -> list[tuple[int, Note]]:
+    """Index-less SQLite/dev retrieval: ILIKE candidates scored by _fallback_search_score.
+
+    The candidate set is ordered so every page scores the same rows, and
+    `after` then resumes strictly below the previous page's (score, id).
+    A plan without positive terms ranks every candidate 0.
+    """
+    terms = plan.scoring_terms
+    if terms:
+        ilike_filters = []
+        for term in terms:
+            pattern = f"%{term}%"
+            ilike_filters.extend([Note.title.ilike(pattern), Note.content.ilike(pattern)])
+        base_query = base_query.filter(or_(*ilike_filters))
+
+    candidates = [
+        note
+        for note in base_query.order_by(Note.id.desc()).limit(max(limit * 4, 40)).all()
+        if _matches_text(note, plan)
+    ]
+    if terms:
+        ranked = [
+            (score, note)
+            for note, score in zip(candidates, _fallback_search_scores(candidates, terms))
+            if score > 0
+        ]
+    else:
+        ranked = [(0, note) for note in candidates]
+    if after is not None:
+        ranked = [item for item in ranked if (item[0], item[1].id) < after]
+    ranked.sort(key=lambda item: (item[0], item[1].id), reverse=True)
+    return ranked[:limit]
+
+
+_INDEX_COLUMNS = (
+    Note.id,
+    Note.title,
+    Note.content,
+    Note.tags,
+    Note.note_type,
+    Note.language,
+    Note.created_at,
+    Note.updated_at,
+)
+
+
+def _reindex(note: Note) -> None:
+    """Applies a write to its owner's fallback index, if one is built."""
+    index = fallback_search_index.get(note.user_id)
+    if index is not None:
+        index.add(note)
+
+
+def _user_search_index(db: Session, user_id: int) -> UserSearchIndex:
+    index = fallback_search_index.get(user_id)
+    if index is None:
+        index = UserSearchIndex.build(
+            db.query(*_INDEX_COLUMNS).filter(Note.user_id == user_id).all()
+        )
+        fallback_search_index.set(user_id, index)
+    return index
+
+
+def _index_search(index: UserSearchIndex, plan: SearchQuery) -> list[tuple[float, int]]:
+    return index.search(
+        plan.scoring_terms,
+        tags=plan.tags,
+        note_type=plan.note_type,
+        language=plan.language,
+        phrases=plan.phrase_terms,
+        excluded=plan.excluded_terms,
+        updated_from=plan.updated_from,
+        updated_until=plan.updated_until,
+    )
+
+
+def _fallback_search(
+    db: Session,
+    base_query,
+    user_id: int,
+    plan: SearchQuery,
+    limit: int,
+    after: tuple[float, int] | None = None,
+    summary: bool = False,
+) -> list[tuple[float, Note]]:
+    """SQLite/dev retrieval through the user's inverted index (app/search_index.py).
+
+    Every matching note is scored, not a capped candidate set; only the
+    page's rows are loaded. Without an index cache it scans instead.
+    """
+    if fallback_search_index.maxsize <= 0:
+        return _fallback_ranked(base_query, plan, limit, after)
+    if summary:
+        base_query = base_query.options(defer(Note.content))
+
+    ranked = _index_search(_user_search_index(db, user_id), plan)
+    if after is not None:
+        ranked = [item for item in ranked if item < after]
+    page = sorted(ranked, reverse=True)[:limit]
+    if not page:
+        return []
+    notes = {note.id: note for note in base_query.filter(Note.id.in_([note_id for _, note_id in page])).all()}
+    return [(score, notes[note_id]) for score, note_id in page if note_id in notes]
+
+
 def search_notes(
     db: Session,
     user_id: int,
     search_query: str,
-    cursor: int | None = None,
+    after: tuple[float, int] | None = None,
     limit: int = 20,
     note_type: str | None = None,
     tag: str | None = None,
     language: str | None = None,
-) -> list[Note]:
-    terms = _search_terms(search_query)
-    if not terms:
+    summary: bool = False,
+    prefix: bool = False,
+) -> list[tuple[float, Note]]:
+    """Ranked (score, note) pairs, best first, strictly after `after`.
+
+    `search_query` may carry field clauses (app/search_query.py); the
+    filter arguments are merged into them. Ordering is (rank DESC, id DESC)
+    on both paths, so the last pair of a page is a complete keyset cursor
+    for the next one. See _ranked_match for prefix mode; the fallback index
+    already matches terms as token prefixes, so it ignores the flag.
+    """
+    plan = parse_query(search_query, note_type=note_type, tag=tag, language=language)
+    if plan.is_empty:
         return []
 
-    base_query = db.query(Note).filter(Note.user_id == user_id)
-    if note_type:
-        base_query = base_query.filter(Note.note_type == note_type)
-    if language:
-        base_query = base_query.filter(func.lower(Note.language) == language.lower())
-    if cursor is not None:
-        base_query = base_query.filter(Note.id < cursor)
-
-    if db.bind and db.bind.dialect.name == "postgresql":
-        if tag:
-            # Tags are normalized to lowercase on write (normalize_tags),
-            # so an exact array-contains match is safe here.
-            base_query = base_query.filter(Note.tags.contains([tag.lower()]))
-        ts_query = func.websearch_to_tsquery("english", search_query)
-        rank = func.ts_rank(Note.search_vector, ts_query)
-        return (
-            base_query.filter(Note.search_vector.op("@@")(ts_query))
+    base_query = _search_base_query(db, user_id, plan)
+
+    if _is_postgres(db):
+        if summary:
+            base_query = base_query.options(defer(Note.content))
+        query, _, rank = _ranked_match(base_query, plan, prefix)
+        resume = _after_rank(rank, after)
+        if resume is not None:
+            query = query.filter(resume)
+        rows = (
+            query.add_columns(rank.label("rank"))
             .order_by(desc(rank), Note.id.desc())
             .limit(limit)
             .all()
         )
+        return [(score, note) for note, score in rows]
+
+    return _fallback_search(db, base_query, user_id, plan, limit, after, summary)
+
+
+FACETS = ("note_type", "tags", "language")
+# Without the fallback index, facets count at most this many ILIKE matches.
+_FACET_SCAN_LIMIT = 1000
+
+
+def _facet_lists(counts: dict[str, Counter], tag_limit: int) -> dict[str, list[dict]]:
+    """Counters → {facet: [{"value", "count"}]}, most matches first; tags trimmed to `tag_limit`."""
+    facets = {}
+    for name in FACETS:
+        ordered = sorted(counts.get(name, Counter()).items(), key=lambda item: (-item[1], item[0]))
+        if name == "tags":
+            ordered = ordered[:tag_limit]
+        facets[name] = [{"value": value, "count": count} for value, count in ordered]
+    return facets
+
+
+def _facet_counts_sql(db: Session, query, tag_limit: int) -> dict[str, Counter]:
+    """One statement: the match is a CTE, grouped once per facet and UNIONed."""
+    matched = query.cte("matched")
+    tag = func.unnest(matched.c.tags).label("value")
+    tags = select(tag).select_from(matched).subquery("tag")
+    by_type = select(
+        literal("note_type").label("facet"), matched.c.note_type.label("value"), func.count().label("count")
+    ).group_by(matched.c.note_type)
+    by_language = (
+        select(literal("language"), matched.c.language, func.count())
+        .where(matched.c.language.isnot(None))
+        .group_by(matched.c.language)
+    )
+    by_tag = (
+        select(literal("tags"), tags.c.value, func.count())
+        .group_by(tags.c.value)
+        .order_by(func.count().desc(), tags.c.value)
+        .limit(tag_limit)
+    )
+    counts: dict[str, Counter] = {name: Counter() for name in FACETS}
+    for facet, value, count in db.execute(union_all(by_type, by_language, by_tag)).all():
+        counts[facet][value] = count
+    return counts
 
-    ilike_filters = []
-    for term in terms:
-        pattern = f"%{term}%"
-        ilike_filters.extend([Note.title.ilike(pattern), Note.content.ilike(pattern)])
 
-    candidates = base_query.filter(or_(*ilike_filters)).limit(max(limit * 4, 40)).all()
-    if tag:
-        wanted = tag.lower()
-        candidates = [
-            note
-            for note in candidates
-            if wanted in [t.lower() for t in (note.tags or [])]
-        ]
-    ranked = [
-        (score, note)
-        for note in candidates
-        if (score := _fallback_search_score(note, terms)) > 0
-    ]
+def search_facets(
+    db: Session,
+    user_id: int,
+    search_query: str,
+    note_type: str | None = None,
+    tag: str | None = None,
+    language: str | None = None,
+    prefix: bool = False,
+    tag_limit: int = 10,
+) -> dict[str, list[dict]]:
+    """How many notes matching a search fall under each note_type, tag and language.
+
+    Counts cover every match (not one page) with the request's filters
+    applied, so they show where narrowing further would still find notes.
+    Languages are lowercased, as the language filter compares them.
+    """
+    plan = parse_query(search_query, note_type=note_type, tag=tag, language=language)
+    if plan.is_empty:
+        return _facet_lists({}, tag_limit)
+
+    if _is_postgres(db):
+        base_query = _search_base_query(
+            db, user_id, plan, Note.id, Note.note_type, func.lower(Note.language).label("language"), Note.tags
+        )
+        query, _, _ = _ranked_match(base_query, plan, prefix)
+        return _facet_lists(_facet_counts_sql(db, query, tag_limit), tag_limit)
+
+    counts: dict[str, Counter] = {name: Counter() for name in FACETS}
+    if fallback_search_index.maxsize <= 0:
+        base_query = _search_base_query(db, user_id, plan)
+        for _, note in _fallback_ranked(base_query, plan, _FACET_SCAN_LIMIT):
+            counts["note_type"][note.note_type] += 1
+            counts["tags"].update(t.lower() for t in (note.tags or []))
+            if note.language:
+                counts["language"][note.language.lower()] += 1
+        return _facet_lists(counts, tag_limit)
+
+    index = _user_search_index(db, user_id)
+    for indexed in index.notes([note_id for _, note_id in _index_search(index, plan)]):
+        counts["note_type"][indexed.note_type] += 1
+        counts["tags"].update(indexed.tags)
+        if indexed.language:
+            counts["language"][indexed.language] += 1
+    return _facet_lists(counts, tag_limit)
+
+
+def _reciprocal_rank_fusion(rankings: list[list[int]], k: int) -> dict[int, float]:
+    """RRF: each ranking adds 1 / (k + position) for every id it contains.
+
+    Only positions are used, so ts_rank and cosine distance never need to
+    be put on a common scale.
+    """
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for position, note_id in enumerate(ranking, start=1):
+            fused[note_id] = fused.get(note_id, 0.0) + 1.0 / (k + position)
+    return fused
+
+
+def _cosine(left: list[float], right: list[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    norms = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norms if norms else 0.0
+
+
+# pgvector caps hnsw.ef_search at 1000.
+_HNSW_MAX_EF_SEARCH = 1000
+
+
+def _widen_vector_scan(db: Session, candidates: int) -> None:
+    """Lets the HNSW scan actually return `candidates` rows for one user.
+
+    The index is global, and the user/model/filter predicates only apply to
+    what it returns: with the default ef_search (40) a scan yields at most 40
+    neighbours across all users, so most users would get none. ef_search is
+    raised to the candidate count, and iterative scan (pgvector >= 0.8) keeps
+    walking the graph until enough rows survive the filters, up to
+    hnsw.max_scan_tuples. relaxed_order may return them slightly out of
+    distance order; positions are renumbered by distance outside the scan.
+    Both settings are transaction-local (set_config(..., true)).
+    """
+    db.execute(
+        select(
+            func.set_config("hnsw.ef_search", str(min(max(candidates, 40), _HNSW_MAX_EF_SEARCH)), True),
+            func.set_config("hnsw.iterative_scan", "relaxed_order", True),
+        )
+    )
+
+
+def search_notes_hybrid(
+    db: Session,
+    user_id: int,
+    search_query: str,
+    query_embedding: list[float],
+    model: str,
+    after: tuple[float, int] | None = None,
+    limit: int = 20,
+    note_type: str | None = None,
+    tag: str | None = None,
+    language: str | None = None,
+    summary: bool = False,
+    candidates: int = 100,
+    rrf_k: int = 60,
+) -> list[tuple[float, Note]]:
+    """Lexical + vector search fused with reciprocal rank fusion.
+
+    Each side contributes its top `candidates` ids: full-text by ts_rank_cd,
+    vectors by cosine distance over the HNSW index (embeddings from `model`
+    only). The fused (score, id) ordering supports the same keyset cursor
+    as search_notes; results end once both candidate lists are exhausted.
+    """
+    plan = parse_query(search_query, note_type=note_type, tag=tag, language=language)
+    if plan.is_empty:
+        return []
+    if not plan.scoring_terms:
+        # Nothing to embed: a filtered listing, exactly as search_notes ranks it.
+        return search_notes(
+            db,
+            user_id=user_id,
+            search_query=search_query,
+            after=after,
+            limit=limit,
+            note_type=note_type,
+            tag=tag,
+            language=language,
+            summary=summary,
+        )
+
+    base_query = _search_base_query(db, user_id, plan)
+
+    if not _is_postgres(db):
+        return _fallback_hybrid(
+            db, base_query, user_id, plan, query_embedding, model, after, limit, candidates, rrf_k
+        )
+
+    lexical_query, _, rank = _ranked_match(base_query, plan)
+    lexical = (
+        lexical_query.with_entities(
+            Note.id.label("id"),
+            func.row_number().over(order_by=(desc(rank), Note.id.desc())).label("position"),
+        )
+        .order_by(desc(rank), Note.id.desc())
+        .limit(candidates)
+        .subquery()
+    )
+
+    _widen_vector_scan(db, candidates)
+    vector_type = Vector(len(query_embedding))
+    distance = NoteEmbedding.embedding.op("<=>")(cast(literal(query_embedding, vector_type), vector_type))
+    vector_query = base_query.join(NoteEmbedding, NoteEmbedding.note_id == Note.id).filter(
+        NoteEmbedding.user_id == user_id,
+        NoteEmbedding.model == model,
+    )
+    if plan.excluded:
+        # Neighbours only honour exclusions; phrases are the lexical side's.
+        excluded = func.websearch_to_tsquery(SEARCH_CONFIG, " or ".join(f'"{text}"' for text in plan.excluded))
+        vector_query = vector_query.filter(~Note.search_vector.op("@@")(excluded))
+    # ORDER BY distance alone, LIMIT k: the only shape the HNSW index can
+    # serve. Positions are numbered outside, over those k rows.
+    nearest = (
+        vector_query.with_entities(Note.id.label("id"), distance.label("distance"))
+        .order_by(distance)
+        .limit(candidates)
+        .subquery()
+    )
+    semantic = select(
+        nearest.c.id,
+        func.row_number().over(order_by=(nearest.c.distance, nearest.c.id.desc())).label("position"),
+    ).subquery()
+
+    fused_score = cast(
+        func.coalesce(1.0 / (rrf_k + lexical.c.position), 0.0)
+        + func.coalesce(1.0 / (rrf_k + semantic.c.position), 0.0),
+        Float,
+    )
+    fused = (
+        select(func.coalesce(lexical.c.id, semantic.c.id).label("id"), fused_score.label("score"))
+        .select_from(lexical.outerjoin(semantic, lexical.c.id == semantic.c.id, full=True))
+        .subquery()
+    )
+
+    query = db.query(Note, fused.c.score).join(fused, fused.c.id == Note.id)
+    if summary:
+        query = query.options(defer(Note.content))
+    resume = _after_rank(fused.c.score, after)
+    if resume is not None:
+        query = query.filter(resume)
+    rows = query.order_by(fused.c.score.desc(), Note.id.desc()).limit(limit).all()
+    return [(score, note) for note, score in rows]
+
+
+def _fallback_hybrid(
+    db: Session,
+    base_query,
+    user_id: int,
+    plan: SearchQuery,
+    query_embedding: list[float],
+    model: str,
+    after: tuple[float, int] | None,
+    limit: int,
+    candidates: int,
+    rrf_k: int,
+) -> list[tuple[float, Note]]:
+    """SQLite/dev: the same fusion, with cosine similarity computed in Python."""
+    lexical = _fallback_search(db, base_query, user_id, plan, candidates)
+
+    stored = (
+        db.query(NoteEmbedding.note_id, NoteEmbedding.embedding)
+        .filter(NoteEmbedding.user_id == user_id, NoteEmbedding.model == model)
+        .all()
+    )
+    similarities = sorted(
+        ((_cosine(query_embedding, row.embedding), row.note_id) for row in stored),
+        reverse=True,
+    )[:candidates]
+    semantic_notes = {
+        note.id: note
+        for note in base_query.filter(Note.id.in_([note_id for _, note_id in similarities])).all()
+        if _matches_text(note, SearchQuery(tags=plan.tags, excluded=plan.excluded))
+    }
+
+    notes = {note.id: note for _, note in lexical}
+    notes.update(semantic_notes)
+    fused = _reciprocal_rank_fusion(
+        [
+            [note.id for _, note in lexical],
+            [note_id for _, note_id in similarities if note_id in semantic_notes],
+        ],
+        rrf_k,
+    )
+    ranked = [(score, notes[note_id]) for note_id, score in fused.items()]
+    if after is not None:
+        ranked = [item for item in ranked if (item[0], item[1].id) < after]
     ranked.sort(key=lambda item: (item[0], item[1].id), reverse=True)
-    return [note for _, note in ranked[:limit]]
+    return ranked[:limit]
+
+
+HEADLINE_START = "<mark>"
+HEADLINE_STOP = "</mark>"
+HEADLINE_DELIMITER = " ... "
+
+_HIT_COLUMNS = (
+    Note.id,
+    Note.user_id,
+    Note.title,
+    Note.tags,
+    Note.note_type,
+    Note.language,
+    Note.source_url,
+    Note.is_pinned,
+    Note.share_uuid,
+    Note.is_published,
+    Note.is_community,
+    Note.created_at,
+    Note.updated_at,
+)
+
+
+def _hit_response(row, headline: str, score: float) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "title": row.title,
+        "tags": row.tags,
+        "note_type": getattr(row, "note_type", "note"),
+        "language": getattr(row, "language", None),
+        "source_url": getattr(row, "source_url", None),
+        "is_pinned": row.is_pinned,
+        "share_uuid": row.share_uuid,
+        "is_published": row.is_published,
+        "is_community": row.is_community,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "headline": headline or "",
+        "score": float(score),
+    }
+
+
+def _html_escaped(column):
+    # Headlines are rendered as HTML, so the note text is escaped before
+    # ts_headline adds <mark>. The default parser reads &lt; etc. as entity
+    # tokens, so escaping does not change which words match.
+    return func.replace(
+        func.replace(func.replace(column, "&", "&amp;"), "<", "&lt;"),
+        ">",
+        "&gt;",
+    )
+
+
+def _headline_options(max_fragments: int, max_words: int) -> str:
+    # ts_headline requires 0 < MinWords < MaxWords; Settings keeps max_words >= 2.
+    min_words = min(max_words - 1, max(1, max_words // 3))
+    return (
+        f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, "
+        f'FragmentDelimiter="{HEADLINE_DELIMITER}", '
+        f"MaxFragments={max_fragments}, MaxWords={max_words}, "
+        f"MinWords={min_words}"
+    )
+
+
+def _fallback_headline(content: str, terms: list[str], max_fragments: int, max_words: int) -> str:
+    """Python stand-in for ts_headline: escaped windows around term hits."""
+    words = (content or "").split()
+
+    def is_hit(word: str) -> bool:
+        lowered = word.lower()
+        return any(term in lowered for term in terms)
+
+    def render(window: list[str]) -> str:
+        return " ".join(
+            f"{HEADLINE_START}{html.escape(word)}{HEADLINE_STOP}" if is_hit(word) else html.escape(word)
+            for word in window
+        )
+
+    hits = [index for index, word in enumerate(words) if is_hit(word)]
+    if not hits:
+        return render(words[:max_words])
+
+    fragments = []
+    covered_until = -1
+    for index in hits:
+        if len(fragments) >= max_fragments:
+            break
+        if index <= covered_until:
+            continue
+        start = max(index - max_words // 2, covered_until + 1)
+        fragments.append(render(words[start:start + max_words]))
+        covered_until = start + max_words - 1
+    return HEADLINE_DELIMITER.join(fragments)
+
+
+def search_note_hits(
+    db: Session,
+    user_id: int,
+    search_query: str,
+    after: tuple[float, int] | None = None,
+    limit: int = 20,
+    note_type: str | None = None,
+    tag: str | None = None,
+    language: str | None = None,
+    max_fragments: int = 2,
+    max_words: int = 24,
+    prefix: bool = False,
+) -> list[tuple[float, dict]]:
+    """Ranked search hits with a highlighted headline and score instead of content.
+
+    Postgres ranks ids in an inner query and only the final `limit` rows reach
+    ts_headline, which re-parses the document and is by far the most
+    expensive part; it is never evaluated for matches outside the page.
+    """
+    plan = parse_query(search_query, note_type=note_type, tag=tag, language=language)
+    if plan.is_empty:
+        return []
+
+    base_query = _search_base_query(db, user_id, plan)
+
+    if not _is_postgres(db):
+        terms = plan.scoring_terms
+        return [
+            (score, _hit_response(note, _fallback_headline(note.content, terms, max_fragments, max_words), score))
+            for score, note in _fallback_search(db, base_query, user_id, plan, limit, after)
+        ]
+
+    query, ts_query, rank = _ranked_match(base_query, plan, prefix)
+    resume = _after_rank(rank, after)
+    if resume is not None:
+        query = query.filter(resume)
+    ranked = (
+        query.with_entities(Note.id.label("id"), rank.label("rank"))
+        .order_by(desc(rank), Note.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    # ts_query is exactly what matched (in prefix mode, the stemmed prefix
+    # query), so every stemmed hit on the page is also highlighted.
+    options = _headline_options(max_fragments, max_words)
+    headline = func.ts_headline(SEARCH_CONFIG, _html_escaped(Note.content), ts_query, options)
+    rows = (
+        db.query(*_HIT_COLUMNS, headline.label("headline"), ranked.c.rank)
+        .join(ranked, ranked.c.id == Note.id)
+        .order_by(ranked.c.rank.desc(), Note.id.desc())
+        .all()
+    )
+    return [(row.rank, _hit_response(row, row.headline, row.rank)) for row in rows]
 
 def toggle_pin(db: Session, note_id: int) -> Note:
     """Flips is_pinned on a note and returns the updated note."""
@@ -340,14 +1169,16 @@ def _community_response(
     author_name: str,
     author_username: str | None = None,
     liked_by_me: bool = False,
+    summary: bool = False,
 ) -> dict:
+    body = {"excerpt": note.excerpt} if summary else {"content": note.content}
     return {
         "id": note.id,
         "author_name": author_name,
         "author_username": author_username,
         "liked_by_me": liked_by_me,
         "title": note.title,
-        "content": note.content,
+        **body,
         "tags": note.tags,
         "note_type": getattr(note, "note_type", "note"),
         "language": getattr(note, "language", None),
@@ -356,7 +1187,7 @@ def _community_response(
         "share_uuid": note.share_uuid,
         "is_published": note.is_published,
         "is_community": note.is_community,
-        "like_count": getattr(note, "like_count", 0),
+        "like_count": note.like_count or 0,
         "view_count": note.view_count or 0,
         "created_at": note.created_at,
         "updated_at": note.updated_at,
@@ -386,20 +1217,27 @@ def get_community_notes(
     cursor: int | None = None,
     limit: int = 20,
     viewer_id: int | None = None,
+    summary: bool = False,
 ) -> list[dict]:
-    """Fetches published community notes only, with the viewer's like state."""
-    like_count = func.count(NoteLike.id).label("like_count")
-    liked_by_me = func.coalesce(
-        func.bool_or(NoteLike.user_id == viewer_id), False
-    ).label("liked_by_me")
+    """Fetches published community notes only, with the viewer's like state.
+
+    like_count is a plain column and liked_by_me a correlated EXISTS on the
+    (note_id, user_id) unique index, so a page is an index range scan over
+    ix_notes_community_feed — no join fan-out, no GROUP BY. summary=True
+    returns the stored excerpt and never fetches content.
+    """
+    liked_by_me = (
+        exists()
+        .where(NoteLike.note_id == Note.id, NoteLike.user_id == viewer_id)
+        .label("liked_by_me")
+    )
     query = (
-        db.query(Note, User.name, User.username)
+        db.query(Note, User.name, User.username, liked_by_me)
         .join(User, Note.user_id == User.id)
-        .outerjoin(NoteLike, NoteLike.note_id == Note.id)
         .filter(Note.is_community == True, Note.is_published == True)
-        .group_by(Note.id, User.name, User.username)
-        .add_columns(like_count, liked_by_me)
     )
+    if summary:
+        query = query.options(defer(Note.content))
     if cursor is not None:
         query = query.filter(Note.id < cursor)
     rows = query.order_by(Note.id.desc()).limit(limit).all()
@@ -409,33 +1247,42 @@ def get_community_notes(
             author_name,
             author_username=author_username,
             liked_by_me=bool(liked),
+            summary=summary,
         )
-        | {"like_count": like_count}
-        for note, author_name, author_username, like_count, liked in rows
+        for note, author_name, author_username, liked in rows
     ]
 
 
-def increment_view_counts(db: Session, note_ids: list[int]) -> None:
-    if not note_ids:
+def apply_view_deltas(db: Session, deltas: dict[int, int]) -> None:
+    """Adds buffered view counts to many notes in ONE statement.
+
+    UPDATE notes SET view_count = view_count + CASE id WHEN 7 THEN 3 ... END
+    WHERE id IN (7, ...)
+
+    Called by the view counter's flush, never per request — a burst of
+    page views on one note becomes a single +N instead of N row updates.
+    """
+    if not deltas:
         return
+    delta = case(deltas, value=Note.id, else_=0)
     (
         db.query(Note)
-        .filter(Note.id.in_(note_ids))
-        .update({Note.view_count: Note.view_count + 1}, synchronize_session=False)
+        .filter(Note.id.in_(list(deltas)))
+        .update(
+            {
+                Note.view_count: Note.view_count + delta,
+                # Pin updated_at, otherwise its onupdate=now() fires and a
+                # page view would look like an edit.
+                Note.updated_at: Note.updated_at,
+            },
+            synchronize_session=False,
+        )
     )
     db.commit()
 
 
-def increment_view_count(db: Session, note_id: int) -> None:
-    increment_view_counts(db, [note_id])
-
-
-def get_like_count(db: Session, note_id: int) -> int:
-    return db.query(NoteLike).filter(NoteLike.note_id == note_id).count()
-
-
 def get_public_note_response(db: Session, note: Note) -> dict:
-    response = _public_response(note, get_like_count(db, note.id))
+    response = _public_response(note, note.like_count or 0)
     author = db.query(User).filter(User.id == note.user_id).first()
     if author:
         response["author_name"] = author.name
@@ -443,18 +1290,109 @@ def get_public_note_response(db: Session, note: Note) -> dict:
     return response
 
 
-def get_related_public_notes(
-    db: Session,
-    note: Note,
-    limit: int = 3,
-) -> list[dict]:
-    """Returns public notes related by author and tags.
+# Columns RelatedPublicNoteResponse actually renders — nothing else is read.
+_RELATED_COLUMNS = (
+    Note.id,
+    Note.title,
+    Note.content,
+    Note.tags,
+    Note.note_type,
+    Note.language,
+    Note.source_url,
+    Note.share_uuid,
+    Note.is_published,
+    Note.is_community,
+    Note.like_count,
+    Note.view_count,
+    Note.created_at,
+    Note.updated_at,
+)
+
+
+def _related_response(row) -> dict:
+    return {
+        "title": row.title,
+        "content": row.content,
+        "tags": row.tags,
+        "note_type": row.note_type,
+        "language": row.language,
+        "source_url": row.source_url,
+        "share_uuid": row.share_uuid,
+        "is_published": row.is_published,
+        "is_community": row.is_community,
+        "like_count": row.like_count or 0,
+        "view_count": row.view_count or 0,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def _rank_related_sql(db: Session, note: Note, limit: int) -> list[tuple]:
+    """Postgres ranker: one statement, scored in SQL.
+
+    score = 20 * same_author + 8 * |tag overlap| + 2 * same_type
+
+    Candidates come from three index-bounded branches, each capped at
+    `limit`: notes sharing a tag (tags && :tags, GIN ix_notes_tags) or the
+    author, then the most recent same-type and most recent published notes
+    to fill the page when nothing is related. Work is proportional to the
+    related set and `limit`, not to the size of the published corpus.
+    """
+    source_tags = literal(list(note.tags or []), type_=ARRAY(String))
+    tag = func.unnest(Note.tags).table_valued("tag").render_derived()
+    tag_overlap = (
+        select(func.count())
+        .select_from(tag)
+        .where(tag.c.tag == any_(source_tags))
+        .scalar_subquery()
+    )
+    score = (
+        case((Note.user_id == note.user_id, 20), else_=0)
+        + tag_overlap * 8
+        + case((Note.note_type == note.note_type, 2), else_=0)
+    )
+    published = and_(
+        Note.id != note.id,
+        Note.is_published == True,
+        Note.share_uuid.isnot(None),
+    )
+    related = (
+        select(Note.id)
+        .where(published, or_(Note.tags.overlap(source_tags), Note.user_id == note.user_id))
+        .order_by(score.desc(), Note.id.desc())
+        .limit(limit)
+    )
+    recent_same_type = (
+        select(Note.id)
+        .where(published, Note.note_type == note.note_type)
+        .order_by(Note.id.desc())
+        .limit(limit)
+    )
+    recent = select(Note.id).where(published).order_by(Note.id.desc()).limit(limit)
+    candidate_ids = union(related, recent_same_type, recent).subquery()
+
+    ranked_score = score.label("score")
+    rows = db.execute(
+        select(*_RELATED_COLUMNS, ranked_score)
+        .where(Note.id.in_(select(candidate_ids.c.id)))
+        .order_by(ranked_score.desc(), Note.id.desc())
+        .limit(limit)
+    ).all()
+    return [(row, row.score) for row in rows]
+
+
+def _rank_related(db: Session, note: Note, limit: int) -> list[tuple]:
+    """Top `limit` published notes related to `note`, as (row, score) pairs.
 
     Same-author notes are most useful for public reading continuity. Shared tags
     rank above generic recency so articles feel intentionally connected.
     """
+    if db.bind and db.bind.dialect.name == "postgresql":
+        return _rank_related_sql(db, note, limit)
+
+    # SQLite/dev: same scoring in Python over the most recent candidates.
     candidates = (
-        db.query(Note)
+        db.query(*_RELATED_COLUMNS, Note.user_id)
         .filter(
             Note.id != note.id,
             Note.is_published == True,
@@ -466,62 +1404,169 @@ def get_related_public_notes(
     )
     source_tags = set(note.tags or [])
 
-    def score(candidate: Note) -> tuple[int, int]:
+    def score(candidate) -> tuple[int, int]:
         tag_overlap = len(source_tags.intersection(candidate.tags or []))
         same_author = 1 if candidate.user_id == note.user_id else 0
         same_type = 1 if candidate.note_type == note.note_type else 0
         return (same_author * 20 + tag_overlap * 8 + same_type * 2, candidate.id)
 
     ranked = sorted(candidates, key=score, reverse=True)[:limit]
-    return [
-        {
-            "title": candidate.title,
-            "content": candidate.content,
-            "tags": candidate.tags,
-            "note_type": candidate.note_type,
-            "language": candidate.language,
-            "source_url": candidate.source_url,
-            "share_uuid": candidate.share_uuid,
-            "is_published": candidate.is_published,
-            "is_community": candidate.is_community,
-            "like_count": get_like_count(db, candidate.id),
-            "view_count": candidate.view_count or 0,
-            "created_at": candidate.created_at,
-            "updated_at": candidate.updated_at,
-        }
-        for candidate in ranked
-    ]
+    return [(candidate, score(candidate)[0]) for candidate in ranked]
+
+
+def get_related_public_notes(
+    db: Session,
+    note: Note,
+    limit: int = 3,
+) -> list[dict]:
+    """Computes related public notes live (see note_related for the cached copy)."""
+    return [_related_response(row) for row, _ in _rank_related(db, note, limit)]
+
+
+def rank_related_note_ids(db: Session, note: Note, limit: int) -> list[tuple[int, int]]:
+    """(related_note_id, score) pairs, best first — what note_related stores."""
+    return [(row.id, score) for row, score in _rank_related(db, note, limit)]
+
 
+def replace_related(db: Session, note_id: int, ranked: list[tuple[int, int]]) -> None:
+    """Swaps a note's materialized related list in one transaction."""
+    db.query(NoteRelated).filter(NoteRelated.note_id == note_id).delete(
+        synchronize_session=False
+    )
+    db.add_all(
+        NoteRelated(
+            note_id=note_id,
+            related_note_id=related_note_id,
+            rank=rank,
+            score=score,
+        )
+        for rank, (related_note_id, score) in enumerate(ranked)
+    )
+    # Marks the list fresh even when `ranked` is empty.
+    db.query(NoteRelatedRefresh).filter(NoteRelatedRefresh.note_id == note_id).delete(
+        synchronize_session=False
+    )
+    db.add(NoteRelatedRefresh(note_id=note_id))
+    db.commit()
 
-def get_public_notes_for_user(db: Session, user_id: int) -> list[dict]:
-    like_count = func.count(NoteLike.id).label("like_count")
+
+def get_materialized_related(
+    db: Session,
+    note_id: int,
+    limit: int,
+) -> tuple[list[dict], datetime | None]:
+    """Reads a note's stored related list: a primary-key read of its
+    note_related_refreshes row, then one scan of ix_note_related_note_id_rank.
+
+    Returns (responses, refreshed_at). refreshed_at is None when the note has
+    never been materialized; a materialized empty list returns ([], time).
+    Targets are re-checked for is_published here, so a note unpublished
+    since the last refresh never leaks onto public pages.
+    """
+    refreshed_at = (
+        db.query(NoteRelatedRefresh.refreshed_at)
+        .filter(NoteRelatedRefresh.note_id == note_id)
+        .scalar()
+    )
+    if refreshed_at is None:
+        return [], None
     rows = (
-        db.query(Note, like_count)
-        .outerjoin(NoteLike, NoteLike.note_id == Note.id)
-        .filter(Note.user_id == user_id, Note.is_published == True)
-        .group_by(Note.id)
-        .order_by(Note.id.desc())
+        db.query(*_RELATED_COLUMNS)
+        .join(NoteRelated, NoteRelated.related_note_id == Note.id)
+        .filter(NoteRelated.note_id == note_id)
+        .order_by(NoteRelated.rank)
         .all()
     )
+    visible = [row for row in rows if row.is_published and row.share_uuid]
+    return [_related_response(row) for row in visible[:limit]], refreshed_at
+
+
+def get_related_referrers(db: Session, note_id: int) -> list[int]:
+    """Ids of notes whose stored related list currently includes `note_id`."""
+    return [
+        referrer_id
+        for (referrer_id,) in db.query(NoteRelated.note_id)
+        .filter(NoteRelated.related_note_id == note_id)
+        .all()
+    ]
+
+
+# List projection for public profile pages: `content` stays in Postgres and only
+# the stored excerpt is shipped. The full body is fetched via /notes/public/{uuid}.
+_PROFILE_NOTE_COLUMNS = (
+    Note.id,
+    Note.title,
+    Note.excerpt,
+    # octet_length reads the TOAST header instead of decompressing the body.
+    func.octet_length(Note.content).label("content_length"),
+    Note.share_uuid,
+    Note.tags,
+    Note.note_type,
+    Note.language,
+    Note.source_url,
+    Note.like_count,
+    Note.view_count,
+    Note.created_at,
+    Note.updated_at,
+)
+
+
+def get_public_note_summaries_for_user(
+    db: Session,
+    user_id: int,
+    cursor: int | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """One keyset page of a user's published notes, newest first.
+
+    Walks ix_notes_user_published, so the cost is O(limit) regardless of how
+    many notes the author has published.
+    """
+    query = db.query(*_PROFILE_NOTE_COLUMNS).filter(
+        Note.user_id == user_id,
+        Note.is_published == True,
+    )
+    if cursor is not None:
+        query = query.filter(Note.id < cursor)
+    rows = query.order_by(Note.id.desc()).limit(limit).all()
     return [
         {
-            "id": note.id,
-            "title": note.title,
-            "content": note.content,
-            "share_uuid": note.share_uuid,
-            "tags": note.tags,
-            "note_type": note.note_type,
-            "language": note.language,
-            "source_url": note.source_url,
-            "like_count": count,
-            "view_count": note.view_count or 0,
-            "created_at": note.created_at,
-            "updated_at": note.updated_at,
+            "id": row.id,
+            "title": row.title,
+            "excerpt": row.excerpt or "",
+            "content_length": row.content_length or 0,
+            "share_uuid": row.share_uuid,
+            "tags": row.tags,
+            "note_type": row.note_type,
+            "language": row.language,
+            "source_url": row.source_url,
+            "like_count": row.like_count or 0,
+            "view_count": row.view_count or 0,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
         }
-        for note, count in rows
+        for row in rows
     ]
 
 
+def get_public_note_totals_for_user(db: Session, user_id: int) -> dict:
+    """Profile header counters in one aggregate instead of summing every note."""
+    row = (
+        db.query(
+            func.count(Note.id).label("note_count"),
+            func.coalesce(func.sum(Note.like_count), 0).label("like_count"),
+            func.coalesce(func.sum(Note.view_count), 0).label("view_count"),
+        )
+        .filter(Note.user_id == user_id, Note.is_published == True)
+        .one()
+    )
+    return {
+        "note_count": row.note_count,
+        "like_count": row.like_count,
+        "view_count": row.view_count,
+    }
+
+
 def get_like(db: Session, note_id: int, user_id: int) -> NoteLike | None:
     return (
         db.query(NoteLike)
@@ -530,14 +1575,96 @@ def get_like(db: Session, note_id: int, user_id: int) -> NoteLike | None:
     )
 
 
-def create_like(db: Session, note_id: int, user_id: int) -> NoteLike:
-    like = NoteLike(note_id=note_id, user_id=user_id)
-    db.add(like)
+def _add_to_like_count(db: Session, note_id: int, delta: int) -> int:
+    """Atomically shifts notes.like_count and returns the new value.
+
+    like_count = like_count + delta runs under the row lock, so concurrent
+    toggles from different users never lose an update. Not committed here —
+    the caller commits it together with the note_likes row change.
+    """
+    return db.execute(
+        update(Note)
+        .where(Note.id == note_id)
+        .values(like_count=Note.like_count + delta, updated_at=Note.updated_at)
+        .returning(Note.like_count)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+def create_like(db: Session, note_id: int, user_id: int) -> int:
+    """Inserts the like and bumps notes.like_count in one transaction.
+    Returns the note's new like count."""
+    db.add(NoteLike(note_id=note_id, user_id=user_id))
+    db.flush()  # unique (note_id, user_id) violation surfaces before the bump
+    like_count = _add_to_like_count(db, note_id, 1)
     db.commit()
-    db.refresh(like)
-    return like
+    return like_count
 
 
-def delete_like(db: Session, like: NoteLike) -> None:
+def delete_like(db: Session, like: NoteLike) -> int:
+    """Deletes the like and decrements notes.like_count in one transaction.
+    Returns the note's new like count."""
+    note_id = like.note_id
     db.delete(like)
+    db.flush()
+    like_count = _add_to_like_count(db, note_id, -1)
     db.commit()
+    return like_count
+
+
+def get_notes_for_embedding(db: Session, note_ids: list[int]) -> list:
+    """The columns note_embedding_text needs, for one indexer batch."""
+    if not note_ids:
+        return []
+    return (
+        db.query(
+            Note.id,
+            Note.user_id,
+            Note.title,
+            Note.tags,
+            Note.note_type,
+            Note.language,
+            Note.content,
+        )
+        .filter(Note.id.in_(note_ids))
+        .all()
+    )
+
+
+def replace_embeddings(
+    db: Session,
+    model: str,
+    embeddings: list[tuple[int, int, list[float]]],
+) -> None:
+    """Stores (note_id, user_id, vector) rows, replacing earlier ones, in one transaction."""
+    if not embeddings:
+        return
+    db.query(NoteEmbedding).filter(
+        NoteEmbedding.note_id.in_([note_id for note_id, _, _ in embeddings])
+    ).delete(synchronize_session=False)
+    db.add_all(
+        NoteEmbedding(note_id=note_id, user_id=user_id, model=model, embedding=vector)
+        for note_id, user_id, vector in embeddings
+    )
+    db.commit()
+
+
+def get_note_ids_without_embedding(
+    db: Session,
+    model: str,
+    after_id: int = 0,
+    limit: int = 500,
+) -> list[int]:
+    """Next ids (ascending, > after_id) that have no embedding from `model`."""
+    current = exists().where(
+        NoteEmbedding.note_id == Note.id,
+        NoteEmbedding.model == model,
+    )
+    rows = (
+        db.query(Note.id)
+        .filter(Note.id > after_id, ~current)
+        .order_by(Note.id)
+        .limit(limit)
+        .all()
+    )
+    return [row.id for row in rows]
@@ -1,8 +1,14 @@
 from datetime import datetime, timezone
 
+from sqlalchemy import delete, or_, select
 from sqlalchemy.orm import Session
 
 from app.models.user_session import UserSession
+from app.session_cache import SessionRecord, session_cache
+
+# Each auth request is one unit of work: earlier writes pass commit=False and
+# the last one commits them all. Nothing is refreshed after the commit —
+# callers never read the server-generated columns back.
 
 
 def create(
@@ -14,6 +20,7 @@ def create(
     expires_at: datetime,
     user_agent: str | None = None,
     ip_address: str | None = None,
+    commit: bool = True,
 ) -> UserSession:
     session = UserSession(
         id=session_id,
@@ -24,8 +31,10 @@ def create(
         ip_address=ip_address,
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    # Primes the cache for the first refresh, which then skips the SELECT.
+    session_cache.set(SessionRecord(session_id, user_id, refresh_token_hash, expires_at))
+    if commit:
+        db.commit()
     return session
 
 
@@ -42,25 +51,74 @@ def get_active(db: Session, *, session_id: str) -> UserSession | None:
     )
 
 
+def _live(session_id: str, refresh_token_hash: str | None, now: datetime):
+    """Row filter for a guarded write: the session is still live and, when
+    a hash is given, still holds it (see app/session_cache.py)."""
+    criteria = [
+        UserSession.id == session_id,
+        UserSession.revoked_at.is_(None),
+        UserSession.expires_at > now,
+    ]
+    if refresh_token_hash is not None:
+        criteria.append(UserSession.refresh_token_hash == refresh_token_hash)
+    return criteria
+
+
 def rotate(
     db: Session,
     *,
-    session: UserSession,
+    session_id: str,
+    user_id: int,
+    current_hash: str,
     refresh_token_hash: str,
     expires_at: datetime,
-) -> UserSession:
-    session.refresh_token_hash = refresh_token_hash
-    session.expires_at = expires_at
-    db.commit()
-    db.refresh(session)
-    return session
+    commit: bool = True,
+) -> bool:
+    """
+    Swaps the session's token hash in one UPDATE, only if the session is
+    still live and still holds `current_hash`. Returns False (and writes
+    nothing) when it is not: the caller's copy of the row was stale.
+    """
+    updated = (
+        db.query(UserSession)
+        .filter(*_live(session_id, current_hash, datetime.now(timezone.utc)))
+        .update(
+            {UserSession.refresh_token_hash: refresh_token_hash, UserSession.expires_at: expires_at},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        return False
+    session_cache.set(SessionRecord(session_id, user_id, refresh_token_hash, expires_at))
+    if commit:
+        db.commit()
+    return True
 
 
-def revoke(db: Session, *, session: UserSession) -> UserSession:
-    session.revoked_at = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(session)
-    return session
+def revoke(
+    db: Session,
+    *,
+    session_id: str,
+    refresh_token_hash: str | None = None,
+    commit: bool = True,
+) -> bool:
+    """
+    Marks the session revoked and drops it from every worker's cache. With
+    `refresh_token_hash` it is a guarded write like rotate(): False when
+    the session is no longer live with that hash.
+    """
+    now = datetime.now(timezone.utc)
+    updated = (
+        db.query(UserSession)
+        .filter(*_live(session_id, refresh_token_hash, now))
+        .update({UserSession.revoked_at: now}, synchronize_session=False)
+    )
+    if refresh_token_hash is not None and not updated:
+        return False
+    session_cache.invalidate(db, session_id)
+    if commit:
+        db.commit()
+    return True
 
 
 def revoke_all_for_user(db: Session, *, user_id: int) -> int:
@@ -70,5 +128,31 @@ def revoke_all_for_user(db: Session, *, user_id: int) -> int:
         .filter(UserSession.user_id == user_id, UserSession.revoked_at.is_(None))
         .update({UserSession.revoked_at: now}, synchronize_session=False)
     )
+    session_cache.invalidate_user(db, user_id)
     db.commit()
     return int(updated or 0)
+
+
+def delete_stale_batch(db: Session, *, cutoff: datetime, limit: int) -> int:
+    """
+    Deletes up to `limit` sessions that expired or were revoked before
+    `cutoff`, and commits. Returns how many rows went.
+
+    Postgres has no DELETE ... LIMIT, so the batch is picked by a bounded
+    subquery over the expires_at/revoked_at indexes. SKIP LOCKED lets
+    reapers in several workers run at once without waiting on each other.
+    """
+    stale_ids = (
+        select(UserSession.id)
+        .where(or_(UserSession.expires_at < cutoff, UserSession.revoked_at < cutoff))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(UserSession)
+        .where(UserSession.id.in_(stale_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return int(result.rowcount or 0)
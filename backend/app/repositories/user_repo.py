@@ -9,8 +9,11 @@ Pattern:  Router → Service (business logic) → Repository (THIS FILE) → Dat
 The repository does NOT contain business logic (validation, authorization).
 It just executes queries and returns results.
 """
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.cache import principal_cache
 from app.models.user import User
 
 
@@ -41,6 +44,18 @@ def get_by_id(db: Session, user_id: int) -> User | None:
     oUser = db.query(User).filter(User.id == user_id).first()
     return oUser
 
+
+async def get_by_id_async(db: AsyncSession, user_id: int) -> User | None:
+    """
+    Async twin of get_by_id() for DB_ASYNC_MODE.
+
+    Used by get_current_principal_async() on a principal cache miss — the
+    one query an authenticated async route pays, so it gets a native
+    select() instead of run_sync().
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
 def create(
     db: Session,
     name: str,
@@ -77,6 +92,9 @@ def update_profile(db: Session, user: User, **fields) -> User:
         setattr(user, key, value)
     db.commit()
     db.refresh(user)
+    # The cached principal carries name/username/bio — drop it so the
+    # next request rebuilds it from the committed row.
+    principal_cache.invalidate(user.id)
     return user
 
 
@@ -84,11 +102,28 @@ def update_refresh_token(
     db: Session,
     user_id: int,
     refresh_token_hash: str | None,
-) -> User | None:
-    user = get_by_id(db, user_id=user_id)
-    if user is None:
-        return None
-    user.refresh_token = refresh_token_hash
-    db.commit()
-    db.refresh(user)
-    return user
+    commit: bool = True,
+) -> None:
+    """
+    Sets the legacy users.refresh_token column: one UPDATE, no load.
+
+    With commit=False it runs inside the caller's transaction and commits
+    with the session write it belongs to. The cached principal leaves the
+    column out, so nothing needs invalidating.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        {User.refresh_token: refresh_token_hash}, synchronize_session=False
+    )
+    if commit:
+        db.commit()
+
+def update_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    """
+    Replaces a user's password hash — the lazy upgrade authenticate_user()
+    does after a successful login with an outdated scheme or cost.
+
+    One UPDATE, no load; it commits with the login's session write.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        {User.hashed_password: hashed_password}, synchronize_session=False
+    )
@@ -13,7 +13,12 @@ Flow: Router (THIS FILE) → Service (auth_service.py) → Repository (user_repo
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import (
+   get_current_principal,
+   get_current_principal_async,
+   get_current_user,
+   get_db,
+)
 from app.rate_limit import limiter
 from app.schemas.user import (
     CurrentUserResponse,
@@ -89,8 +94,8 @@ def _refresh_token_from_request(
 # ════════════════════════════════════════════
 @router.post("/register", response_model=UserResponse, status_code=201)
 @limiter.limit("5/minute")
-def register(request: Request, response: Response, user: UserCreate, db: Session = Depends(get_db)):
-   return auth_service.register_user(db, email = user.email, name = user.name, password = user.password)
+async def register(request: Request, response: Response, user: UserCreate, db: Session = Depends(get_db)):
+   return await auth_service.register_user(db, email = user.email, name = user.name, password = user.password)
  # pass the params only if the fields are less than 5 fields else pass the schema itself
 
 
@@ -99,8 +104,10 @@ def register(request: Request, response: Response, user: UserCreate, db: Session
 # ════════════════════════════════════════════
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("10/minute")
-def login(request: Request, response: Response, credentials: UserLogin, db: Session = Depends(get_db)):
-   tokens = auth_service.authenticate_user(
+async def login(request: Request, response: Response, credentials: UserLogin, db: Session = Depends(get_db)):
+   # Async so the bcrypt work is awaited in the password_hasher pool; the
+   # service runs its DB calls on the threadpool around it.
+   tokens = await auth_service.authenticate_user(
       db,
       credentials.email,
       credentials.password,
@@ -113,7 +120,17 @@ def login(request: Request, response: Response, credentials: UserLogin, db: Sess
 
 
 @router.get("/me", response_model=CurrentUserResponse, status_code=200)
-def get_me(user=Depends(get_current_user)):
+def get_me(user=Depends(get_current_principal)):
+   return user
+
+
+# Mounted ahead of `router` when DB_ASYNC_MODE is on (see main.py).
+# Login/register need no twin: they already await the password_hasher pool.
+async_router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@async_router.get("/me", response_model=CurrentUserResponse, status_code=200)
+async def get_me_async(user=Depends(get_current_principal_async)):
    return user
 
 
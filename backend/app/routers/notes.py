@@ -1,44 +1,120 @@
 """
 Notes Router — CRUD API endpoints for notes.
 
-All routes require authentication (Depends(get_current_user)).
+All routes require authentication (Depends(get_current_principal)).
 The JWT token is extracted from the Authorization header automatically.
+Note routes only need the caller's id, so they take the cached Principal
+instead of loading the full users row on every request.
 
 Endpoints:
     POST   /notes/create       → Create a new note
     GET    /notes/notes         → List all notes for the logged-in user
     GET    /notes/{id}          → Get a single note by ID
+    GET    /notes/ask           → Ask Workspace sources, streamed as SSE
     PATCH  /notes/{id}/update   → Update an existing note
     DELETE /notes/{id}/delete   → Delete a note
 
 Flow: Router → Service (business logic) → Repository (database queries)
+
+With DB_ASYNC_MODE on, main.py mounts `async_router` in front of `router`:
+the read endpoints below are shadowed by `async def` twins that run the
+same services on an AsyncSession, so they no longer occupy a threadpool
+thread while waiting on Postgres. Writes stay on the sync path.
 """
+from typing import Literal
+
 from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import (
+    get_async_db,
+    get_current_principal,
+    get_current_principal_async,
+    get_db,
+)
+from app.pagination import clamp_limit
 from app.rate_limit import limiter
 from app.schemas.note import (
+    AskSourceResponse,
     CommunityNoteResponse,
     LikeToggleResponse,
     NoteCreate,
     NoteVersionResponse,
     NoteVersionSummaryResponse,
     PaginatedCommunityNoteResponse,
+    PaginatedCommunityNoteSummaryResponse,
     PaginatedNoteResponse,
+    PaginatedNoteSearchResponse,
+    PaginatedNoteSummaryResponse,
+    PaginatedNoteSummarySearchResponse,
+    PaginatedSearchHitResponse,
     NoteResponse,
     NoteUpdate,
     PublicNoteResponse,
     RelatedPublicNoteResponse,
 )
 from app.services import note_service
+from app.services.response_cache import (
+    cache_headers,
+    etag_matches,
+    not_modified,
+    public_note_etag,
+)
 
 
 router = APIRouter(prefix="/notes",tags=["notes"])
 
 
-def _clamp_limit(limit: int) -> int:
-    return max(1, min(limit, 100))
+# `fields=summary` on list endpoints: rows are loaded with content deferred
+# and serialized through the *Summary schemas, which carry `excerpt` only.
+ListFields = Literal["full", "summary"]
+# /notes/search matching: websearch syntax, prefix + trigram as-you-type,
+# or full-text fused with embedding similarity.
+SearchMode = Literal["fulltext", "prefix", "hybrid"]
+NoteListResponse = PaginatedNoteResponse | PaginatedNoteSummaryResponse
+CommunityListResponse = PaginatedCommunityNoteResponse | PaginatedCommunityNoteSummaryResponse
+SearchResponse = (
+    PaginatedNoteSearchResponse | PaginatedNoteSummarySearchResponse | PaginatedSearchHitResponse
+)
+
+
+def _project(page: dict, fields: ListFields, summary_model):
+    # Validating here (not in FastAPI's union handling) guarantees the full
+    # schema never touches the deferred content attribute.
+    if fields == "summary":
+        return summary_model.model_validate(page)
+    return page
+
+
+def _project_search(page: dict, fields: ListFields, highlight: bool):
+    if highlight:
+        return PaginatedSearchHitResponse.model_validate(page)
+    return _project(page, fields, PaginatedNoteSummarySearchResponse)
+
+
+# /notes/ask is a Server-Sent Events stream: one `source` event per card
+# (AskSourceResponse) as each retrieval stage finishes, then `done` with the
+# total. A stream that ends without `done` failed part-way.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _source_event(stage: str, score: float | None, note) -> str:
+    card = AskSourceResponse(
+        **NoteResponse.model_validate(note).model_dump(),
+        stage=stage,
+        score=score,
+    )
+    return _sse("source", card.model_dump_json())
+
+
+def _done_event(count: int) -> str:
+    return _sse("done", f'{{"count": {count}}}')
 
 # ════════════════════════════════════════════
 #  POST /notes/create — Create a new note
@@ -46,10 +122,10 @@ def _clamp_limit(limit: int) -> int:
 # - NoteCreate schema validates the request body (title + content required)
 # - response_model=NoteResponse filters what gets returned (hides user_id internals)
 # - status_code=201 = HTTP "Created" (not the default 200)
-# - Depends(get_current_user) extracts user from JWT — note is linked to this user
+# - Depends(get_current_principal) extracts user from JWT — note is linked to this user
 @router.post("/create",response_model=NoteResponse,status_code=201)
 @limiter.limit("30/minute")
-def my_notes(request: Request, response: Response, note: NoteCreate,user= Depends(get_current_user),db :Session = Depends(get_db)):
+def my_notes(request: Request, response: Response, note: NoteCreate,user= Depends(get_current_principal),db :Session = Depends(get_db)):
     return note_service.create_note(
         db,
         user_id=user.id,
@@ -69,7 +145,7 @@ def my_notes(request: Request, response: Response, note: NoteCreate,user= Depend
 # - NoteUpdate schema has all fields optional (title: str | None = None)
 # - Service layer verifies the note belongs to the authenticated user
 @router.patch("/{id}/update",response_model=NoteResponse,status_code=200)
-def update_note(id: int, note: NoteUpdate,user= Depends(get_current_user),db :Session = Depends(get_db)):
+def update_note(id: int, note: NoteUpdate,user= Depends(get_current_principal),db :Session = Depends(get_db)):
     return note_service.update_note(
         db,
         note_id=id,
@@ -91,7 +167,7 @@ def update_note(id: int, note: NoteUpdate,user= Depends(get_current_user),db :Se
 # - The frontend catches 204 specially (no JSON to parse)
 # - Service layer verifies ownership before deleting
 @router.delete("/{id}/delete",status_code=204)
-def delete_note(id: int,user= Depends(get_current_user),db :Session = Depends(get_db)):
+def delete_note(id: int,user= Depends(get_current_principal),db :Session = Depends(get_db)):
     return note_service.delete_note(db, note_id=id,user_id=user.id)
 
 # ════════════════════════════════════════════
@@ -99,70 +175,111 @@ def delete_note(id: int,user= Depends(get_current_user),db :Session = Depends(ge
 # ════════════════════════════════════════════
 # - response_model=list[NoteResponse] tells FastAPI to return a JSON array
 # - Only returns notes belonging to the authenticated user (user_id filter)
-@router.get("/notes",response_model=PaginatedNoteResponse,status_code=200)
+@router.get("/notes",response_model=NoteListResponse,status_code=200)
 def get_my_notes(
     cursor: int | None = None,
     limit: int = 20,
     note_type: str | None = None,
-    user= Depends(get_current_user),
+    fields: ListFields = "full",
+    user= Depends(get_current_principal),
     db :Session = Depends(get_db),
 ):
-    return note_service.get_my_notes(
+    page = note_service.get_my_notes(
         db,
         user_id=user.id,
         cursor=cursor,
-        limit=_clamp_limit(limit),
+        limit=clamp_limit(limit),
         note_type=note_type,
+        summary=fields == "summary",
     )
+    return _project(page, fields, PaginatedNoteSummaryResponse)
 
 # ════════════════════════════════════════════
 #  GET /notes/community — List community notes
 # ════════════════════════════════════════════
 # - Requires authentication (internal feed)
 # - Returns all notes with is_community=True
-@router.get("/community", response_model=PaginatedCommunityNoteResponse, status_code=200)
+@router.get("/community", response_model=CommunityListResponse, status_code=200)
 def get_community_notes(
     cursor: int | None = None,
     limit: int = 20,
+    fields: ListFields = "full",
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(get_current_principal),
 ):
-    return note_service.get_community_notes(
+    page = note_service.get_community_notes(
         db,
         cursor=cursor,
-        limit=_clamp_limit(limit),
+        limit=clamp_limit(limit),
         viewer_id=user.id,
+        summary=fields == "summary",
     )
+    return _project(page, fields, PaginatedCommunityNoteSummaryResponse)
 
 
-@router.get("/search", response_model=PaginatedNoteResponse, status_code=200)
+@router.get("/search", response_model=SearchResponse, status_code=200)
 @limiter.limit("30/minute")
 def search_notes(
     request: Request,
     response: Response,
     q: str,
-    cursor: int | None = None,
+    cursor: str | None = None,
     limit: int = 20,
     note_type: str | None = None,
     tag: str | None = None,
     language: str | None = None,
-    user=Depends(get_current_user),
+    fields: ListFields = "full",
+    highlight: bool = False,
+    mode: SearchMode = "fulltext",
+    facets: bool = False,
+    user=Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    return note_service.search_notes(
+    page = note_service.search_notes(
         db,
         user_id=user.id,
         query=q,
         cursor=cursor,
-        limit=_clamp_limit(limit),
+        limit=clamp_limit(limit),
         note_type=note_type,
         tag=tag,
         language=language,
+        summary=fields == "summary",
+        highlight=highlight,
+        mode=mode,
+        facets=facets,
     )
+    return _project_search(page, fields, highlight)
+
+
+@router.get("/ask", response_class=StreamingResponse, status_code=200)
+@limiter.limit("30/minute")
+def ask(
+    request: Request,
+    q: str,
+    note_type: str | None = None,
+    limit: int = 8,
+    user=Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    def events():
+        count = 0
+        for stage, score, note in note_service.ask_sources(
+            db,
+            user_id=user.id,
+            question=q,
+            note_type=note_type,
+            limit=clamp_limit(limit),
+        ):
+            count += 1
+            yield _source_event(stage, score, note)
+        yield _done_event(count)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_SSE_HEADERS)
 
 
 @router.get("/{id}/versions", response_model=list[NoteVersionSummaryResponse], status_code=200)
-def get_note_versions(id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+def get_note_versions(id: int, user=Depends(get_current_principal), db: Session = Depends(get_db)):
     return note_service.get_note_versions(db, user_id=user.id, note_id=id)
 
 
@@ -170,7 +287,7 @@ def get_note_versions(id: int, user=Depends(get_current_user), db: Session = Dep
 def get_note_version(
     id: int,
     version_id: int,
-    user=Depends(get_current_user),
+    user=Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     return note_service.get_note_version(
@@ -182,7 +299,7 @@ def get_note_version(
 
 
 @router.post("/{id}/like", response_model=LikeToggleResponse, status_code=200)
-def toggle_like(id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+def toggle_like(id: int, user=Depends(get_current_principal), db: Session = Depends(get_db)):
     return note_service.toggle_like(db, user_id=user.id, note_id=id)
 
 # ════════════════════════════════════════════
@@ -191,7 +308,7 @@ def toggle_like(id: int, user=Depends(get_current_user), db: Session = Depends(g
 # - Used by the edit page to fetch note data before editing
 # - Service layer returns 404 if not found, 403 if not the owner
 @router.get("/{id}",response_model=NoteResponse,status_code=200)
-def get_note(id: int, user= Depends(get_current_user),db : Session = Depends(get_db)):
+def get_note(id: int, user= Depends(get_current_principal),db : Session = Depends(get_db)):
     return note_service.get_note(db, note_id=id,user_id=user.id)
 
 # ════════════════════════════════════════════
@@ -200,7 +317,7 @@ def get_note(id: int, user= Depends(get_current_user),db : Session = Depends(get
 # - Flips is_pinned: true → false, false → true
 # - Pinned notes are sorted to the top on the frontend
 @router.patch("/{id}/pin", response_model=NoteResponse, status_code=200)
-def pin_note(id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+def pin_note(id: int, user=Depends(get_current_principal), db: Session = Depends(get_db)):
     return note_service.toggle_pin(db, note_id=id, user_id=user.id)
 
 # ════════════════════════════════════════════
@@ -209,9 +326,25 @@ def pin_note(id: int, user=Depends(get_current_user), db: Session = Depends(get_
 # - No authentication required
 # - Returns note data if share_uuid matches AND is_published=True
 # - Uses PublicNoteResponse to avoid leaking user_id
+# - Sends a weak ETag; If-None-Match hits on a cached page get a 304
+#   before any DB work (the session from get_db is never checked out)
 @router.get("/public/{share_uuid}", response_model=PublicNoteResponse, status_code=200)
-def get_public_note(share_uuid: str, db: Session = Depends(get_db)):
-    return note_service.get_public_note(db, share_uuid=share_uuid)
+def get_public_note(
+    share_uuid: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    if_none_match = request.headers.get("if-none-match")
+    etag = note_service.public_note_not_modified(share_uuid, if_none_match)
+    if etag:
+        return not_modified(etag)
+    note = note_service.get_public_note(db, share_uuid=share_uuid)
+    etag = public_note_etag(note)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return note
 
 
 @router.get(
@@ -227,5 +360,164 @@ def get_related_public_notes(
     return note_service.get_related_public_notes(
         db,
         share_uuid=share_uuid,
-        limit=_clamp_limit(limit),
+        limit=clamp_limit(limit),
+    )
+
+
+# ════════════════════════════════════════════
+#  Async read path (DB_ASYNC_MODE)
+# ════════════════════════════════════════════
+# Same paths, schemas and services as above. Each handler hands the sync
+# service to db.run_sync(), so business rules live in exactly one place.
+# Declaration order matters: /notes, /community and /search must come
+# before /{id} or "/notes/search" would be captured as id="search".
+async_router = APIRouter(prefix="/notes", tags=["notes"])
+
+
+@async_router.get("/notes", response_model=NoteListResponse, status_code=200)
+async def get_my_notes_async(
+    cursor: int | None = None,
+    limit: int = 20,
+    note_type: str | None = None,
+    fields: ListFields = "full",
+    user=Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    page = await db.run_sync(
+        note_service.get_my_notes,
+        user_id=user.id,
+        cursor=cursor,
+        limit=clamp_limit(limit),
+        note_type=note_type,
+        summary=fields == "summary",
+    )
+    return _project(page, fields, PaginatedNoteSummaryResponse)
+
+
+@async_router.get("/community", response_model=CommunityListResponse, status_code=200)
+async def get_community_notes_async(
+    cursor: int | None = None,
+    limit: int = 20,
+    fields: ListFields = "full",
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_principal_async),
+):
+    page = await db.run_sync(
+        note_service.get_community_notes,
+        cursor=cursor,
+        limit=clamp_limit(limit),
+        viewer_id=user.id,
+        summary=fields == "summary",
+    )
+    return _project(page, fields, PaginatedCommunityNoteSummaryResponse)
+
+
+@async_router.get("/search", response_model=SearchResponse, status_code=200)
+@limiter.limit("30/minute")
+async def search_notes_async(
+    request: Request,
+    response: Response,
+    q: str,
+    cursor: str | None = None,
+    limit: int = 20,
+    note_type: str | None = None,
+    tag: str | None = None,
+    language: str | None = None,
+    fields: ListFields = "full",
+    highlight: bool = False,
+    mode: SearchMode = "fulltext",
+    facets: bool = False,
+    user=Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    page = await db.run_sync(
+        note_service.search_notes,
+        user_id=user.id,
+        query=q,
+        cursor=cursor,
+        limit=clamp_limit(limit),
+        note_type=note_type,
+        tag=tag,
+        language=language,
+        summary=fields == "summary",
+        highlight=highlight,
+        mode=mode,
+        facets=facets,
+    )
+    return _project_search(page, fields, highlight)
+
+
+@async_router.get("/ask", response_class=StreamingResponse, status_code=200)
+@limiter.limit("30/minute")
+async def ask_async(
+    request: Request,
+    q: str,
+    note_type: str | None = None,
+    limit: int = 8,
+    user=Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def events():
+        sources = []
+        if q.strip():
+            for stage in note_service.ASK_STAGES:
+                found = await db.run_sync(
+                    note_service.ask_stage,
+                    stage=stage,
+                    user_id=user.id,
+                    question=q,
+                    sources=sources,
+                    note_type=note_type,
+                    limit=clamp_limit(limit),
+                )
+                for score, note in found:
+                    sources.append(note)
+                    yield _source_event(stage, score, note)
+        yield _done_event(len(sources))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
+@async_router.get("/{id}", response_model=NoteResponse, status_code=200)
+async def get_note_async(
+    id: int,
+    user=Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(note_service.get_note, note_id=id, user_id=user.id)
+
+
+@async_router.get("/public/{share_uuid}", response_model=PublicNoteResponse, status_code=200)
+async def get_public_note_async(
+    share_uuid: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if_none_match = request.headers.get("if-none-match")
+    etag = note_service.public_note_not_modified(share_uuid, if_none_match)
+    if etag:
+        return not_modified(etag)
+    note = await db.run_sync(note_service.get_public_note, share_uuid=share_uuid)
+    etag = public_note_etag(note)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return note
+
+
+@async_router.get(
+    "/public/{share_uuid}/related",
+    response_model=list[RelatedPublicNoteResponse],
+    status_code=200,
+)
+async def get_related_public_notes_async(
+    share_uuid: str,
+    limit: int = 3,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        note_service.get_related_public_notes,
+        share_uuid=share_uuid,
+        limit=clamp_limit(limit),
     )
@@ -1,14 +1,98 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.schemas.profile import PublicProfileResponse
+from app.dependencies import get_async_db, get_db
+from app.pagination import clamp_limit
+from app.schemas.profile import PaginatedPublicProfileNoteResponse, PublicProfileResponse
 from app.services import profile_service
+from app.services.response_cache import (
+    cache_headers,
+    etag_matches,
+    not_modified,
+    public_profile_etag,
+)
 
 
 router = APIRouter(tags=["profiles"])
 
 
 @router.get("/u/{username}", response_model=PublicProfileResponse, status_code=200)
-def get_public_profile(username: str, db: Session = Depends(get_db)):
-    return profile_service.get_public_profile(db, username=username)
+def get_public_profile(
+    username: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    # Conditional GETs on a cached profile are answered before any DB work.
+    if_none_match = request.headers.get("if-none-match")
+    etag = profile_service.public_profile_not_modified(username, if_none_match)
+    if etag:
+        return not_modified(etag)
+    profile = profile_service.get_public_profile(db, username=username)
+    etag = public_profile_etag(profile)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return profile
+
+
+@router.get(
+    "/u/{username}/notes",
+    response_model=PaginatedPublicProfileNoteResponse,
+    status_code=200,
+)
+def get_public_profile_notes(
+    username: str,
+    cursor: int | None = None,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    return profile_service.get_public_profile_notes(
+        db,
+        username=username,
+        cursor=cursor,
+        limit=clamp_limit(limit),
+    )
+
+
+# Mounted ahead of `router` when DB_ASYNC_MODE is on (see main.py).
+async_router = APIRouter(tags=["profiles"])
+
+
+@async_router.get("/u/{username}", response_model=PublicProfileResponse, status_code=200)
+async def get_public_profile_async(
+    username: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if_none_match = request.headers.get("if-none-match")
+    etag = profile_service.public_profile_not_modified(username, if_none_match)
+    if etag:
+        return not_modified(etag)
+    profile = await db.run_sync(profile_service.get_public_profile, username=username)
+    etag = public_profile_etag(profile)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return profile
+
+
+@async_router.get(
+    "/u/{username}/notes",
+    response_model=PaginatedPublicProfileNoteResponse,
+    status_code=200,
+)
+async def get_public_profile_notes_async(
+    username: str,
+    cursor: int | None = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        profile_service.get_public_profile_notes,
+        username=username,
+        cursor=cursor,
+        limit=clamp_limit(limit),
+    )
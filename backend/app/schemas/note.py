@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from urllib.parse import urlparse
 
@@ -95,6 +96,27 @@ class NoteResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class NoteSummaryResponse(BaseModel):
+    """NoteResponse for list views: the stored excerpt instead of content."""
+
+    id: int
+    user_id: int
+    title: str
+    excerpt: str | None = None
+    tags: list[str] = Field(default_factory=list)
+    note_type: str = "note"
+    language: str | None = None
+    source_url: str | None = None
+    is_pinned: bool = False
+    share_uuid: str | None = None
+    is_published: bool = False
+    is_community: bool = False
+    created_at: datetime
+    updated_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class CommunityNoteResponse(BaseModel):
     id: int
     author_name: str
@@ -118,6 +140,29 @@ class CommunityNoteResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommunityNoteSummaryResponse(BaseModel):
+    id: int
+    author_name: str
+    author_username: str | None = None
+    liked_by_me: bool = False
+    title: str
+    excerpt: str | None = None
+    tags: list[str] = Field(default_factory=list)
+    note_type: str = "note"
+    language: str | None = None
+    source_url: str | None = None
+    is_pinned: bool = False
+    share_uuid: str | None = None
+    is_published: bool = False
+    is_community: bool = False
+    like_count: int = 0
+    view_count: int = 0
+    created_at: datetime
+    updated_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PublicNoteResponse(BaseModel):
     title: str
     content: str
@@ -166,6 +211,88 @@ class PaginatedCommunityNoteResponse(BaseModel):
     next_cursor: int | None = None
 
 
+class SearchHitResponse(BaseModel):
+    """A search result card: highlighted headline and rank instead of content.
+
+    `headline` is HTML-escaped note text in which matches are wrapped in
+    <mark></mark>, so it can be rendered as markup as-is.
+    """
+
+    id: int
+    user_id: int
+    title: str
+    headline: str = ""
+    score: float = 0.0
+    tags: list[str] = Field(default_factory=list)
+    note_type: str = "note"
+    language: str | None = None
+    source_url: str | None = None
+    is_pinned: bool = False
+    share_uuid: str | None = None
+    is_published: bool = False
+    is_community: bool = False
+    created_at: datetime
+    updated_at: datetime | None = None
+
+
+class FacetCountResponse(BaseModel):
+    value: str
+    count: int
+
+
+class SearchFacetsResponse(BaseModel):
+    """Match counts for /notes/search?facets=true, most matches first.
+
+    Counted over every note the query matches with the request's filters
+    applied, not just the returned page. `tags` holds the most common ones
+    only (SEARCH_FACET_TAGS).
+    """
+
+    note_type: list[FacetCountResponse] = Field(default_factory=list)
+    tags: list[FacetCountResponse] = Field(default_factory=list)
+    language: list[FacetCountResponse] = Field(default_factory=list)
+
+
+class PaginatedSearchHitResponse(BaseModel):
+    data: list[SearchHitResponse]
+    next_cursor: str | None = None
+    facets: SearchFacetsResponse | None = None
+
+
+class PaginatedNoteSummaryResponse(BaseModel):
+    data: list[NoteSummaryResponse]
+    next_cursor: int | None = None
+
+
+class PaginatedCommunityNoteSummaryResponse(BaseModel):
+    data: list[CommunityNoteSummaryResponse]
+    next_cursor: int | None = None
+
+
+# Search pages are ordered by rank, so their cursor is an opaque (rank, id)
+# token rather than a bare note id.
+class PaginatedNoteSearchResponse(PaginatedNoteResponse):
+    next_cursor: str | None = None
+    facets: SearchFacetsResponse | None = None
+
+
+class PaginatedNoteSummarySearchResponse(PaginatedNoteSummaryResponse):
+    next_cursor: str | None = None
+    facets: SearchFacetsResponse | None = None
+
+
+class AskSourceResponse(NoteResponse):
+    """One `source` event of GET /notes/ask.
+
+    `stage` says how the note was found: a full-text hit, a prefix/trigram
+    (fuzzy) match, or a note sharing tags with the sources above it. `score`
+    is only comparable within a stage.
+    """
+
+    stage: Literal["lexical", "fuzzy", "related"]
+    score: float | None = None
+
+
 class NoteVersionSummaryResponse(BaseModel):
     id: int
     version_number: int
@@ -6,7 +6,8 @@ from pydantic import BaseModel, Field
 class PublicProfileNoteResponse(BaseModel):
     id: int
     title: str
-    content: str
+    excerpt: str = ""
+    content_length: int = 0
     share_uuid: str
     tags: list[str] = Field(default_factory=list)
     note_type: str = "note"
@@ -27,4 +28,14 @@ class PublicProfileResponse(BaseModel):
     twitter_url: str | None = None
     avatar_url: str | None = None
     created_at: datetime
+    updated_at: datetime | None = None
+    note_count: int = 0
+    like_count: int = 0
+    view_count: int = 0
     public_notes: list[PublicProfileNoteResponse] = Field(default_factory=list)
+    next_cursor: int | None = None
+
+
+class PaginatedPublicProfileNoteResponse(BaseModel):
+    data: list[PublicProfileNoteResponse]
+    next_cursor: int | None = None
@@ -0,0 +1,252 @@
+"""
+In-process inverted index for the non-Postgres search fallback.
+
+On SQLite/dev there is no tsvector, so note_repo used to pull a capped set of
+ILIKE candidates and rescore their text in Python on every query. Instead,
+each user's notes are tokenized once into postings (term → note → field →
+positions); a query then touches only the postings of its terms and ranks
+exactly the matching notes with BM25F.
+
+Indexes are built lazily on a user's first fallback search and kept in a
+TTLCache (per worker, like app/cache.py): note_repo applies its own writes
+incrementally, and the TTL bounds how stale another worker's copy can get.
+Postgres never builds one.
+"""
+import bisect
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.cache import TTLCache
+from app.config import get_settings
+
+
+# The one definition of a search token: words plus the #, +, . and - that
+# developer terms carry (c#, c++, node.js, docker-compose). Retrieval, the
+# query parser, the fallback scorer and the hashing embedder all use it.
+_TOKEN = re.compile(r"[\w#+.-]+")
+
+# Same ordering as note_repo.SEARCH_RANK_WEIGHTS ({D, C, B, A} → body,
+# type/language, tags, title), scaled so a body hit counts 1.
+FIELD_WEIGHTS = {"title": 10.0, "tags": 4.0, "meta": 2.0, "body": 1.0}
+# A multi-term query found as consecutive words in title or body.
+PHRASE_BOOST = {"title": 1.5, "body": 1.2}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercased search tokens of `text`."""
+    return _TOKEN.findall((text or "").lower())
+
+
+@dataclass
+class IndexedNote:
+    id: int
+    tags: frozenset[str]
+    note_type: str | None
+    language: str | None
+    # coalesce(updated_at, created_at), what updated: clauses compare.
+    edited_at: datetime | None
+    lengths: dict[str, int]
+    terms: set[str] = field(default_factory=set)
+
+
+class UserSearchIndex:
+    """One user's notes. Thread-safe; writes and searches may interleave."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[int, dict[str, list[int]]]] = {}
+        self._notes: dict[int, IndexedNote] = {}
+        self._field_totals = dict.fromkeys(FIELD_WEIGHTS, 0)
+        self._vocabulary: list[str] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, notes) -> "UserSearchIndex":
+        index = cls()
+        for note in notes:
+            index.add(note)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def notes(self, note_ids) -> list[IndexedNote]:
+        """The indexed copies of `note_ids` (unknown ids are skipped)."""
+        with self._lock:
+            return [self._notes[note_id] for note_id in note_ids if note_id in self._notes]
+
+    def add(self, note) -> None:
+        """Indexes `note` (anything with the Note search columns), replacing any earlier copy."""
+        fields = {
+            "title": tokenize(note.title),
+            "tags": [token for tag in (note.tags or []) for token in tokenize(tag)],
+            "meta": tokenize(f"{note.note_type or ''} {note.language or ''}"),
+            "body": tokenize(note.content),
+        }
+        indexed = IndexedNote(
+            id=note.id,
+            tags=frozenset(tag.lower() for tag in (note.tags or [])),
+            note_type=note.note_type,
+            language=note.language.lower() if note.language else None,
+            edited_at=_utc(note.updated_at or note.created_at),
+            lengths={name: len(tokens) for name, tokens in fields.items()},
+        )
+        with self._lock:
+            self._remove(note.id)
+            for name, tokens in fields.items():
+                self._field_totals[name] += len(tokens)
+                for position, token in enumerate(tokens):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = {}
+                        self._vocabulary = None
+                    postings.setdefault(note.id, {}).setdefault(name, []).append(position)
+                    indexed.terms.add(token)
+            self._notes[note.id] = indexed
+
+    def remove(self, note_id: int) -> None:
+        with self._lock:
+            self._remove(note_id)
+
+    def _remove(self, note_id: int) -> None:
+        indexed = self._notes.pop(note_id, None)
+        if indexed is None:
+            return
+        for name, length in indexed.lengths.items():
+            self._field_totals[name] -= length
+        for token in indexed.terms:
+            postings = self._postings[token]
+            del postings[note_id]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+
+    def _expand(self, term: str) -> list[str]:
+        """Indexed tokens starting with `term`, so partial words still match."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\U0010ffff")
+        return self._vocabulary[start:end]
+
+    def _with_phrase(self, tokens: list[str]) -> set[int]:
+        """Notes holding `tokens` as consecutive words of one field (exact tokens)."""
+        postings = [self._postings.get(token) for token in tokens]
+        if not all(postings):
+            return set()
+        if len(postings) == 1:
+            return set(postings[0])
+        shared = set(postings[0]).intersection(*postings[1:])
+        return {
+            note_id
+            for note_id in shared
+            if any(_has_phrase([by_note[note_id] for by_note in postings], name) for name in FIELD_WEIGHTS)
+        }
+
+    def search(
+        self,
+        terms: list[str],
+        tags: list[str] = (),
+        note_type: str | None = None,
+        language: str | None = None,
+        phrases: list[list[str]] = (),
+        excluded: list[list[str]] = (),
+        updated_from: datetime | None = None,
+        updated_until: datetime | None = None,
+    ) -> list[tuple[float, int]]:
+        """(score, note_id) for every note matching any term, unordered.
+
+        Notes must also pass every filter, contain each phrase and none of
+        the `excluded` words/phrases. Without terms, every note passing
+        those checks is returned with score 0.
+        """
+        wanted_tags = {tag.lower() for tag in tags}
+        updated_from, updated_until = _utc(updated_from), _utc(updated_until)
+        with self._lock:
+            allowed = {
+                note.id
+                for note in self._notes.values()
+                if wanted_tags <= note.tags
+                and (not note_type or note.note_type == note_type)
+                and (not language or note.language == language.lower())
+                and (not updated_from or (note.edited_at is not None and note.edited_at >= updated_from))
+                and (not updated_until or (note.edited_at is not None and note.edited_at < updated_until))
+            }
+            for tokens in phrases:
+                allowed &= self._with_phrase(tokens)
+            for tokens in excluded:
+                allowed -= self._with_phrase(tokens)
+            if not allowed:
+                return []
+            if not terms:
+                return [(0.0, note_id) for note_id in allowed]
+
+            total = len(self._notes)
+            averages = {name: count / total or 1.0 for name, count in self._field_totals.items()}
+            scores: dict[int, float] = {}
+            # Per note: term index → field → positions, for the phrase check.
+            hits: dict[int, list[dict[str, list[int]]]] = {}
+
+            for term_index, term in enumerate(terms):
+                matched: dict[int, dict[str, list[int]]] = {}
+                for token in self._expand(term):
+                    for note_id, positions in self._postings[token].items():
+                        by_field = matched.setdefault(note_id, {})
+                        for name, found in positions.items():
+                            by_field.setdefault(name, []).extend(found)
+
+                # Document frequency over all of the user's notes, so a filter
+                # does not change how rare a term looks.
+                idf = math.log(1 + (total - len(matched) + 0.5) / (len(matched) + 0.5))
+                for note_id, by_field in matched.items():
+                    if note_id not in allowed:
+                        continue
+                    lengths = self._notes[note_id].lengths
+                    weighted = sum(
+                        FIELD_WEIGHTS[name] * len(found)
+                        / (1 - BM25_B + BM25_B * lengths[name] / averages[name])
+                        for name, found in by_field.items()
+                    )
+                    scores[note_id] = scores.get(note_id, 0.0) + idf * weighted * (BM25_K1 + 1) / (
+                        weighted + BM25_K1
+                    )
+                    hits.setdefault(note_id, [{} for _ in terms])[term_index] = by_field
+
+        if len(terms) > 1:
+            for note_id, per_term in hits.items():
+                boost = max(
+                    (factor for name, factor in PHRASE_BOOST.items() if _has_phrase(per_term, name)),
+                    default=1.0,
+                )
+                scores[note_id] *= boost
+        return [(score, note_id) for note_id, score in scores.items()]
+
+
+def _utc(moment: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes; they are stored in UTC.
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def _has_phrase(per_term: list[dict[str, list[int]]], name: str) -> bool:
+    """True when the terms occur at consecutive positions of field `name`."""
+    positions = [set(by_field.get(name, ())) for by_field in per_term]
+    return any(
+        all(start + offset in positions[offset] for offset in range(1, len(positions)))
+        for start in positions[0]
+    )
+
+
+_settings = get_settings()
+
+# user_id → UserSearchIndex. Size 0 disables the index; the fallback then
+# scans ILIKE candidates instead.
+fallback_search_index = TTLCache(
+    maxsize=_settings.SEARCH_INDEX_SIZE,
+    ttl=_settings.SEARCH_INDEX_TTL_SECONDS,
+)
@@ -0,0 +1,176 @@
+"""
+Structured /notes/search queries.
+
+    tag:docker lang:python type:snippet "compose file" -deprecated updated:>2026-01
+
+parse_query() splits the q= string into field clauses and free text. Free
+text keeps websearch semantics: bare words, "quoted phrases" and -excluded
+words or phrases. Field clauses become filters, which note_repo plans onto
+their own indexes (see note_repo._search_base_query) on Postgres and the
+fallback alike.
+
+    tag:x / tags:x       note carries tag x (repeatable, all required)
+    type:x               note_type = x, case-insensitive
+    lang:x / language:x  language = x, case-insensitive
+    updated:2026-01      last edited within that year/month/day; prefix it
+                         with >, >=, < or <= for an open range
+
+Anything that is not a valid clause (an unknown field, a bad date, a
+negated field) stays free text, so a query never fails to parse.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.search_index import tokenize
+
+
+# An optional "-", an optional "field:", then a "quoted run" or a bare word.
+_CHUNK = re.compile(r'(-?)(?:([A-Za-z]+):(?=\S))?(?:"([^"]*)"?|(\S+))')
+_UPDATED = re.compile(r"(>=|<=|>|<)?(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?")
+
+
+@dataclass
+class SearchQuery:
+    words: list[str] = field(default_factory=list)
+    phrases: list[str] = field(default_factory=list)
+    excluded: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    note_type: str | None = None
+    language: str | None = None
+    # [updated_from, updated_until) over coalesce(updated_at, created_at).
+    updated_from: datetime | None = None
+    updated_until: datetime | None = None
+
+    @property
+    def terms(self) -> list[str]:
+        """Tokens of the bare words; what prefix matching and the fallback score."""
+        return tokenize(" ".join(self.words))
+
+    @property
+    def phrase_terms(self) -> list[list[str]]:
+        return [tokens for tokens in map(tokenize, self.phrases) if tokens]
+
+    @property
+    def excluded_terms(self) -> list[list[str]]:
+        return [tokens for tokens in map(tokenize, self.excluded) if tokens]
+
+    @property
+    def scoring_terms(self) -> list[str]:
+        """Every positive token, phrase words included."""
+        return self.terms + [term for tokens in self.phrase_terms for term in tokens]
+
+    @property
+    def has_text(self) -> bool:
+        return bool(self.scoring_terms or self.excluded_terms)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.has_text and not self.has_filters
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(
+            self.tags or self.note_type or self.language or self.updated_from or self.updated_until
+        )
+
+    def websearch_text(self, words: bool = True) -> str:
+        """The free text in websearch_to_tsquery syntax, without the field clauses."""
+        return " ".join(
+            (self.words if words else [])
+            + [f'"{phrase}"' for phrase in self.phrases]
+            + [f'-"{excluded}"' for excluded in self.excluded]
+        )
+
+
+def _period(year: str, month: str | None, day: str | None) -> tuple[datetime, datetime] | None:
+    """[start, end) of the year, month or day written, in UTC."""
+    try:
+        start = datetime(int(year), int(month or 1), int(day or 1), tzinfo=timezone.utc)
+        if day:
+            end = datetime.fromordinal(start.toordinal() + 1).replace(tzinfo=timezone.utc)
+        elif month:
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        else:
+            end = start.replace(year=start.year + 1)
+    except ValueError:
+        return None
+    return start, end
+
+
+def _apply_updated(query: SearchQuery, value: str) -> bool:
+    match = _UPDATED.fullmatch(value)
+    period = match and _period(*match.group(2, 3, 4))
+    if not period:
+        return False
+    start, end = period
+    operator = match.group(1)
+    if operator in (None, ">="):
+        query.updated_from = start
+    if operator in (None, "<"):
+        query.updated_until = start if operator else end
+    if operator == ">":
+        query.updated_from = end
+    if operator == "<=":
+        query.updated_until = end
+    return True
+
+
+def _apply_clause(query: SearchQuery, name: str, value: str) -> bool:
+    value = value.strip()
+    if not value:
+        return False
+    if name in ("tag", "tags"):
+        query.tags.append(value.lower())
+    elif name == "type":
+        # Stored note types are lowercase (schemas.note), and the search
+        # cache key lowercases the whole query.
+        query.note_type = value.lower()
+    elif name in ("lang", "language"):
+        query.language = value.lower()
+    elif name == "updated":
+        return _apply_updated(query, value)
+    else:
+        return False
+    return True
+
+
+def parse_query(
+    raw: str,
+    note_type: str | None = None,
+    tag: str | None = None,
+    language: str | None = None,
+) -> SearchQuery:
+    """Parses `raw`; explicit filter parameters are merged in.
+
+    An explicit note_type/language replaces the query's own clause, and an
+    explicit tag is required alongside any tag: clauses.
+    """
+    query = SearchQuery()
+    for match in _CHUNK.finditer(raw or ""):
+        negated, name, quoted, bare = match.groups()
+        value = quoted if quoted is not None else bare
+        if name and not negated and _apply_clause(query, name.lower(), value):
+            continue
+        if name:
+            text = f"{name}:{value}"
+        elif quoted is not None:
+            text = quoted.strip()
+        else:
+            text = value
+        if not text:
+            continue
+        if negated:
+            query.excluded.append(text)
+        elif quoted is not None and not name:
+            query.phrases.append(text)
+        else:
+            query.words.append(text)
+
+    if tag and tag.lower() not in query.tags:
+        query.tags.append(tag.lower())
+    if note_type:
+        query.note_type = note_type.lower()
+    if language:
+        query.language = language.lower()
+    return query
@@ -1,17 +1,16 @@
+from collections.abc import Callable
 from datetime import datetime, timezone, timedelta
 import re
 import uuid
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from app.config import get_settings
 from app.repositories import session_repo, user_repo
-from app.services.security import (
-    hash_password,
-    hash_token,
-    verify_password,
-    verify_token_hash,
-)
+from app.services.password_hasher import password_hasher
+from app.services.security import hash_token, verify_token_hash
+from app.session_cache import SessionRecord, session_cache
 from app.models.user import User
 
 REFRESH_TOKEN_EXPIRE_DAYS = 7
@@ -116,13 +115,21 @@ def verify_refresh_token(token: str) -> dict:
         raise JWTError("Invalid or expired refresh token") from e
     
 
-def register_user(db: Session, email: str, name: str, password: str) -> User:
+def _release_connection(db: Session | None) -> None:
+    """Ends the lookup's read transaction, returning its pooled connection
+    before a password hash runs; the next query checks one out again."""
+    if db is not None:
+        db.rollback()
+
+
+async def register_user(db: Session, email: str, name: str, password: str) -> User:
     """
     Registers a new user in the system.
 
     Business rules:
     1. Check if the email is already taken — reject duplicates (400).
-    2. Hash the plain-text password using bcrypt (never store plain text).
+    2. Hash the plain-text password using bcrypt (never store plain text),
+       in the password_hasher pool with no DB connection held.
     3. Persist the new user via the repository layer.
     4. Return the created User object (the router decides what to expose).
 
@@ -137,16 +144,22 @@ def register_user(db: Session, email: str, name: str, password: str) -> User:
 
     Raises:
         HTTPException 400: If the email is already registered.
+        HTTPException 503: If the password hasher is saturated.
     """
 
     # Check if email is already taken
-    existing_user = user_repo.get_by_email(db, email=email)
+    existing_user = await run_in_threadpool(user_repo.get_by_email, db, email=email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    
+    await run_in_threadpool(_release_connection, db)
+
     # Hash the Password
-    hashed_password = hash_password(password)  # "abc123" → "$2b$12$..."
+    hashed_password = await password_hasher.hash(password)  # "abc123" → "$2b$12$..."
+
+    return await run_in_threadpool(_create_user, db, name, email, hashed_password)
 
+
+def _create_user(db: Session, name: str, email: str, hashed_password: str) -> User:
     username = generate_unique_username(db, name)
 
     # Create the user with hashed password
@@ -159,7 +172,7 @@ def register_user(db: Session, email: str, name: str, password: str) -> User:
     )
     return db_user       # FastAPI filters this through UserResponse
 
-def authenticate_user(
+async def authenticate_user(
     db: Session,
     email: str,
     password: str,
@@ -173,7 +186,10 @@ def authenticate_user(
     Business rules:
     1. Look up the user by email — return a generic error if not found
        (never reveal whether the email exists).
-    2. Verify the plain-text password against the stored bcrypt hash.
+    2. Verify the plain-text password against the stored hash, in the
+       password_hasher pool with no DB connection held. If the hash uses
+       an outdated scheme or cost (PASSWORD_HASH_* settings), the same
+       call returns a fresh one, which is stored with the new session.
     3. Generate a signed JWT access token containing the user's ID.
     4. Return the token and its type.
 
@@ -187,35 +203,62 @@ def authenticate_user(
 
     Raises:
         HTTPException 401: If email is not found or password doesn't match.
+        HTTPException 503: If the password hasher is saturated.
     """
 
     # Find user by email
-    db_user = user_repo.get_by_email(db, email=email)
+    db_user = await run_in_threadpool(user_repo.get_by_email, db, email=email)
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    user_id, hashed_password = db_user.id, db_user.hashed_password
+    await run_in_threadpool(_release_connection, db)
 
     # Verify password against stored hash
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, hashed_password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    return await run_in_threadpool(
+        _start_session, db, user_id, user_agent, ip_address, remember_me, new_hash
+    )
+
+
+def _start_session(
+    db: Session,
+    user_id: int,
+    user_agent: str | None,
+    ip_address: str | None,
+    remember_me: bool,
+    new_password_hash: str | None = None,
+) -> dict:
     # Create JWT tokens with user ID. Refresh tokens also carry a session id
     # when a real DB session is available, enabling multi-device sessions.
     # "Remember me" only changes how long the refresh session lives — the
     # remember flag travels inside the refresh JWT so rotation preserves it.
     session_id = str(uuid.uuid4())
     expire_days = _refresh_expire_days(remember_me)
-    access_token = create_access_token({"sub": str(db_user.id)})
+    access_token = create_access_token({"sub": str(user_id)})
     refresh_token = create_refresh_token(
-        {"sub": str(db_user.id), "sid": session_id, "remember": remember_me},
+        {"sub": str(user_id), "sid": session_id, "remember": remember_me},
         expires_days=expire_days,
     )
-    user_repo.update_refresh_token(db, db_user.id, hash_token(refresh_token))
-    if db is not None:
+    refresh_token_hash = hash_token(refresh_token)
+    if db is None:
+        # No session store (the DB-less test clients): the legacy column is
+        # the only record of the token.
+        user_repo.update_refresh_token(db, user_id, refresh_token_hash)
+    else:
+        # One transaction: the optional rehash and legacy-column UPDATEs,
+        # then the session INSERT, which commits them all.
+        if new_password_hash is not None:
+            user_repo.update_password_hash(db, user_id, new_password_hash)
+        if get_settings().REFRESH_TOKEN_LEGACY_COLUMN:
+            user_repo.update_refresh_token(db, user_id, refresh_token_hash, commit=False)
         session_repo.create(
             db,
             session_id=session_id,
-            user_id=db_user.id,
-            refresh_token_hash=hash_token(refresh_token),
+            user_id=user_id,
+            refresh_token_hash=refresh_token_hash,
             expires_at=refresh_token_expires_at(expire_days),
             user_agent=user_agent,
             ip_address=ip_address,
@@ -230,7 +273,7 @@ def authenticate_user(
     }
 
 
-def refresh_access_token(db: Session, refresh_token: str) -> dict:
+def _decode_refresh_token(refresh_token: str) -> tuple[dict, int, str | None]:
     try:
         payload = verify_refresh_token(refresh_token)
         user_id = payload.get("sub")
@@ -239,43 +282,134 @@ def refresh_access_token(db: Session, refresh_token: str) -> dict:
         session_id = payload.get("sid")
     except JWTError as e:
         raise HTTPException(status_code=401, detail="Invalid refresh token") from e
+    return payload, int(user_id), str(session_id) if session_id else None
 
-    db_user = user_repo.get_by_id(db, user_id=int(user_id))
-    if not db_user:
+
+def _active_session(
+    db: Session,
+    session_id: str,
+    user_id: int,
+    refresh_token: str,
+    use_cache: bool = True,
+) -> SessionRecord:
+    """The token's live session, or 401. A stale (already-rotated) token
+    means reuse: the whole session is treated as compromised and revoked.
+
+    A cached record is returned only when the token matches it, and is not
+    trusted on its own: the guarded write the caller makes with it fails if
+    the row changed since (see _write_session).
+    """
+    if use_cache:
+        cached = session_cache.get(session_id)
+        if (
+            cached is not None
+            and cached.user_id == user_id
+            and verify_token_hash(refresh_token, cached.refresh_token_hash)
+        ):
+            return cached
+    generation = session_cache.generation(user_id)
+    active_session = session_repo.get_active(db, session_id=session_id)
+    if not active_session or active_session.user_id != user_id:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if not verify_token_hash(refresh_token, active_session.refresh_token_hash):
+        session_repo.revoke(db, session_id=session_id)
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    record = SessionRecord.from_session(active_session)
+    session_cache.set(record, generation)
+    return record
 
-    active_session = None
-    if session_id and db is not None:
-        active_session = session_repo.get_active(db, session_id=str(session_id))
-        if not active_session or active_session.user_id != db_user.id:
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-        if not verify_token_hash(refresh_token, active_session.refresh_token_hash):
-            # Reuse detected: a stale (already-rotated) token was presented,
-            # so treat the whole session as compromised.
-            session_repo.revoke(db, session=active_session)
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-    else:
-        if not verify_token_hash(refresh_token, db_user.refresh_token):
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+def _write_session(
+    db: Session,
+    session_id: str,
+    user_id: int,
+    refresh_token: str,
+    write: Callable[[SessionRecord], bool],
+) -> None:
+    """
+    Runs `write`, a guarded UPDATE that returns whether the row still held
+    the record's hash. On a cache hit that is usually one statement in
+    total. If the cached record was stale, the row is re-read from the
+    database — where a rotated-out token is caught as reuse — and the
+    write is retried once.
+    """
+    if write(_active_session(db, session_id, user_id, refresh_token)):
+        return
+    session_cache.forget(session_id)
+    if not write(_active_session(db, session_id, user_id, refresh_token, use_cache=False)):
+        # Lost a race with a concurrent rotation or revoke of this session.
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+
+def _legacy_user(db: Session, user_id: int, refresh_token: str) -> User:
+    """Checks a token issued before user_sessions against users.refresh_token."""
+    db_user = user_repo.get_by_id(db, user_id=user_id)
+    if not db_user or not verify_token_hash(refresh_token, db_user.refresh_token):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return db_user
+
+
+def refresh_access_token(db: Session, refresh_token: str) -> dict:
+    """
+    Rotates a refresh token. With a session id that is one guarded UPDATE
+    of the session when it is cached, plus a SELECT of it when not, in a
+    single transaction; the user row is not read (the session's user_id is
+    checked against the token instead, and deleting a user cascades to its
+    sessions).
+    """
+    payload, user_id, session_id = _decode_refresh_token(refresh_token)
+    has_session = bool(session_id) and db is not None
+    if not has_session:
+        _legacy_user(db, user_id, refresh_token)
 
     # Rotation preserves the remember-me choice made at login (sliding window):
     # the flag rides in the refresh JWT, so each rotation extends the session
     # by the same duration the user originally chose.
     remember_me = bool(payload.get("remember", False))
     expire_days = _refresh_expire_days(remember_me)
-    access_token = create_access_token({"sub": str(db_user.id)})
-    next_session_id = str(session_id or uuid.uuid4())
+    access_token = create_access_token({"sub": str(user_id)})
+    next_session_id = session_id or str(uuid.uuid4())
     new_refresh_token = create_refresh_token(
-        {"sub": str(db_user.id), "sid": next_session_id, "remember": remember_me},
+        {"sub": str(user_id), "sid": next_session_id, "remember": remember_me},
         expires_days=expire_days,
     )
-    user_repo.update_refresh_token(db, db_user.id, hash_token(new_refresh_token))
-    if active_session is not None:
-        session_repo.rotate(
+    new_token_hash = hash_token(new_refresh_token)
+    expires_at = refresh_token_expires_at(expire_days)
+    legacy_column = get_settings().REFRESH_TOKEN_LEGACY_COLUMN
+
+    if db is None:
+        user_repo.update_refresh_token(db, user_id, new_token_hash)
+    elif has_session:
+        _write_session(
             db,
-            session=active_session,
-            refresh_token_hash=hash_token(new_refresh_token),
-            expires_at=refresh_token_expires_at(expire_days),
+            session_id,
+            user_id,
+            refresh_token,
+            lambda record: session_repo.rotate(
+                db,
+                session_id=record.id,
+                user_id=user_id,
+                current_hash=record.refresh_token_hash,
+                refresh_token_hash=new_token_hash,
+                expires_at=expires_at,
+                commit=not legacy_column,
+            ),
+        )
+        if legacy_column:
+            user_repo.update_refresh_token(db, user_id, new_token_hash)
+    else:
+        # A pre-session token moves onto the session row its replacement
+        # names. The column is overwritten either way, so the old token
+        # stops working there.
+        user_repo.update_refresh_token(
+            db, user_id, new_token_hash if legacy_column else None, commit=False
+        )
+        session_repo.create(
+            db,
+            session_id=next_session_id,
+            user_id=user_id,
+            refresh_token_hash=new_token_hash,
+            expires_at=expires_at,
         )
     return {
         "access_token": access_token,
@@ -287,27 +421,24 @@ def refresh_access_token(db: Session, refresh_token: str) -> dict:
 
 
 def logout_refresh_token(db: Session, refresh_token: str) -> None:
-    try:
-        payload = verify_refresh_token(refresh_token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-        session_id = payload.get("sid")
-    except JWTError as e:
-        raise HTTPException(status_code=401, detail="Invalid refresh token") from e
+    _, user_id, session_id = _decode_refresh_token(refresh_token)
 
-    db_user = user_repo.get_by_id(db, user_id=int(user_id))
-    if not db_user:
-        raise HTTPException(status_code=401, detail="Invalid refresh token")
     if session_id and db is not None:
-        active_session = session_repo.get_active(db, session_id=str(session_id))
-        if not active_session or active_session.user_id != db_user.id:
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-        if not verify_token_hash(refresh_token, active_session.refresh_token_hash):
-            session_repo.revoke(db, session=active_session)
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-        session_repo.revoke(db, session=active_session)
+        legacy_column = get_settings().REFRESH_TOKEN_LEGACY_COLUMN
+        _write_session(
+            db,
+            session_id,
+            user_id,
+            refresh_token,
+            lambda record: session_repo.revoke(
+                db,
+                session_id=record.id,
+                refresh_token_hash=record.refresh_token_hash,
+                commit=not legacy_column,
+            ),
+        )
+        if legacy_column:
+            user_repo.update_refresh_token(db, user_id, None)
     else:
-        if not verify_token_hash(refresh_token, db_user.refresh_token):
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-    user_repo.update_refresh_token(db, db_user.id, None)
+        _legacy_user(db, user_id, refresh_token)
+        user_repo.update_refresh_token(db, user_id, None)
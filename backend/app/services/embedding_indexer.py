@@ -0,0 +1,133 @@
+"""
+Background indexer for note_embeddings.
+
+Embedding a note is CPU work the author should not wait for, so
+create_note/update_note only call schedule(); the lifespan task in main.py
+drains the queue with run_pending() on a worker thread, in batches of
+EMBEDDING_BATCH_SIZE. Until a note is indexed, hybrid search still finds it
+through the lexical half of the fusion.
+
+A batch is indexed in chunks, each committed on its own. When a chunk
+fails, its notes are retried one by one so a single bad note cannot hold
+back the rest; only the notes that still fail are re-queued, and a note
+that fails MAX_ATTEMPTS runs in a row is dropped (and logged) instead of
+failing every tick forever.
+
+scripts/backfill_embeddings.py calls index() directly for existing notes.
+"""
+import threading
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories import note_repo
+from app.services.embeddings import get_embedder, note_embedding_text
+from app.services.search_cache import search_result_cache
+
+
+class EmbeddingIndexer:
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, batch_size: int, session_factory=SessionLocal, embedder_factory=get_embedder) -> None:
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._embedder_factory = embedder_factory
+        self._pending: set[int] = set()
+        # note id → consecutive failed runs.
+        self._failures: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def schedule(self, note_ids: list[int]) -> None:
+        with self._lock:
+            self._pending.update(note_ids)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def run_pending(self) -> int:
+        """Embeds everything queued so far. Returns how many notes were written."""
+        with self._run_lock:
+            with self._lock:
+                batch, self._pending = self._pending, set()
+            if not batch:
+                return 0
+
+            note_ids = sorted(batch)
+            db = self._session_factory()
+            written = 0
+            failed: list[int] = []
+            error: Exception | None = None
+            try:
+                for start in range(0, len(note_ids), self.batch_size):
+                    chunk = note_ids[start:start + self.batch_size]
+                    try:
+                        written += self.index(db, chunk)
+                        continue
+                    except Exception as e:
+                        db.rollback()
+                        error = error or e
+                        if len(chunk) == 1:
+                            failed += chunk
+                            continue
+                    # Committed chunks stay written; isolate the bad note(s)
+                    # in this one.
+                    for note_id in chunk:
+                        try:
+                            written += self.index(db, [note_id])
+                        except Exception:
+                            db.rollback()
+                            failed.append(note_id)
+            finally:
+                db.close()
+
+            self._settle(note_ids, failed)
+            if error is not None:
+                raise error
+            return written
+
+    def _settle(self, note_ids: list[int], failed: list[int]) -> None:
+        """Re-queues failed notes until they reach MAX_ATTEMPTS."""
+        failed_ids = set(failed)
+        retry = []
+        with self._lock:
+            for note_id in note_ids:
+                if note_id not in failed_ids:
+                    self._failures.pop(note_id, None)
+                    continue
+                attempts = self._failures.get(note_id, 0) + 1
+                if attempts >= self.MAX_ATTEMPTS:
+                    self._failures.pop(note_id, None)
+                    print(
+                        f"Embedding note {note_id} failed {attempts} times; dropped "
+                        "(scripts/backfill_embeddings.py picks it up later)"
+                    )
+                else:
+                    self._failures[note_id] = attempts
+                    retry.append(note_id)
+        self.schedule(retry)
+
+    def index(self, db, note_ids: list[int]) -> int:
+        """Embeds and stores one batch of notes. Deleted ids are skipped."""
+        rows = note_repo.get_notes_for_embedding(db, note_ids)
+        if not rows:
+            return 0
+        embedder = self._embedder_factory()
+        vectors = embedder.embed(
+            [
+                note_embedding_text(row.title, row.tags, row.note_type, row.language, row.content)
+                for row in rows
+            ]
+        )
+        note_repo.replace_embeddings(
+            db,
+            model=embedder.name,
+            embeddings=[(row.id, row.user_id, vector) for row, vector in zip(rows, vectors)],
+        )
+        # Cached hybrid rankings were computed without these vectors.
+        for user_id in {row.user_id for row in rows}:
+            search_result_cache.bump(user_id)
+        return len(rows)
+
+
+embedding_indexer = EmbeddingIndexer(batch_size=get_settings().EMBEDDING_BATCH_SIZE)
@@ -0,0 +1,109 @@
+"""
+Embedding providers for the vector half of hybrid search.
+
+An embedder turns text into a fixed-length vector whose cosine similarity
+approximates semantic closeness. Providers are chosen by EMBEDDING_PROVIDER:
+either a registered name ("hashing") or an import path "package.module:Factory"
+for a custom one. A factory is called with `dimensions=` and must return an
+object with `name`, `dimensions` and `embed(texts) -> list[list[float]]`.
+
+The default, HashingEmbedder, is deterministic and fully local: no model
+download and no network call, so it is safe to run inside the API process.
+"""
+import hashlib
+import importlib
+import math
+from functools import lru_cache
+from typing import Callable, Protocol
+
+from app.config import get_settings
+from app.search_index import tokenize
+
+
+class Embedder(Protocol):
+    # Stored in note_embeddings.model; vectors from different names are never compared.
+    name: str
+    dimensions: int
+
+    def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder.
+
+    Words, adjacent-word pairs and character trigrams are hashed into signed
+    buckets, log-scaled and L2-normalized. blake2b keeps bucket assignment
+    stable across processes (unlike hash()), so stored vectors stay valid
+    after a restart. Trigrams give some tolerance for inflections and typos.
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        words = tokenize(text)
+        for feature, weight in self._features(words):
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * weight
+
+        vector = [math.copysign(math.log1p(abs(value)), value) for value in vector]
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            return vector
+        return [value / norm for value in vector]
+
+    @staticmethod
+    def _features(words: list[str]):
+        for index, word in enumerate(words):
+            yield f"w:{word}", 1.0
+            if index + 1 < len(words):
+                yield f"b:{word} {words[index + 1]}", 0.5
+            padded = f"^{word}$"
+            for start in range(len(padded) - 2):
+                yield f"c:{padded[start:start + 3]}", 0.25
+
+
+_PROVIDERS: dict[str, Callable[..., Embedder]] = {
+    "hashing": HashingEmbedder,
+}
+
+
+def _resolve_factory(provider: str) -> Callable[..., Embedder]:
+    if ":" in provider:
+        module_name, attribute = provider.split(":", 1)
+        return getattr(importlib.import_module(module_name), attribute)
+    try:
+        return _PROVIDERS[provider]
+    except KeyError:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}") from None
+
+
+@lru_cache()
+def get_embedder() -> Embedder:
+    """The configured embedder, built once per process."""
+    settings = get_settings()
+    return _resolve_factory(settings.EMBEDDING_PROVIDER)(dimensions=settings.EMBEDDING_DIMENSIONS)
+
+
+def note_embedding_text(
+    title: str,
+    tags: list[str] | None,
+    note_type: str | None,
+    language: str | None,
+    content: str | None,
+    max_chars: int = 20000,
+) -> str:
+    """The text a note is embedded from. Content is capped; the head of a note
+    carries most of its topic and the tail would only dilute the vector."""
+    header = " ".join(part for part in (note_type, language) if part)
+    return "\n".join(
+        (title or "", " ".join(tags or []), header, (content or "")[:max_chars])
+    )
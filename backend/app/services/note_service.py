@@ -1,10 +1,24 @@
+import base64
+import binascii
+import json
 import uuid
+from datetime import datetime, timezone
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.config import get_settings
 from app.repositories import note_repo
 from app.models.note import Note
+from app.pagination import item_id, paginate
+from app.search_query import parse_query
+from app.services import response_cache
+from app.services.embedding_indexer import embedding_indexer
+from app.services.embeddings import get_embedder
+from app.services.related_notes import related_notes_refresher
+from app.services.response_cache import CachedResponse, public_note_etag
+from app.services.search_cache import normalize_query, search_result_cache
+from app.services.view_counter import view_counter
 
 
 MAX_UUID_RETRIES = 3  # For the astronomically unlikely UUID collision
@@ -65,6 +79,9 @@ def create_note(
         language=language.strip().lower() if language else None,
         source_url=source_url.strip() if source_url else None,
     )
+    # Embedded off the request path; see services/embedding_indexer.py.
+    embedding_indexer.schedule([new_note.id])
+    search_result_cache.bump(user_id)
     return new_note
 
 def update_note(
@@ -133,6 +150,24 @@ def update_note(
                 )
 
 
+            # Publishing, retagging or retyping moves this note in other
+            # notes' related lists (and changes its own) — see related_notes.py.
+            related_changed = (
+                (is_published is not None and is_published != new_note.is_published)
+                or (
+                    normalized_tags is not None
+                    and normalized_tags != list(new_note.tags or [])
+                )
+                or (note_type is not None and note_type != new_note.note_type)
+            )
+
+            # The embedding covers title, tags, type, language and body.
+            embedding_changed = (
+                content_changed
+                or (note_type is not None and note_type != new_note.note_type)
+                or (language is not None and (language.strip().lower() or None) != new_note.language)
+            )
+
             # Generate share_uuid if publishing for the first time
             share_uuid = None
             if is_published is True and not new_note.share_uuid:
@@ -141,7 +176,7 @@ def update_note(
             # Retry loop for the extremely rare UUID collision
             for attempt in range(MAX_UUID_RETRIES):
                 try:
-                    return note_repo.update(
+                    updated = note_repo.update(
                         db,
                         note_id=note_id,
                         title=title,
@@ -154,6 +189,14 @@ def update_note(
                         is_community=is_community,
                         share_uuid=share_uuid,
                     )
+                    if related_changed:
+                        related_notes_refresher.schedule([note_id], cascade=True)
+                    if embedding_changed:
+                        embedding_indexer.schedule([note_id])
+                    response_cache.invalidate_public_note(updated.share_uuid)
+                    response_cache.invalidate_public_profile(user_id)
+                    search_result_cache.bump(user_id)
+                    return updated
                 except IntegrityError:
                     db.rollback()
                     if share_uuid and attempt < MAX_UUID_RETRIES - 1:
@@ -212,22 +255,48 @@ def delete_note(db: Session, user_id: int, note_id: int) -> None:
     note = note_repo.get_by_note_id(db, note_id=note_id)
     if note:
         if note.user_id == user_id:
+            # The FK cascade drops this note from other notes' related lists;
+            # remember whose lists those were so they get backfilled.
+            referrers = (
+                note_repo.get_related_referrers(db, note_id=note_id)
+                if note.is_published
+                else []
+            )
             note_repo.delete(db, note_id=note_id)
+            related_notes_refresher.schedule(referrers)
+            response_cache.invalidate_public_note(note.share_uuid)
+            response_cache.invalidate_public_profile(user_id)
+            search_result_cache.bump(user_id)
         else:
             raise HTTPException(status_code=403, detail="Note does not belong to the user")
     else:
         raise HTTPException(status_code=404, detail="Note not found")
     
-def _item_id(item) -> int:
-    if isinstance(item, dict):
-        return item["id"]
-    return item.id
+def _encode_rank_cursor(score: float, last_id: int) -> str:
+    payload = json.dumps([score, last_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_rank_cursor(cursor: str | None) -> tuple[float, int] | None:
+    """Opaque search cursor → (score, id). Clients must echo it back unchanged."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), int(last_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
-def _paginate(items: list, limit: int) -> dict:
-    data = items[:limit]
-    next_cursor = _item_id(data[-1]) if len(items) > limit and data else None
-    return {"data": data, "next_cursor": next_cursor}
+def _paginate_ranked(ranked: list[tuple[float, object]], limit: int) -> dict:
+    """paginate for (score, item) pairs: the cursor is the last (score, id)."""
+    page = ranked[:limit]
+    next_cursor = None
+    if len(ranked) > limit and page:
+        score, item = page[-1]
+        next_cursor = _encode_rank_cursor(score, item_id(item))
+    return {"data": [item for _, item in page], "next_cursor": next_cursor}
 
 
 def get_my_notes(
@@ -236,6 +305,7 @@ def get_my_notes(
     cursor: int | None = None,
     limit: int = 20,
     note_type: str | None = None,
+    summary: bool = False,
 ) -> dict:
     """
     Retrieves all notes for the specified user.
@@ -257,8 +327,9 @@ def get_my_notes(
         cursor=cursor,
         limit=limit + 1,
         note_type=note_type,
+        summary=summary,
     )
-    return _paginate(notes, limit)
+    return paginate(notes, limit)
 
 
 def get_note(db: Session, user_id: int, note_id: int) -> Note | None:
@@ -315,43 +386,255 @@ def search_notes(
     db: Session,
     user_id: int,
     query: str,
-    cursor: int | None = None,
+    cursor: str | None = None,
     limit: int = 20,
     note_type: str | None = None,
     tag: str | None = None,
     language: str | None = None,
+    summary: bool = False,
+    highlight: bool = False,
+    mode: str = "fulltext",
+    facets: bool = False,
 ) -> dict:
+    """Full-text search over the caller's notes.
+
+    highlight=True returns hit dicts (headline + score, no content) from
+    note_repo.search_note_hits instead of Note rows. `cursor` is the opaque
+    (rank, id) keyset token from the previous page's next_cursor.
+    mode="prefix" is the as-you-type variant used by the command palette;
+    mode="hybrid" fuses full-text and embedding similarity (RRF). `query`
+    may carry field clauses (tag:, type:, lang:, updated:; app/search_query.py).
+    facets=True adds per-type/tag/language match counts (note_repo.search_facets);
+    hybrid mode counts its full-text matches.
+
+    Note pages are cached as ranked ids (services/search_cache.py); a hit
+    only reloads the rows. Highlighted hits are not cached.
+    """
     if not query.strip():
-        return {"data": [], "next_cursor": None}
-    notes = note_repo.search_notes(
-        db,
-        user_id=user_id,
-        search_query=query,
-        cursor=cursor,
-        limit=limit + 1,
-        note_type=note_type,
-        tag=_normalize_filter(tag),
-        language=_normalize_filter(language),
-    )
-    return _paginate(notes, limit)
-
-def get_public_note(db: Session, share_uuid: str) -> Note:
+        page = {"data": [], "next_cursor": None}
+        if facets:
+            page["facets"] = note_repo.search_facets(db, user_id=user_id, search_query="")
+        return page
+    if mode == "hybrid" and highlight:
+        raise HTTPException(status_code=400, detail="highlight is not supported with mode=hybrid")
+
+    cache_key = None
+    if not highlight:
+        generation = search_result_cache.generation(user_id)
+        cache_key = (
+            normalize_query(query),
+            mode,
+            note_type,
+            _normalize_filter(tag),
+            _normalize_filter(language),
+            cursor,
+            limit,
+            facets,
+        )
+        cached = search_result_cache.get(user_id, generation, cache_key)
+        if cached is not None:
+            note_ids, next_cursor, cached_facets = cached
+            notes = note_repo.get_notes_by_ids(db, user_id=user_id, note_ids=note_ids, summary=summary)
+            page = {"data": notes, "next_cursor": next_cursor}
+            if facets:
+                page["facets"] = cached_facets
+            return page
+
+    filters = {
+        "user_id": user_id,
+        "search_query": query,
+        "after": _decode_rank_cursor(cursor),
+        "limit": limit + 1,
+        "note_type": note_type,
+        "tag": _normalize_filter(tag),
+        "language": _normalize_filter(language),
+        "prefix": mode == "prefix",
+    }
+    settings = get_settings()
+    if mode == "hybrid":
+        plan = parse_query(query)
+        embedder = get_embedder()
+        filters.pop("prefix")
+        ranked = note_repo.search_notes_hybrid(
+            db,
+            **filters,
+            # Field clauses are filters, not meaning: embed the free text only.
+            query_embedding=embedder.embed([" ".join(plan.words + plan.phrases)])[0],
+            model=embedder.name,
+            summary=summary,
+            candidates=settings.SEARCH_HYBRID_CANDIDATES,
+            rrf_k=settings.SEARCH_RRF_K,
+        )
+    elif highlight:
+        ranked = note_repo.search_note_hits(
+            db,
+            **filters,
+            max_fragments=settings.SEARCH_HEADLINE_MAX_FRAGMENTS,
+            max_words=settings.SEARCH_HEADLINE_MAX_WORDS,
+        )
+    else:
+        ranked = note_repo.search_notes(db, **filters, summary=summary)
+    page = _paginate_ranked(ranked, limit)
+    if facets:
+        page["facets"] = note_repo.search_facets(
+            db,
+            user_id=user_id,
+            search_query=query,
+            note_type=note_type,
+            tag=filters["tag"],
+            language=filters["language"],
+            prefix=mode == "prefix",
+            tag_limit=settings.SEARCH_FACET_TAGS,
+        )
+    if cache_key is not None:
+        search_result_cache.set(
+            user_id,
+            generation,
+            cache_key,
+            [note.id for note in page["data"]],
+            page["next_cursor"],
+            page.get("facets"),
+        )
+    return page
+
+# GET /notes/ask retrieves in stages, cheapest and most precise first, so
+# the first source cards reach the client before the expansions run.
+ASK_STAGES = ("lexical", "fuzzy", "related")
+ASK_RELATED_SEEDS = 3
+ASK_RELATED_LIMIT = 3
+
+
+def ask_stage(
+    db: Session,
+    stage: str,
+    user_id: int,
+    question: str,
+    sources: list[Note],
+    note_type: str | None = None,
+    limit: int = 8,
+) -> list[tuple[float | None, Note]]:
+    """New (score, note) sources for one Ask Workspace stage.
+
+    `sources` are the notes earlier stages already produced; they are never
+    repeated. lexical: full-text hits. fuzzy: prefix/trigram matches that fill
+    the remaining slots up to `limit`. related: up to ASK_RELATED_LIMIT notes
+    sharing tags with the top sources, scored by shared tag count.
+    """
+    seen = {note.id for note in sources}
+    if stage == "lexical":
+        return note_repo.search_notes(
+            db, user_id=user_id, search_query=question, limit=limit, note_type=note_type
+        )
+    if stage == "fuzzy":
+        remaining = limit - len(sources)
+        if remaining <= 0:
+            return []
+        matches = note_repo.search_notes(
+            db, user_id=user_id, search_query=question, limit=limit, note_type=note_type, prefix=True
+        )
+        return [(score, note) for score, note in matches if note.id not in seen][:remaining]
+    if stage == "related":
+        tags = {tag for note in sources[:ASK_RELATED_SEEDS] for tag in (note.tags or [])}
+        related = note_repo.get_notes_sharing_tags(
+            db,
+            user_id=user_id,
+            tags=sorted(tags),
+            exclude_ids=sorted(seen),
+            limit=ASK_RELATED_LIMIT,
+            note_type=note_type,
+        )
+        return [(float(shared), note) for shared, note in related]
+    raise ValueError(f"Unknown ask stage: {stage}")
+
+
+def ask_sources(
+    db: Session,
+    user_id: int,
+    question: str,
+    note_type: str | None = None,
+    limit: int = 8,
+):
+    """Yields (stage, score, note) for every Ask Workspace source, stage by stage."""
+    if not question.strip():
+        return
+    sources: list[Note] = []
+    for stage in ASK_STAGES:
+        for score, note in ask_stage(db, stage, user_id, question, sources, note_type, limit):
+            sources.append(note)
+            yield stage, score, note
+
+
+def _serve_public_note(entry: CachedResponse) -> dict:
+    # Buffered, not written: see services/view_counter.py. The response
+    # counts this view on top of the entry's baseline, so the number a
+    # reader sees never goes backwards while the entry is cached.
+    view_counter.record([entry.note_id])
+    body = dict(entry.body)
+    body["view_count"] = entry.body["view_count"] + next(entry.hits)
+    return body
+
+
+def get_public_note(db: Session, share_uuid: str) -> dict:
     """
     Retrieves a note by its share UUID if it is published.
+    Served from the public response cache when warm (no DB access).
     """
-    note = note_repo.get_by_share_uuid(db, share_uuid=share_uuid)
-    if not note or not note.is_published:
-        # Return 404 even if exists but not published (security)
-        raise HTTPException(status_code=404, detail="Note not found")
-    note_repo.increment_view_count(db, note.id)
-    note.view_count = (note.view_count or 0) + 1
-    return note_repo.get_public_note_response(db, note)
+    entry = response_cache.cached_public_note(share_uuid)
+    if entry is None:
+        note = note_repo.get_by_share_uuid(db, share_uuid=share_uuid)
+        if not note or not note.is_published:
+            # Return 404 even if exists but not published (security)
+            raise HTTPException(status_code=404, detail="Note not found")
+        generation = response_cache.author_generations.generation(note.user_id)
+        body = note_repo.get_public_note_response(db, note)
+        body["view_count"] += view_counter.pending_for(note.id)
+        entry = CachedResponse(
+            body=body,
+            etag=public_note_etag(body),
+            note_id=note.id,
+            user_id=note.user_id,
+            generation=generation,
+        )
+        response_cache.public_note_cache.set(share_uuid, entry)
+    return _serve_public_note(entry)
+
+
+def public_note_not_modified(share_uuid: str, if_none_match: str | None) -> str | None:
+    """
+    Cache-only conditional check for GET /notes/public/{share_uuid}.
+
+    Returns the ETag when the client's copy is current — the view is still
+    counted — or None when the full handler must run. Never queries Postgres.
+    """
+    entry = response_cache.cached_public_note(share_uuid)
+    if entry is None or not response_cache.etag_matches(if_none_match, entry.etag):
+        return None
+    view_counter.record([entry.note_id])
+    next(entry.hits)
+    return entry.etag
 
 
 def get_related_public_notes(db: Session, share_uuid: str, limit: int = 3) -> list[dict]:
     note = note_repo.get_by_share_uuid(db, share_uuid=share_uuid)
     if not note or not note.is_published:
         raise HTTPException(status_code=404, detail="Note not found")
+
+    settings = get_settings()
+    if limit > settings.NOTE_RELATED_SIZE:
+        # More than note_related stores: rank live. The stored list is not
+        # what is missing, so there is nothing to refresh.
+        return note_repo.get_related_public_notes(db, note=note, limit=limit)
+
+    related, refreshed_at = note_repo.get_materialized_related(db, note_id=note.id, limit=limit)
+    if refreshed_at is not None:
+        age = datetime.now(timezone.utc) - refreshed_at
+        if age.total_seconds() > settings.NOTE_RELATED_MAX_AGE_SECONDS:
+            related_notes_refresher.schedule([note.id])
+        return related
+
+    # Never materialized: rank live this once and let the background job
+    # fill note_related for next time.
+    related_notes_refresher.schedule([note.id])
     return note_repo.get_related_public_notes(db, note=note, limit=limit)
 
 def get_community_notes(
@@ -359,6 +642,7 @@ def get_community_notes(
     cursor: int | None = None,
     limit: int = 20,
     viewer_id: int | None = None,
+    summary: bool = False,
 ) -> dict:
     """Retrieves all community notes."""
     notes = note_repo.get_community_notes(
@@ -366,12 +650,13 @@ def get_community_notes(
         cursor=cursor,
         limit=limit + 1,
         viewer_id=viewer_id,
+        summary=summary,
     )
-    paginated = _paginate(notes, limit)
-    note_ids = [_item_id(note) for note in paginated["data"]]
-    note_repo.increment_view_counts(db, note_ids)
+    paginated = paginate(notes, limit)
+    note_ids = [item_id(note) for note in paginated["data"]]
+    view_counter.record(note_ids)
     for note in paginated["data"]:
-        note["view_count"] = (note.get("view_count") or 0) + 1
+        note["view_count"] = (note.get("view_count") or 0) + view_counter.pending_for(note["id"])
     return paginated
 
 
@@ -382,15 +667,17 @@ def toggle_like(db: Session, user_id: int, note_id: int) -> dict:
     if not note.is_published or not note.is_community:
         raise HTTPException(status_code=404, detail="Note not found")
 
+    # Both repo calls return the counter they just moved, so the response
+    # needs no extra COUNT(*) round-trip.
     existing_like = note_repo.get_like(db, note_id=note_id, user_id=user_id)
     if existing_like:
-        note_repo.delete_like(db, existing_like)
+        like_count = note_repo.delete_like(db, existing_like)
         liked = False
     else:
-        note_repo.create_like(db, note_id=note_id, user_id=user_id)
+        like_count = note_repo.create_like(db, note_id=note_id, user_id=user_id)
         liked = True
 
-    return {
-        "liked": liked,
-        "like_count": note_repo.get_like_count(db, note_id=note_id),
-    }
+    response_cache.invalidate_public_note(note.share_uuid)
+    response_cache.invalidate_public_profile(note.user_id)
+
+    return {"liked": liked, "like_count": like_count}
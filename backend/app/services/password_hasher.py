@@ -0,0 +1,123 @@
+"""
+Password hashing off the request path.
+
+bcrypt costs ~250ms of CPU per call and holds the GIL, so hashing inside a
+request thread stalls every other route on the worker. PasswordHasher runs
+security.hash_password / verify_and_update in a ProcessPoolExecutor of
+PASSWORD_HASH_WORKERS processes, and the auth routes await it.
+
+At most PASSWORD_HASH_MAX_PENDING hashes may be queued or running at once.
+Past that the request is shed with a 503 (and Retry-After) straight away
+instead of queueing behind a login burst, so auth latency stays bounded and
+the rest of the API keeps its CPU. With 0 workers hashes run on a thread
+(tests, single-core dev boxes).
+
+Workers are started with forkserver (spawn where that is unavailable), not
+fork: forking a threaded uvicorn process with open DB pools can copy held
+locks and live sockets into the child. If a worker dies (OOM, a signal), the
+executor is broken for good; it is discarded and rebuilt on the next call,
+and the request that hit it gets a 503 like an overload.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.services import security
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _retry_shortly() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-ins in progress, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Started on first use, so importing the app never forks.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return  # another request already replaced it
+            self._executor = None
+            self._restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise _retry_shortly()
+            self._pending += 1
+        try:
+            if self.workers <= 0:
+                return await asyncio.to_thread(fn, *args)
+            executor = self._pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                self._discard(executor)
+                raise _retry_shortly() from None
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """(matches, new hash or None): the rehash, when the stored hash is
+        outdated, happens in the same worker call as the check."""
+        return await self._run(security.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_settings = get_settings()
+
+password_hasher = PasswordHasher(
+    workers=_settings.PASSWORD_HASH_WORKERS,
+    max_pending=_settings.PASSWORD_HASH_MAX_PENDING,
+)
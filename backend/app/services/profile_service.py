@@ -3,12 +3,67 @@ from sqlalchemy.orm import Session
 
 from app.repositories import note_repo, user_repo
 from app.models.user import User
+from app.pagination import paginate
+from app.services import response_cache
+from app.services.response_cache import CachedResponse, public_profile_etag
 
 
 def get_public_profile(db: Session, username: str) -> dict:
+    """Public profile page. Served from the public response cache when warm."""
+    username = username.lower()
+    entry = response_cache.cached_profile(username)
+    if entry is None:
+        user = user_repo.get_by_username(db, username=username)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        generation = response_cache.profile_generations.generation(user.id)
+        body = _public_profile_body(db, user)
+        entry = CachedResponse(
+            body=body,
+            etag=public_profile_etag(body),
+            user_id=user.id,
+            generation=generation,
+        )
+        response_cache.public_profile_cache.set(username, entry)
+    return dict(entry.body)
+
+
+def public_profile_not_modified(username: str, if_none_match: str | None) -> str | None:
+    """Cache-only conditional check for GET /u/{username}; never queries Postgres."""
+    entry = response_cache.cached_profile(username.lower())
+    if entry is None or not response_cache.etag_matches(if_none_match, entry.etag):
+        return None
+    return entry.etag
+
+
+def get_public_profile_notes(
+    db: Session,
+    username: str,
+    cursor: int | None = None,
+    limit: int = 20,
+) -> dict:
+    """Further pages of a profile's note list; the first page ships with the
+    profile. Never recomputes the header totals, which are built once with
+    the cached profile entry."""
     user = user_repo.get_by_username(db, username=username.lower())
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    return _public_notes_page(db, user.id, cursor=cursor, limit=limit)
+
+
+def _public_notes_page(db: Session, user_id: int, cursor: int | None = None, limit: int = 20) -> dict:
+    notes = note_repo.get_public_note_summaries_for_user(
+        db,
+        user_id=user_id,
+        cursor=cursor,
+        limit=limit + 1,
+    )
+    return paginate(notes, limit)
+
+
+def _public_profile_body(db: Session, user: User) -> dict:
+    """Runs the totals aggregate; only on a profile cache miss."""
+    first_page = _public_notes_page(db, user.id)
     return {
         "username": user.username,
         "name": user.name,
@@ -18,7 +73,10 @@ def get_public_profile(db: Session, username: str) -> dict:
         "twitter_url": user.twitter_url,
         "avatar_url": user.avatar_url,
         "created_at": user.created_at,
-        "public_notes": note_repo.get_public_notes_for_user(db, user_id=user.id),
+        "updated_at": user.updated_at,
+        **note_repo.get_public_note_totals_for_user(db, user_id=user.id),
+        "public_notes": first_page["data"],
+        "next_cursor": first_page["next_cursor"],
     }
 
 
@@ -28,4 +86,6 @@ def update_my_profile(db: Session, user: User, **fields) -> User:
         existing = user_repo.get_by_username(db, username=username)
         if existing and existing.id != user.id:
             raise HTTPException(status_code=409, detail="Username is already taken")
-    return user_repo.update_profile(db, user, **fields)
+    updated = user_repo.update_profile(db, user, **fields)
+    response_cache.invalidate_author(updated.id)
+    return updated
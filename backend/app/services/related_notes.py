@@ -0,0 +1,83 @@
+"""
+Background refresher for the note_related materialization.
+
+Related notes only change when a note is published/unpublished, retagged,
+retyped or deleted, so they are ranked off the request path: writes call
+schedule(), and the lifespan task in main.py drains the queue with
+run_pending() on a worker thread.
+
+Refreshing note X with cascade=True also refreshes
+  - every note whose stored list contains X (X may have moved or left), and
+  - X's new top-N (the score is symmetric, so X may now belong in theirs).
+Anything this misses is caught by NOTE_RELATED_MAX_AGE_SECONDS: a read of
+a list older than that schedules a plain refresh of it.
+"""
+import threading
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories import note_repo
+
+
+class RelatedNotesRefresher:
+    def __init__(self, size: int, session_factory=SessionLocal) -> None:
+        self.size = size
+        self._session_factory = session_factory
+        # note_id → cascade flag. A cascading request wins over a plain one.
+        self._pending: dict[int, bool] = {}
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def schedule(self, note_ids: list[int], cascade: bool = False) -> None:
+        with self._lock:
+            for note_id in note_ids:
+                self._pending[note_id] = self._pending.get(note_id, False) or cascade
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def run_pending(self) -> int:
+        """Refreshes everything queued so far. Returns how many lists were rewritten."""
+        with self._run_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            db = self._session_factory()
+            try:
+                plain: set[int] = set()
+                for note_id, cascade in batch.items():
+                    if cascade:
+                        plain.update(note_repo.get_related_referrers(db, note_id))
+                    neighbours = self._refresh(db, note_id)
+                    if cascade:
+                        plain.update(neighbours)
+                plain.difference_update(batch)
+                for note_id in plain:
+                    self._refresh(db, note_id)
+                return len(batch) + len(plain)
+            except Exception:
+                db.rollback()
+                # Re-queue so the next tick retries the whole batch.
+                with self._lock:
+                    for note_id, cascade in batch.items():
+                        self._pending[note_id] = self._pending.get(note_id, False) or cascade
+                raise
+            finally:
+                db.close()
+
+    def _refresh(self, db, note_id: int) -> list[int]:
+        note = note_repo.get_by_note_id(db, note_id=note_id)
+        if note is None:
+            return []
+        if not note.is_published or not note.share_uuid:
+            note_repo.replace_related(db, note_id, [])
+            return []
+        ranked = note_repo.rank_related_note_ids(db, note, limit=self.size)
+        note_repo.replace_related(db, note_id, ranked)
+        return [related_id for related_id, _ in ranked]
+
+
+related_notes_refresher = RelatedNotesRefresher(size=get_settings().NOTE_RELATED_SIZE)
@@ -0,0 +1,151 @@
+"""
+Response cache for the unauthenticated public pages.
+
+GET /notes/public/{share_uuid} and GET /u/{username} are read far more
+often than they change (Next.js server components refetch them on every
+render). Built response bodies are cached per worker for
+PUBLIC_CACHE_TTL_SECONDS and dropped explicitly by the writes that change
+them: update_note, delete_note, toggle_like and update_my_profile.
+
+Each entry carries a weak ETag derived from the updated_at timestamps (and
+like counts) it was built from. A conditional request whose If-None-Match
+matches a cached entry gets a 304 without touching Postgres at all.
+
+Per-user invalidation uses app.cache.UserGenerations: an entry
+records its owner and the owner's generation when it was built, and is
+served only while that generation is current. Note writes bump the
+owner's profile generation; profile updates also bump the author
+generation, since every public note page embeds the author's name and
+username. Nothing maps user ids back to cache keys, so nothing can be
+evicted out from under an invalidation.
+
+All of this is per worker. Another worker keeps serving a page that was
+unpublished or deleted here until its entry expires; see
+PUBLIC_CACHE_TTL_SECONDS in config.py.
+"""
+import hashlib
+import itertools
+from dataclasses import dataclass, field
+
+from fastapi import Response
+
+from app.cache import TTLCache, UserGenerations
+from app.config import get_settings
+
+
+@dataclass
+class CachedResponse:
+    body: dict
+    etag: str
+    # Public note pages only: the note whose views each hit records, and
+    # how many hits this entry has served (added to the cached view_count
+    # so the number a reader sees keeps going up between refills).
+    note_id: int | None = None
+    hits: itertools.count = field(default_factory=lambda: itertools.count(1))
+    # Owner of the page and their generation when it was built.
+    user_id: int | None = None
+    generation: int = 0
+
+
+_settings = get_settings()
+
+# share_uuid → CachedResponse
+public_note_cache = TTLCache(
+    maxsize=_settings.PUBLIC_CACHE_SIZE,
+    ttl=_settings.PUBLIC_CACHE_TTL_SECONDS,
+)
+# username → CachedResponse
+public_profile_cache = TTLCache(
+    maxsize=_settings.PUBLIC_CACHE_SIZE,
+    ttl=_settings.PUBLIC_CACHE_TTL_SECONDS,
+)
+# Checked by profile entries; bumped by note writes and profile updates.
+profile_generations = UserGenerations()
+# Checked by public note entries; bumped by profile updates.
+author_generations = UserGenerations()
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def public_note_etag(body: dict) -> str:
+    # view_count is deliberately left out: a weak validator says "same
+    # content", and a few more views don't make the page a different page.
+    return weak_etag(
+        body["share_uuid"],
+        body.get("updated_at") or body.get("created_at"),
+        body.get("like_count", 0),
+    )
+
+
+def public_profile_etag(body: dict) -> str:
+    notes = [
+        (
+            note.get("share_uuid"),
+            note.get("updated_at") or note.get("created_at"),
+            note.get("like_count", 0),
+        )
+        for note in body.get("public_notes", [])
+    ]
+    return weak_etag(
+        body["username"],
+        body.get("updated_at") or body.get("created_at"),
+        body.get("note_count", 0),
+        body.get("like_count", 0),
+        notes,
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 §13.1.2)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> dict:
+    # no-cache = "store it, but revalidate every time": clients always ask,
+    # and the answer is a cheap 304 while the ETag still matches.
+    return {"ETag": etag, "Cache-Control": "public, no-cache"}
+
+
+def _current(entry: CachedResponse | None, generations: UserGenerations) -> CachedResponse | None:
+    if entry is None or entry.user_id is None:
+        return entry
+    return entry if entry.generation == generations.generation(entry.user_id) else None
+
+
+def cached_public_note(share_uuid: str) -> CachedResponse | None:
+    return _current(public_note_cache.get(share_uuid), author_generations)
+
+
+def cached_profile(username: str) -> CachedResponse | None:
+    return _current(public_profile_cache.get(username), profile_generations)
+
+
+def invalidate_public_note(share_uuid: str | None) -> None:
+    if share_uuid:
+        public_note_cache.invalidate(share_uuid)
+
+
+def invalidate_public_profile(user_id: int) -> None:
+    """Drops the user's cached profile, whatever username it was cached under."""
+    profile_generations.bump(user_id)
+
+
+def invalidate_author(user_id: int) -> None:
+    """Drops the user's profile and every public note page that names them."""
+    profile_generations.bump(user_id)
+    author_generations.bump(user_id)
@@ -0,0 +1,64 @@
+"""
+Per-user cache of ranked search results.
+
+The command palette and the Ask Workspace repeat the same /notes/search
+calls constantly (refocus, back-navigation, filter toggles). A cached page
+stores only the ranked note ids, the next cursor and any facet counts; a
+hit skips the tsquery and loads those rows by primary key, so the notes
+returned are always current even though the ranking is reused.
+
+Entries are keyed by the owner's generation, which create_note,
+update_note and delete_note bump: a write makes every cached page of that
+user unreachable at once, and the LRU evicts them later. Like the other
+caches this is per worker; SEARCH_CACHE_TTL_SECONDS bounds how long another
+worker can serve a ranking from before a write.
+"""
+from collections.abc import Hashable
+
+from app.cache import TTLCache, UserGenerations
+from app.config import get_settings
+
+
+class SearchResultCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._pages = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = UserGenerations()
+
+    def generation(self, user_id: int) -> int:
+        """Read before searching: a write that lands mid-search then makes
+        the page being computed unreachable instead of caching it stale."""
+        return self._generations.generation(user_id)
+
+    def bump(self, user_id: int) -> None:
+        self._generations.bump(user_id)
+
+    def get(self, user_id: int, generation: int, key: Hashable):
+        return self._pages.get((user_id, generation, key))
+
+    def set(
+        self,
+        user_id: int,
+        generation: int,
+        key: Hashable,
+        note_ids: list[int],
+        next_cursor: str | None,
+        facets: dict | None = None,
+    ) -> None:
+        self._pages.set((user_id, generation, key), (note_ids, next_cursor, facets))
+
+    def clear(self) -> None:
+        self._pages.clear()
+        self._generations.clear()
+
+
+def normalize_query(query: str) -> str:
+    # Every search mode is case-insensitive and tokenizes on whitespace.
+    return " ".join(query.lower().split())
+
+
+_settings = get_settings()
+
+search_result_cache = SearchResultCache(
+    maxsize=_settings.SEARCH_CACHE_SIZE,
+    ttl=_settings.SEARCH_CACHE_TTL_SECONDS,
+)
@@ -1,12 +1,61 @@
 import hashlib
 import hmac
+import re
 
 from passlib.context import CryptContext
 
-# CryptContext is a passlib utility that handles password hashing.
-# schemes=["bcrypt"] — use the bcrypt algorithm (industry standard, very secure)
-# deprecated="auto" — if we ever switch algorithms, old hashes still work
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import get_settings
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_password_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_time_cost: int = 3,
+    argon2_memory_cost: int = 65536,
+    argon2_parallelism: int = 4,
+) -> CryptContext:
+    """
+    CryptContext is a passlib utility that handles password hashing.
+
+    `scheme` hashes every new password; the other supported scheme stays
+    listed so its existing hashes still verify, but is deprecated, so
+    needs_update() flags them. Costs are pinned (min == max == default), so
+    a hash made with other rounds, argon2 time or memory cost is flagged
+    too. passlib never compares argon2 parallelism; verify_and_update()
+    checks that one itself.
+    """
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unsupported password hash scheme: {scheme!r}")
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        # argon2id: resistant to both GPU cracking and side channels, and it
+        # hashes the whole password (bcrypt truncates at 72 bytes).
+        argon2__type="ID",
+        argon2__rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__max_rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+# Built from settings at import, so the password hasher's worker processes
+# construct the same context as the API process.
+_settings = get_settings()
+
+pwd_context = build_password_context(
+    scheme=_settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=_settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost=_settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost=_settings.PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism=_settings.PASSWORD_ARGON2_PARALLELISM,
+)
 
 
 def hash_password(password: str) -> str:
@@ -30,6 +79,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# p= of an argon2 hash string ($argon2id$v=19$m=65536,t=3,p=4$salt$digest).
+_ARGON2_PARALLELISM = re.compile(r"\$argon2(?:id|i|d)\$(?:v=\d+\$)?m=\d+,t=\d+,p=(\d+)\$")
+
+
+def _argon2_parallelism_changed(hashed_password: str) -> bool:
+    match = _ARGON2_PARALLELISM.match(hashed_password or "")
+    return bool(match) and int(match.group(1)) != pwd_context.handler("argon2").parallelism
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Like verify_password, but also returns a fresh hash when the stored one
+    needs_update() — an old scheme or old cost parameters — so LOGIN can
+    upgrade it while the plain password is at hand. The new hash is None
+    when the stored one is current (or the password is wrong).
+    """
+    verified, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if verified and new_hash is None and _argon2_parallelism_changed(hashed_password):
+        # passlib's argon2 needs_update() skips parallelism.
+        new_hash = pwd_context.hash(plain_password)
+    return verified, new_hash
+
+
 def hash_token(token: str) -> str:
     """
     Digest for REFRESH TOKENS — not passwords.
@@ -0,0 +1,89 @@
+"""
+Batched cleanup of dead user_sessions rows.
+
+revoke() and revoke_all_for_user() only stamp revoked_at, and expired
+sessions are never touched again, so without this the table (and the
+expires_at/revoked_at indexes get_active() filters on) grows forever.
+
+run() deletes sessions that expired or were revoked more than
+`retention_days` ago, `batch_size` rows per DELETE, each batch committed on
+its own so no run holds locks on a large slice of the table. The lifespan
+task in main.py runs it every SESSION_REAPER_INTERVAL_SECONDS;
+scripts/reap_sessions.py runs it once, for cron. The retention window keeps
+recently revoked rows around for a while, for support and auditing.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories import session_repo
+
+
+class SessionReaper:
+    def __init__(self, retention_days: int, batch_size: int, session_factory=SessionLocal) -> None:
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._runs = 0
+        self._purged_total = 0
+        self._last_purged = 0
+        self._last_batches = 0
+        self._last_duration_ms: float | None = None
+        self._last_run_at: datetime | None = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def run(self) -> int:
+        """Deletes every stale session, batch by batch. Returns rows purged."""
+        with self._run_lock:
+            started = time.perf_counter()
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+            purged = 0
+            batches = 0
+            db = self._session_factory()
+            try:
+                while True:
+                    deleted = session_repo.delete_stale_batch(db, cutoff=cutoff, limit=self.batch_size)
+                    purged += deleted
+                    batches += 1
+                    # A short batch means nothing stale is left (rows another
+                    # worker has locked are its to delete).
+                    if deleted < self.batch_size:
+                        break
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+                # Committed batches count even when a later one fails.
+                with self._lock:
+                    self._runs += 1
+                    self._purged_total += purged
+                    self._last_purged = purged
+                    self._last_batches = batches
+                    self._last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                    self._last_run_at = datetime.now(timezone.utc)
+            return purged
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "retention_days": self.retention_days,
+                "batch_size": self.batch_size,
+                "runs": self._runs,
+                "purged_total": self._purged_total,
+                "last_purged": self._last_purged,
+                "last_batches": self._last_batches,
+                "last_duration_ms": self._last_duration_ms,
+                "last_run_at": self._last_run_at,
+            }
+
+
+_settings = get_settings()
+
+session_reaper = SessionReaper(
+    retention_days=_settings.SESSION_REAPER_RETENTION_DAYS,
+    batch_size=_settings.SESSION_REAPER_BATCH_SIZE,
+)
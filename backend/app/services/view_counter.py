@@ -0,0 +1,103 @@
+"""
+Write-behind view counter for public and community reads.
+
+Bumping notes.view_count inside the read request turned every public page
+hit into an UPDATE + COMMIT on the same hot row. Instead, reads only call
+record(); deltas accumulate in memory and flush() writes them all with a
+single bulk UPDATE — periodically from the lifespan task in main.py, early
+once `flush_threshold` views are pending, and one last time on shutdown.
+record() never writes itself: reaching the threshold only wakes the
+background flusher, so a public read never does I/O or sees a DB error.
+
+Trade-off: views buffered in a worker that crashes (not a clean shutdown)
+are lost. View counts are engagement signals, not ledgers, so that is an
+acceptable price for taking writes off the read path.
+"""
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories import note_repo
+
+
+class ViewCounter:
+    def __init__(self, flush_threshold: int, session_factory=SessionLocal) -> None:
+        self.flush_threshold = flush_threshold
+        self._session_factory = session_factory
+        self._pending: Counter[int] = Counter()
+        self._pending_total = 0
+        self._flushed_total = 0
+        self._last_flush_at: datetime | None = None
+        self._lock = threading.Lock()
+        # Set by record() at the threshold; wakes the lifespan flusher early.
+        self._flush_requested = threading.Event()
+        # Serializes flushes so two threads never write the same batch.
+        self._flush_lock = threading.Lock()
+
+    def record(self, note_ids: list[int]) -> None:
+        """Buffers one view for each note id."""
+        if not note_ids:
+            return
+        with self._lock:
+            self._pending.update(note_ids)
+            self._pending_total += len(note_ids)
+            should_flush = self._pending_total >= self.flush_threshold
+        if should_flush:
+            self.request_flush()
+
+    def request_flush(self) -> None:
+        """Wakes the background flusher without waiting for it."""
+        self._flush_requested.set()
+
+    def wait_for_flush(self, timeout: float) -> bool:
+        """Blocks until record() asks for an early flush or `timeout` passes.
+        Returns whether it was asked."""
+        requested = self._flush_requested.wait(timeout)
+        self._flush_requested.clear()
+        return requested
+
+    def pending_for(self, note_id: int) -> int:
+        """Views recorded for a note but not yet written to Postgres."""
+        with self._lock:
+            return self._pending.get(note_id, 0)
+
+    def flush(self) -> int:
+        """Writes all pending deltas in one statement. Returns views written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, Counter()
+                batch_total, self._pending_total = self._pending_total, 0
+
+            db = self._session_factory()
+            try:
+                note_repo.apply_view_deltas(db, dict(batch))
+            except Exception:
+                db.rollback()
+                # Put the batch back so the next flush retries it.
+                with self._lock:
+                    self._pending.update(batch)
+                    self._pending_total += batch_total
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                self._flushed_total += batch_total
+                self._last_flush_at = datetime.now(timezone.utc)
+            return batch_total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending_views": self._pending_total,
+                "pending_notes": len(self._pending),
+                "flushed_views_total": self._flushed_total,
+                "last_flush_at": self._last_flush_at,
+            }
+
+
+view_counter = ViewCounter(flush_threshold=get_settings().VIEW_FLUSH_THRESHOLD)
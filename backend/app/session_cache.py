@@ -0,0 +1,230 @@
+"""
+Short-lived cache of active user_sessions records, for /auth/refresh and
+/auth/logout.
+
+Open tabs refresh in bursts, and each refresh used to SELECT its session
+before rotating it. A cached SessionRecord (id → user_id, token hash,
+expiry) lets the refresh go straight to the rotating UPDATE. The cache is
+never the authority: session_repo.rotate/revoke_token only match a row
+that is still live and still holds the hash the cache had, so a stale entry
+— a session rotated, revoked or expired by another worker — makes the write
+match nothing, and auth_service falls back to reading the row (with the
+usual reuse detection). A stale cache can cost a round-trip, never accept a
+token the database would reject.
+
+Invalidation is still fanned out so other workers drop revoked sessions
+promptly. session_repo.revoke and revoke_all_for_user publish through the
+configured SESSION_CACHE_CHANNEL:
+
+    inprocess   this worker only (default; enough for one worker, and the
+                guarded writes cover the others)
+    postgres    NOTIFY inside the revoking transaction, so it is delivered
+                only if the revoke commits; every worker LISTENs on a
+                dedicated connection
+    pkg.mod:fn  any factory returning an object with the same methods
+
+User-wide revocations bump a per-user generation (app.cache.UserGenerations), so
+they drop all of a user's sessions without scanning the cache.
+"""
+import importlib
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.cache import TTLCache, UserGenerations
+from app.config import get_settings
+
+
+@dataclass(frozen=True)
+class SessionRecord:
+    id: str
+    user_id: int
+    refresh_token_hash: str
+    expires_at: datetime
+
+    @classmethod
+    def from_session(cls, session) -> "SessionRecord":
+        return cls(
+            id=session.id,
+            user_id=session.user_id,
+            refresh_token_hash=session.refresh_token_hash,
+            expires_at=session.expires_at,
+        )
+
+
+class InProcessChannel:
+    """Delivers invalidations to this process only, immediately."""
+
+    def __init__(self) -> None:
+        self._handler: Callable[[str], None] | None = None
+
+    def publish(self, db, message: str) -> None:
+        if self._handler is not None:
+            self._handler(message)
+
+    def start(self, handler: Callable[[str], None], on_gap: Callable[[], None]) -> None:
+        self._handler = handler
+
+    def stop(self) -> None:
+        self._handler = None
+
+
+class PostgresNotifyChannel:
+    """
+    Postgres LISTEN/NOTIFY. publish() runs pg_notify on the caller's session,
+    so the message goes out when (and only if) that transaction commits. A
+    daemon thread per worker LISTENs on its own autocommit connection,
+    outside the SQLAlchemy pool; after a dropped connection it reconnects and
+    calls on_gap(), since anything sent meanwhile was missed.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = "user_session_invalidations",
+        reconnect_seconds: float = 5.0,
+    ) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, db, message: str) -> None:
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": message},
+        )
+
+    def start(self, handler: Callable[[str], None], on_gap: Callable[[], None]) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(handler, on_gap),
+            name="session-cache-listener",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _listen(self, handler: Callable[[str], None], on_gap: Callable[[], None]) -> None:
+        import psycopg
+
+        while not self._stopping.is_set():
+            try:
+                with psycopg.connect(self.dsn, autocommit=True) as conn:
+                    conn.execute(f'LISTEN "{self.channel}"')
+                    on_gap()
+                    while not self._stopping.is_set():
+                        # The timeout lets stop() end the loop on a quiet channel.
+                        for notify in conn.notifies(timeout=1.0):
+                            handler(notify.payload)
+            except Exception as e:
+                print(f"Session cache listener disconnected: {e}")
+                on_gap()
+                self._stopping.wait(self.reconnect_seconds)
+
+
+class SessionCache:
+    def __init__(self, maxsize: int, ttl: float, channel) -> None:
+        self.channel = channel
+        self._sessions = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = UserGenerations()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations_received = 0
+
+    def get(self, session_id: str) -> SessionRecord | None:
+        entry = self._sessions.get(session_id)
+        current = entry is not None and entry[0] == self._generations.generation(entry[1].user_id)
+        with self._lock:
+            if current:
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            return None
+
+    def set(self, record: SessionRecord, generation: int | None = None) -> None:
+        """`generation`, read before the row was loaded, keeps a user-wide
+        revocation that lands mid-load from being cached over."""
+        if generation is None:
+            generation = self.generation(record.user_id)
+        self._sessions.set(record.id, (generation, record))
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.generation(user_id)
+
+    def forget(self, session_id: str) -> None:
+        """Drops a session from this worker's cache only."""
+        self._sessions.invalidate(session_id)
+
+    def invalidate(self, db, session_id: str) -> None:
+        """Drops a session from every worker's cache."""
+        self.forget(session_id)
+        self.channel.publish(db, f"session:{session_id}")
+
+    def invalidate_user(self, db, user_id: int) -> None:
+        """Drops all of a user's sessions from every worker's cache."""
+        self._generations.bump(user_id)
+        self.channel.publish(db, f"user:{user_id}")
+
+    def receive(self, message: str) -> None:
+        kind, _, key = message.partition(":")
+        with self._lock:
+            self._invalidations_received += 1
+        if kind == "session":
+            self.forget(key)
+        elif kind == "user" and key.isdigit():
+            self._generations.bump(int(key))
+
+    def start(self) -> None:
+        self.channel.start(self.receive, self.clear)
+
+    def stop(self) -> None:
+        self.channel.stop()
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self._generations.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channel": type(self.channel).__name__,
+                "size": len(self._sessions),
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations_received": self._invalidations_received,
+            }
+
+
+_CHANNELS: dict[str, Callable[..., object]] = {
+    "inprocess": lambda settings: InProcessChannel(),
+    "postgres": lambda settings: PostgresNotifyChannel(settings.DATABASE_URL),
+}
+
+
+def _build_channel(settings):
+    name = settings.SESSION_CACHE_CHANNEL
+    if ":" in name:
+        module_name, attribute = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), attribute)(settings)
+    try:
+        return _CHANNELS[name](settings)
+    except KeyError:
+        raise ValueError(f"Unknown SESSION_CACHE_CHANNEL: {name}") from None
+
+
+_settings = get_settings()
+
+session_cache = SessionCache(
+    maxsize=_settings.SESSION_CACHE_SIZE,
+    ttl=_settings.SESSION_CACHE_TTL_SECONDS,
+    channel=_build_channel(_settings),
+)
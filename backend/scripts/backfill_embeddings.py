@@ -0,0 +1,63 @@
+"""Embed notes that have no vector for the configured embedding model.
+
+Run from the backend directory after `alembic upgrade head`:
+    python scripts/backfill_embeddings.py
+
+New and edited notes are indexed by the API's background task; this script
+covers notes written before note_embeddings existed, and re-embeds everything
+after EMBEDDING_PROVIDER changes (rows are keyed by model name). It is safe to
+interrupt and re-run: each batch is committed on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import get_settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.repositories import note_repo  # noqa: E402
+from app.services.embedding_indexer import embedding_indexer  # noqa: E402
+from app.services.embeddings import get_embedder  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill note embeddings.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=get_settings().EMBEDDING_BATCH_SIZE,
+        help="Notes embedded and committed per batch.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    model = get_embedder().name
+    db = SessionLocal()
+    after_id = 0
+    total = 0
+    try:
+        while True:
+            note_ids = note_repo.get_note_ids_without_embedding(
+                db, model=model, after_id=after_id, limit=args.batch_size
+            )
+            if not note_ids:
+                break
+            total += embedding_indexer.index(db, note_ids)
+            after_id = note_ids[-1]
+            print(f"Embedded {total} notes (through id {after_id})")
+    finally:
+        db.close()
+
+    print(f"Done: {total} notes embedded with {model}.")
+
+
+if __name__ == "__main__":
+    main()
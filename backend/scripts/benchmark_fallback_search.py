@@ -0,0 +1,100 @@
+"""Time the index-less fallback search scorers on synthetic candidates.
+
+Run from the backend directory:
+    python scripts/benchmark_fallback_search.py
+    python scripts/benchmark_fallback_search.py --candidates 400 4000 --words 40 300
+
+Compares _fallback_search_score called once per note with the batch
+_fallback_search_scores. Both only run when the in-memory search index is
+disabled (SEARCH_INDEX_SIZE=0) on a non-Postgres database: a search scores
+at most max(limit * 4, 40) candidates (400 at the largest page), facets up
+to 4000. Prints the best of --repeat runs per query, in milliseconds, and
+checks that both scorers agree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.repositories.note_repo import (  # noqa: E402
+    _fallback_search_score,
+    _fallback_search_scores,
+    _search_terms,
+)
+
+
+VOCABULARY = (
+    "docker compose postgres index query python fastapi react nextjs cache "
+    "session token deploy nginx kubernetes redis vector search migration "
+    "alembic schema table column trigger function async worker queue"
+).split()
+FILLER = "the a of to and in for on with is it that this by as at".split()
+QUERIES = ("docker", "docker compose", "postgres index query")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the fallback search scorers.")
+    parser.add_argument("--candidates", type=int, nargs="*", default=[40, 400, 4000])
+    parser.add_argument("--words", type=int, nargs="*", default=[40, 300], help="Body length.")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def make_notes(count: int, words: int, rng: random.Random) -> list[SimpleNamespace]:
+    def text(length: int) -> str:
+        return " ".join(
+            rng.choice(VOCABULARY) if rng.random() < 0.3 else rng.choice(FILLER)
+            for _ in range(length)
+        )
+
+    return [
+        SimpleNamespace(
+            id=note_id,
+            title=text(6),
+            content=text(words),
+            tags=rng.sample(VOCABULARY, 3),
+            note_type=rng.choice(["note", "snippet", "guide"]),
+            language=rng.choice([None, "python", "sql"]),
+        )
+        for note_id in range(count)
+    ]
+
+
+def best_ms(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    print(f"{'candidates':>10} {'words':>6} {'query':<22} {'per note ms':>12} {'batch ms':>9} {'speedup':>8}")
+    for count in args.candidates:
+        for words in args.words:
+            notes = make_notes(count, words, rng)
+            for query in QUERIES:
+                terms = _search_terms(query)
+                per_note = [_fallback_search_score(note, terms) for note in notes]
+                if per_note != _fallback_search_scores(notes, terms):
+                    sys.exit(f"scores differ for {query!r} over {count} notes")
+                single = best_ms(lambda: [_fallback_search_score(note, terms) for note in notes], args.repeat)
+                batch = best_ms(lambda: _fallback_search_scores(notes, terms), args.repeat)
+                print(f"{count:>10} {words:>6} {query:<22} {single:>12.2f} {batch:>9.2f} {single / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Time password hashing for candidate cost settings on this host.
+
+Run from the backend directory:
+    python scripts/benchmark_password_hash.py
+    python scripts/benchmark_password_hash.py --bcrypt-rounds 11 12 13 --samples 10
+    python scripts/benchmark_password_hash.py --argon2-memory-cost 19456 65536
+
+Prints the median and slowest latency of one hash per candidate. Login pays
+one verify (the same cost) per attempt, on one of PASSWORD_HASH_WORKERS
+processes, so a worker signs in at most ~1000 / median_ms users a second.
+Pick the highest cost that keeps that within budget, then set the matching
+PASSWORD_* settings; existing hashes are upgraded as users log in. Argon2
+rows are skipped unless argon2-cffi is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from passlib.exc import MissingBackendError  # noqa: E402
+
+from app.services.security import build_password_context  # noqa: E402
+
+
+PASSWORD = "correct horse battery staple"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark password hash costs.")
+    parser.add_argument("--samples", type=int, default=5, help="Hashes timed per candidate.")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13])
+    parser.add_argument("--argon2-time-cost", type=int, nargs="*", default=[2, 3])
+    parser.add_argument(
+        "--argon2-memory-cost",
+        type=int,
+        nargs="*",
+        default=[19456, 65536],
+        help="KiB.",
+    )
+    parser.add_argument("--argon2-parallelism", type=int, nargs="*", default=[1, 4])
+    return parser.parse_args()
+
+
+def candidates(args: argparse.Namespace):
+    for rounds in args.bcrypt_rounds:
+        yield f"bcrypt rounds={rounds}", {"scheme": "bcrypt", "bcrypt_rounds": rounds}
+    for time_cost in args.argon2_time_cost:
+        for memory_cost in args.argon2_memory_cost:
+            for parallelism in args.argon2_parallelism:
+                yield (
+                    f"argon2id t={time_cost} m={memory_cost} p={parallelism}",
+                    {
+                        "scheme": "argon2",
+                        "argon2_time_cost": time_cost,
+                        "argon2_memory_cost": memory_cost,
+                        "argon2_parallelism": parallelism,
+                    },
+                )
+
+
+def time_hashes(context, samples: int) -> list[float]:
+    context.hash(PASSWORD)  # load the backend outside the timing
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"{'candidate':<36} {'median ms':>10} {'max ms':>10} {'hashes/s/worker':>16}")
+    for label, params in candidates(args):
+        try:
+            timings = time_hashes(build_password_context(**params), args.samples)
+        except MissingBackendError:
+            print(f"{label:<36} skipped (pip install argon2-cffi)")
+            continue
+        median = statistics.median(timings)
+        print(f"{label:<36} {median:>10.1f} {max(timings):>10.1f} {1000 / median:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Delete expired and revoked user_sessions rows.
+
+Run from the backend directory:
+    python scripts/reap_sessions.py
+    python scripts/reap_sessions.py --retention-days 30 --batch-size 5000
+
+The API already does this every SESSION_REAPER_INTERVAL_SECONDS; use this
+from cron when that is set to 0, or to clear a backlog once. Each batch is
+committed on its own, so it is safe to interrupt and re-run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import get_settings  # noqa: E402
+from app.services.session_reaper import SessionReaper  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Reap stale user sessions.")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=settings.SESSION_REAPER_RETENTION_DAYS,
+        help="Keep sessions expired or revoked within this many days.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.SESSION_REAPER_BATCH_SIZE,
+        help="Rows deleted and committed per batch.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    reaper = SessionReaper(retention_days=args.retention_days, batch_size=args.batch_size)
+    purged = reaper.run()
+    stats = reaper.stats()
+    print(
+        f"Done: {purged} sessions purged in {stats['last_batches']} batches "
+        f"({stats['last_duration_ms']} ms)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,34 @@ os.environ.setdefault("DB_NAME", "devnotes_test")
 os.environ.setdefault("DB_USER", "devnotes")
 os.environ.setdefault("DB_PASSWORD", "devnotes")
 os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Hash on a thread; test_password_hasher.py starts a real pool itself.
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+
+@pytest.fixture(autouse=True)
+def _clear_in_process_caches():
+    """Module-level caches outlive a test; never let one leak into the next."""
+    from app.cache import principal_cache
+    from app.search_index import fallback_search_index
+    from app.services import response_cache
+    from app.services.search_cache import search_result_cache
+    from app.session_cache import session_cache
+
+    caches = (
+        principal_cache,
+        fallback_search_index,
+        search_result_cache,
+        response_cache.public_note_cache,
+        response_cache.public_profile_cache,
+        response_cache.profile_generations,
+        response_cache.author_generations,
+        session_cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
 
 
 @pytest.fixture
@@ -34,12 +62,13 @@ def current_user():
 
 @pytest.fixture
 def auth_client(current_user):
-    from app.dependencies import get_current_user, get_db
+    from app.dependencies import get_current_principal, get_current_user, get_db
     from app.routers import auth
 
     app = FastAPI()
     app.include_router(auth.router)
     app.dependency_overrides[get_current_user] = lambda: current_user
+    app.dependency_overrides[get_current_principal] = lambda: current_user
     app.dependency_overrides[get_db] = lambda: None
 
     with TestClient(app) as client:
@@ -48,12 +77,13 @@ def auth_client(current_user):
 
 @pytest.fixture
 def notes_client(current_user):
-    from app.dependencies import get_current_user, get_db
+    from app.dependencies import get_current_principal, get_current_user, get_db
     from app.routers import notes
 
     app = FastAPI()
     app.include_router(notes.router)
     app.dependency_overrides[get_current_user] = lambda: current_user
+    app.dependency_overrides[get_current_principal] = lambda: current_user
     app.dependency_overrides[get_db] = lambda: None
 
     with TestClient(app) as client:
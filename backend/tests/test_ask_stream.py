@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+def _note(note_id: int, tags=None):
+    return SimpleNamespace(
+        id=note_id,
+        user_id=1,
+        title=f"Source {note_id}",
+        content="Body",
+        tags=tags or [],
+        note_type="note",
+        language=None,
+        source_url=None,
+        is_pinned=False,
+        share_uuid=None,
+        is_published=False,
+        is_community=False,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _patch_retrieval(monkeypatch, calls):
+    from app.services import note_service
+
+    def fake_search_notes(db, user_id, search_query, limit=20, note_type=None, prefix=False, **filters):
+        calls.append("fuzzy" if prefix else "lexical")
+        if prefix:
+            return [(0.3, _note(1)), (0.2, _note(3))]
+        return [(0.9, _note(1, tags=["docker"])), (0.5, _note(2))]
+
+    def fake_sharing_tags(db, user_id, tags, exclude_ids, limit, note_type=None):
+        calls.append(("related", tags, exclude_ids))
+        return [(1, _note(7, tags=["docker"]))]
+
+    monkeypatch.setattr(note_service.note_repo, "search_notes", fake_search_notes)
+    monkeypatch.setattr(note_service.note_repo, "get_notes_sharing_tags", fake_sharing_tags)
+
+
+def test_ask_streams_sources_stage_by_stage_without_repeats(notes_client, monkeypatch):
+    calls = []
+    _patch_retrieval(monkeypatch, calls)
+
+    response = notes_client.get("/notes/ask?q=docker", headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [(name, data.get("id"), data.get("stage")) for name, data in events] == [
+        ("source", 1, "lexical"),
+        ("source", 2, "lexical"),
+        ("source", 3, "fuzzy"),
+        ("source", 7, "related"),
+        ("done", None, None),
+    ]
+    assert events[0][1]["score"] == 0.9
+    assert events[-1][1] == {"count": 4}
+    assert calls == ["lexical", "fuzzy", ("related", ["docker"], [1, 2, 3])]
+
+
+def test_ask_with_a_blank_question_only_sends_done(notes_client):
+    response = notes_client.get("/notes/ask?q=%20", headers={"Authorization": "Bearer token"})
+
+    assert _events(response.text) == [("done", {"count": 0})]
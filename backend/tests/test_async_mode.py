@@ -0,0 +1,145 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+
+class FakeAsyncSession:
+    """Stands in for AsyncSession: run_sync hands itself to the sync callable."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def close(self):
+        self.calls.append("close")
+
+
+def test_async_router_runs_sync_service_on_async_session(current_user, monkeypatch):
+    from app.dependencies import get_async_db, get_current_principal_async
+    from app.routers import notes
+    from app.services import note_service
+
+    session = FakeAsyncSession()
+    calls = {}
+
+    def fake_get_my_notes(db, user_id, cursor=None, limit=20, note_type=None, summary=False):
+        calls.update({"db": db, "user_id": user_id, "limit": limit})
+        return {"data": [], "next_cursor": None}
+
+    monkeypatch.setattr(note_service, "get_my_notes", fake_get_my_notes)
+
+    app = FastAPI()
+    app.include_router(notes.async_router)
+    app.dependency_overrides[get_current_principal_async] = lambda: current_user
+    app.dependency_overrides[get_async_db] = lambda: session
+
+    response = TestClient(app).get("/notes/notes?limit=500")
+
+    assert response.status_code == 200
+    assert calls == {"db": session, "user_id": 1, "limit": 100}
+
+
+def test_async_router_static_paths_win_over_note_id(current_user, monkeypatch):
+    from app.dependencies import get_async_db, get_current_principal_async
+    from app.rate_limit import configure_rate_limiting
+    from app.routers import notes
+    from app.services import note_service
+
+    monkeypatch.setattr(
+        note_service,
+        "search_notes",
+        lambda db, user_id, query, **kwargs: {"data": [], "next_cursor": None},
+    )
+
+    app = FastAPI()
+    configure_rate_limiting(app)
+    app.include_router(notes.async_router)
+    app.dependency_overrides[get_current_principal_async] = lambda: current_user
+    app.dependency_overrides[get_async_db] = lambda: FakeAsyncSession()
+
+    response = TestClient(app).get("/notes/search?q=docker")
+
+    assert response.status_code == 200
+    assert response.json() == {"data": [], "next_cursor": None, "facets": None}
+
+
+def test_async_ask_runs_each_stage_on_the_async_session(current_user, monkeypatch):
+    from types import SimpleNamespace
+
+    from app.dependencies import get_async_db, get_current_principal_async
+    from app.routers import notes
+    from app.services import note_service
+
+    session = FakeAsyncSession()
+    stages = []
+
+    def fake_ask_stage(db, stage, user_id, question, sources, note_type=None, limit=8):
+        stages.append((db, stage, [note.id for note in sources]))
+        if stage != "lexical":
+            return []
+        note = SimpleNamespace(
+            id=5,
+            user_id=user_id,
+            title="Docker",
+            content="Body",
+            tags=[],
+            created_at="2026-01-01T00:00:00Z",
+        )
+        return [(0.7, note)]
+
+    monkeypatch.setattr(note_service, "ask_stage", fake_ask_stage)
+
+    app = FastAPI()
+    app.include_router(notes.async_router)
+    app.dependency_overrides[get_current_principal_async] = lambda: current_user
+    app.dependency_overrides[get_async_db] = lambda: session
+
+    response = TestClient(app).get("/notes/ask?q=docker")
+
+    assert response.status_code == 200
+    assert stages == [(session, "lexical", []), (session, "fuzzy", [5]), (session, "related", [5])]
+    assert response.text.endswith('event: done\ndata: {"count": 1}\n\n')
+
+
+def test_get_async_db_rolls_back_before_close(monkeypatch):
+    import asyncio
+
+    from app import database, dependencies
+
+    session = FakeAsyncSession()
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: session)
+
+    async def run():
+        gen = dependencies.get_async_db()
+        await gen.__anext__()
+        with pytest.raises(RuntimeError):
+            await gen.athrow(RuntimeError("boom"))
+
+    asyncio.run(run())
+
+    assert session.calls == ["rollback", "close"]
+
+
+def test_get_current_principal_async_rejects_unknown_user(monkeypatch):
+    import asyncio
+
+    from app import dependencies
+    from app.repositories import user_repo
+
+    monkeypatch.setattr(dependencies, "verify_access_token", lambda token: {"sub": "7"})
+
+    async def fake_get_by_id_async(db, user_id):
+        return None
+
+    monkeypatch.setattr(user_repo, "get_by_id_async", fake_get_by_id_async)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(dependencies.get_current_principal_async(token="token", db=None))
+
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Invalid credentials"
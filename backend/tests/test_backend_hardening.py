@@ -11,6 +11,7 @@ def _note(**overrides):
         "user_id": 2,
         "is_published": True,
         "is_community": True,
+        "share_uuid": "share-uuid",
     }
     payload.update(overrides)
     return SimpleNamespace(**payload)
@@ -56,8 +57,7 @@ def test_like_endpoint_allows_published_visible_notes(monkeypatch):
         lambda db, note_id: _note(is_published=True, is_community=True),
     )
     monkeypatch.setattr(note_service.note_repo, "get_like", lambda db, note_id, user_id: None)
-    monkeypatch.setattr(note_service.note_repo, "create_like", lambda db, note_id, user_id: None)
-    monkeypatch.setattr(note_service.note_repo, "get_like_count", lambda db, note_id: 1)
+    monkeypatch.setattr(note_service.note_repo, "create_like", lambda db, note_id, user_id: 1)
 
     assert note_service.toggle_like(db=None, user_id=1, note_id=12) == {
         "liked": True,
@@ -65,6 +65,24 @@ def test_like_endpoint_allows_published_visible_notes(monkeypatch):
     }
 
 
+def test_unlike_returns_counter_from_delete(monkeypatch):
+    from app.services import note_service
+
+    existing = SimpleNamespace(note_id=12, user_id=1)
+    monkeypatch.setattr(note_service.note_repo, "get_by_note_id", lambda db, note_id: _note())
+    monkeypatch.setattr(note_service.note_repo, "get_like", lambda db, note_id, user_id: existing)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "delete_like",
+        lambda db, like: 0 if like is existing else None,
+    )
+
+    assert note_service.toggle_like(db=None, user_id=1, note_id=12) == {
+        "liked": False,
+        "like_count": 0,
+    }
+
+
 def test_non_owner_cannot_get_unpublished_community_note(monkeypatch):
     from app.services import note_service
 
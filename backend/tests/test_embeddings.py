@@ -0,0 +1,229 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+
+def _cosine(left, right):
+    return sum(a * b for a, b in zip(left, right))
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    from app.services.embeddings import HashingEmbedder
+
+    embedder = HashingEmbedder(dimensions=64)
+    first, again, empty = embedder.embed(["Docker compose networking", "Docker compose networking", ""])
+
+    assert first == again
+    assert len(first) == 64
+    assert sum(value * value for value in first) == pytest.approx(1.0)
+    assert empty == [0.0] * 64
+
+
+def test_hashing_embedder_places_related_text_closer():
+    from app.services.embeddings import HashingEmbedder
+
+    query, related, unrelated = HashingEmbedder().embed(
+        [
+            "docker container networking",
+            "Networking between Docker containers with compose",
+            "Sourdough bread recipe with rye flour",
+        ]
+    )
+
+    assert _cosine(query, related) > _cosine(query, unrelated)
+
+
+def test_unknown_embedding_provider_is_rejected():
+    from app.services.embeddings import _resolve_factory
+
+    with pytest.raises(ValueError):
+        _resolve_factory("does-not-exist")
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    from app.repositories import note_repo
+
+    fused = note_repo._reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+
+    assert fused[1] == pytest.approx(1 / 61 + 1 / 62)
+    assert fused[3] == pytest.approx(1 / 63 + 1 / 61)
+    assert sorted(fused, key=fused.get, reverse=True) == [1, 3, 2]
+
+
+def _note(note_id: int):
+    return SimpleNamespace(
+        id=note_id,
+        user_id=1,
+        title=f"Hybrid Result {note_id}",
+        content="body",
+        tags=[],
+        is_pinned=False,
+        share_uuid=None,
+        is_published=False,
+        is_community=False,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+def test_hybrid_mode_embeds_the_query_and_calls_the_fused_search(notes_client, monkeypatch):
+    from app.services import note_service
+
+    calls = {}
+
+    class FakeEmbedder:
+        name = "fake-v1"
+
+        def embed(self, texts):
+            calls["texts"] = texts
+            return [[1.0, 0.0]]
+
+    def fake_hybrid(db, user_id, search_query, query_embedding, model, **filters):
+        calls.update({"embedding": query_embedding, "model": model, "prefix": "prefix" in filters})
+        return [(0.03, _note(5))]
+
+    monkeypatch.setattr(note_service, "get_embedder", lambda: FakeEmbedder())
+    monkeypatch.setattr(note_service.note_repo, "search_notes_hybrid", fake_hybrid)
+
+    response = notes_client.get(
+        "/notes/search?q=container%20networking&mode=hybrid",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 200
+    assert calls == {
+        "texts": ["container networking"],
+        "embedding": [1.0, 0.0],
+        "model": "fake-v1",
+        "prefix": False,
+    }
+    assert response.json()["data"][0]["id"] == 5
+
+
+def test_hybrid_mode_rejects_highlight(notes_client):
+    response = notes_client.get(
+        "/notes/search?q=docker&mode=hybrid&highlight=true",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 400
+
+
+class _FakeSession:
+    def __init__(self):
+        self.rolled_back = False
+        self.closed = False
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+def _indexer(monkeypatch, replace):
+    from app.services import embedding_indexer as module
+    from app.services.embeddings import HashingEmbedder
+
+    def fake_get_notes(db, note_ids):
+        return [
+            SimpleNamespace(
+                id=note_id, user_id=1, title="t", tags=[], note_type=None, language=None, content="c"
+            )
+            for note_id in note_ids
+        ]
+
+    monkeypatch.setattr(module.note_repo, "get_notes_for_embedding", fake_get_notes)
+    monkeypatch.setattr(module.note_repo, "replace_embeddings", replace)
+    session = _FakeSession()
+    indexer = module.EmbeddingIndexer(
+        batch_size=2,
+        session_factory=lambda: session,
+        embedder_factory=lambda: HashingEmbedder(dimensions=8),
+    )
+    return indexer, session
+
+
+def test_embedding_indexer_writes_queued_notes_in_batches(monkeypatch):
+    batches = []
+
+    def fake_replace(db, model, embeddings):
+        batches.append((model, [note_id for note_id, _, _ in embeddings]))
+
+    indexer, session = _indexer(monkeypatch, fake_replace)
+    indexer.schedule([3, 1])
+    indexer.schedule([2, 3])
+
+    assert indexer.run_pending() == 3
+    assert batches == [("hashing-v1", [1, 2]), ("hashing-v1", [3])]
+    assert indexer.pending() == 0
+    assert session.closed
+
+
+def test_embedding_indexer_requeues_after_a_failure(monkeypatch):
+    def failing_replace(db, model, embeddings):
+        raise RuntimeError("database unavailable")
+
+    indexer, session = _indexer(monkeypatch, failing_replace)
+    indexer.schedule([1, 2])
+
+    with pytest.raises(RuntimeError):
+        indexer.run_pending()
+
+    assert session.rolled_back
+    assert indexer.pending() == 2
+
+
+def test_embedding_indexer_requeues_only_failed_notes_and_drops_poison(monkeypatch):
+    written = []
+
+    def replace(db, model, embeddings):
+        ids = [note_id for note_id, _, _ in embeddings]
+        if 3 in ids:
+            raise RuntimeError("embedder rejected note 3")
+        written.extend(ids)
+
+    indexer, session = _indexer(monkeypatch, replace)
+    indexer.schedule([1, 2, 3, 4])
+
+    for _ in range(indexer.MAX_ATTEMPTS - 1):
+        with pytest.raises(RuntimeError):
+            indexer.run_pending()
+        # The committed chunk [1, 2] and the healthy note 4 are not retried.
+        assert indexer.pending() == 1
+
+    with pytest.raises(RuntimeError):
+        indexer.run_pending()
+    assert indexer.pending() == 0
+    assert written == [1, 2, 4]
+    assert indexer.run_pending() == 0
+
+
+def test_hybrid_search_widens_the_hnsw_scan():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories import note_repo
+
+    executed = []
+    db = SimpleNamespace(execute=executed.append)
+
+    note_repo._widen_vector_scan(db, 100)
+    note_repo._widen_vector_scan(db, 5000)
+
+    compiled = [statement.compile(dialect=postgresql.dialect()) for statement in executed]
+    assert "set_config" in str(compiled[0])
+    assert list(compiled[0].params.values()) == ["hnsw.ef_search", "100", True, "hnsw.iterative_scan", "relaxed_order", True]
+    assert "1000" in compiled[1].params.values()
+
+
+def test_create_note_schedules_embedding(monkeypatch):
+    from app.services import note_service
+
+    scheduled = []
+    monkeypatch.setattr(note_service.note_repo, "create", lambda db, **fields: _note(9))
+    monkeypatch.setattr(note_service.embedding_indexer, "schedule", scheduled.extend)
+
+    note_service.create_note(None, user_id=1, title="Title", content="Body", tags=[])
+
+    assert scheduled == [9]
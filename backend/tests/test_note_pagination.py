@@ -39,7 +39,7 @@ def test_my_notes_returns_paginated_envelope(notes_client, monkeypatch):
 
     calls = {}
 
-    def fake_get_my_notes(db, user_id, cursor=None, limit=20, note_type=None):
+    def fake_get_my_notes(db, user_id, cursor=None, limit=20, note_type=None, summary=False):
         calls.update({"user_id": user_id, "cursor": cursor, "limit": limit, "note_type": note_type})
         return {"data": [_note(9), _note(8)], "next_cursor": 8}
 
@@ -61,7 +61,7 @@ def test_community_notes_returns_paginated_envelope(notes_client, monkeypatch):
 
     calls = {}
 
-    def fake_get_community_notes(db, cursor=None, limit=20, viewer_id=None):
+    def fake_get_community_notes(db, cursor=None, limit=20, viewer_id=None, summary=False):
         calls.update({"cursor": cursor, "limit": limit})
         return {"data": [_community_note(7)], "next_cursor": None}
 
@@ -76,3 +76,51 @@ def test_community_notes_returns_paginated_envelope(notes_client, monkeypatch):
     assert calls == {"cursor": 8, "limit": 1}
     assert response.json()["next_cursor"] is None
     assert response.json()["data"][0]["author_name"] == "Grace Hopper"
+
+
+def test_my_notes_summary_mode_returns_excerpt_without_content(notes_client, monkeypatch):
+    from app.services import note_service
+
+    calls = {}
+
+    class DeferredNote(SimpleNamespace):
+        @property
+        def content(self):
+            raise AssertionError("summary mode must not load content")
+
+    def fake_get_my_notes(db, user_id, cursor=None, limit=20, note_type=None, summary=False):
+        calls["summary"] = summary
+        note = DeferredNote(**{k: v for k, v in vars(_note(9)).items() if k != "content"})
+        note.excerpt = "Body"
+        return {"data": [note], "next_cursor": None}
+
+    monkeypatch.setattr(note_service, "get_my_notes", fake_get_my_notes)
+
+    response = notes_client.get(
+        "/notes/notes?fields=summary",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 200
+    assert calls == {"summary": True}
+    assert response.json()["data"][0]["excerpt"] == "Body"
+    assert "content" not in response.json()["data"][0]
+
+
+def test_list_fields_rejects_unknown_projection(notes_client):
+    response = notes_client.get(
+        "/notes/community?fields=everything",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_community_summary_response_omits_content():
+    from app.repositories.note_repo import _community_response
+
+    note = SimpleNamespace(**vars(_note(7)), excerpt="Body", like_count=0, view_count=0)
+    body = _community_response(note, "Grace Hopper", summary=True)
+
+    assert body["excerpt"] == "Body"
+    assert "content" not in body
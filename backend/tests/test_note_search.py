@@ -32,6 +32,10 @@ def test_search_notes_uses_current_user_and_cursor_pagination(notes_client, monk
         note_type=None,
         tag=None,
         language=None,
+        summary=False,
+        highlight=False,
+        mode="fulltext",
+        facets=False,
     ):
         calls.update(
             {
@@ -49,7 +53,7 @@ def test_search_notes_uses_current_user_and_cursor_pagination(notes_client, monk
     monkeypatch.setattr(note_service, "search_notes", fake_search_notes)
 
     response = notes_client.get(
-        "/notes/search?q=postgres&cursor=13&limit=500",
+        "/notes/search?q=postgres&cursor=opaque-token&limit=500",
         headers={"Authorization": "Bearer token"},
     )
 
@@ -57,7 +61,7 @@ def test_search_notes_uses_current_user_and_cursor_pagination(notes_client, monk
     assert calls == {
         "user_id": 1,
         "query": "postgres",
-        "cursor": 13,
+        "cursor": "opaque-token",
         "limit": 100,
         "note_type": None,
         "tag": None,
@@ -81,6 +85,10 @@ def test_search_notes_passes_type_tag_and_language_filters(notes_client, monkeyp
         note_type=None,
         tag=None,
         language=None,
+        summary=False,
+        highlight=False,
+        mode="fulltext",
+        facets=False,
     ):
         calls.update({"note_type": note_type, "tag": tag, "language": language})
         return {"data": [], "next_cursor": None}
@@ -105,11 +113,13 @@ def test_search_service_normalizes_tag_and_language_filters(monkeypatch):
         db,
         user_id,
         search_query,
-        cursor=None,
+        after=None,
         limit=20,
         note_type=None,
         tag=None,
         language=None,
+        summary=False,
+        prefix=False,
     ):
         calls.update({"tag": tag, "language": language})
         return []
@@ -137,11 +147,13 @@ def test_search_service_treats_blank_filters_as_missing(monkeypatch):
         db,
         user_id,
         search_query,
-        cursor=None,
+        after=None,
         limit=20,
         note_type=None,
         tag=None,
         language=None,
+        summary=False,
+        prefix=False,
     ):
         calls.update({"tag": tag, "language": language})
         return []
@@ -157,3 +169,268 @@ def test_search_service_treats_blank_filters_as_missing(monkeypatch):
     )
 
     assert calls == {"tag": None, "language": None}
+
+
+def test_search_highlight_returns_headlines_and_scores(notes_client, monkeypatch):
+    from app.services import note_service
+
+    calls = {}
+
+    def fake_search_note_hits(db, max_fragments=2, max_words=24, **filters):
+        calls.update({"limit": filters["limit"], "max_fragments": max_fragments, "max_words": max_words})
+        note = vars(_note(4))
+        note.pop("content")
+        return [(0.61, {**note, "headline": "<mark>PostgreSQL</mark> search", "score": 0.61})]
+
+    monkeypatch.setattr(note_service.note_repo, "search_note_hits", fake_search_note_hits)
+
+    response = notes_client.get(
+        "/notes/search?q=postgres&highlight=true&limit=5",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 200
+    hit = response.json()["data"][0]
+    assert hit["headline"] == "<mark>PostgreSQL</mark> search"
+    assert hit["score"] == 0.61
+    assert "content" not in hit
+    assert calls == {"limit": 6, "max_fragments": 2, "max_words": 24}
+
+
+def test_search_cursor_round_trips_rank_and_id(monkeypatch):
+    from app.services import note_service
+
+    calls = []
+
+    def fake_repo_search(db, user_id, search_query, after=None, limit=20, **filters):
+        calls.append(after)
+        return [(0.5, _note(9)), (0.25, _note(30)), (0.25, _note(7))][:limit]
+
+    monkeypatch.setattr(note_service.note_repo, "search_notes", fake_repo_search)
+
+    first = note_service.search_notes(None, user_id=1, query="docker", limit=2)
+    note_service.search_notes(None, user_id=1, query="docker", cursor=first["next_cursor"], limit=2)
+
+    assert [note.id for note in first["data"]] == [9, 30]
+    assert isinstance(first["next_cursor"], str)
+    assert calls == [None, (0.25, 30)]
+
+
+def test_search_rejects_malformed_cursor(notes_client):
+    response = notes_client.get(
+        "/notes/search?q=docker&cursor=not-a-cursor",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_fallback_search_resumes_after_rank_cursor():
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class FakeQuery:
+        def __init__(self, notes):
+            self.notes = notes
+
+        def filter(self, *args):
+            return self
+
+        def order_by(self, *args):
+            return self
+
+        def limit(self, value):
+            return self
+
+        def all(self):
+            return self.notes
+
+    notes = [
+        SimpleNamespace(**{**vars(_note(note_id)), "title": title, "content": "docker"})
+        for note_id, title in ((1, "docker"), (2, "misc"), (3, "misc"), (4, "docker"))
+    ]
+    query = FakeQuery(notes)
+
+    plan = parse_query("docker")
+    first = note_repo._fallback_ranked(query, plan, 2)
+    second = note_repo._fallback_ranked(query, plan, 2, after=(first[-1][0], first[-1][1].id))
+
+    assert [note.id for _, note in first] == [4, 1]
+    assert [note.id for _, note in second] == [3, 2]
+
+
+def test_prefix_mode_is_forwarded_to_the_repository(notes_client, monkeypatch):
+    from app.services import note_service
+
+    calls = {}
+
+    def fake_repo_search(db, user_id, search_query, prefix=False, **filters):
+        calls["prefix"] = prefix
+        return [(0.4, _note(3))]
+
+    monkeypatch.setattr(note_service.note_repo, "search_notes", fake_repo_search)
+
+    response = notes_client.get(
+        "/notes/search?q=dock&mode=prefix",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 200
+    assert calls == {"prefix": True}
+    assert response.json()["data"][0]["id"] == 3
+
+
+def test_prefix_query_uses_lexeme_prefixes_and_trigram_similarity():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class CapturingQuery:
+        def filter(self, *clauses):
+            self.clauses = clauses
+            return self
+
+    query, ts_query, rank = note_repo._ranked_match(CapturingQuery(), parse_query("dock compo"), prefix=True)
+    where = str(query.clauses[0].compile(dialect=postgresql.dialect()))
+    tsquery = ts_query.compile(dialect=postgresql.dialect())
+
+    assert "<%" in where and "notes_tags_text" in where
+    assert _tsquery_args(tsquery) == [
+        ("simple", "'dock':*"),
+        ("english", "'dock':*"),
+        ("simple", "'compo':*"),
+        ("english", "'compo':*"),
+    ]
+    assert "word_similarity" in str(rank.compile(dialect=postgresql.dialect()))
+
+
+def _tsquery_args(compiled) -> list[tuple[str, str]]:
+    """(config, pattern) of every to_tsquery call, in order."""
+    values = list(compiled.params.values())
+    return list(zip(values[::2], values[1::2]))
+
+
+def test_prefix_query_matches_finished_inflected_words_by_their_english_stem():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class CapturingQuery:
+        def filter(self, *clauses):
+            self.clauses = clauses
+            return self
+
+    # search_vector stores 'compos' and 'contain' for "compose" and
+    # "containers"; to_tsquery('english', ...) stems the finished words to
+    # those lexemes before the prefix applies, so the body still matches.
+    _, ts_query, _ = note_repo._ranked_match(
+        CapturingQuery(), parse_query("compose containers"), prefix=True
+    )
+    compiled = ts_query.compile(dialect=postgresql.dialect())
+
+    assert ("english", "'compose':*") in _tsquery_args(compiled)
+    assert ("english", "'containers':*") in _tsquery_args(compiled)
+    assert " && " in str(compiled)
+
+
+def test_prefix_query_skips_trigrams_below_the_minimum_length():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class CapturingQuery:
+        def filter(self, *clauses):
+            self.clauses = clauses
+            return self
+
+    query, ts_query, rank = note_repo._ranked_match(CapturingQuery(), parse_query("do"), prefix=True)
+    where = str(query.clauses[0].compile(dialect=postgresql.dialect()))
+
+    assert "<%" not in where and "@@" in where
+    assert "'do':*" in ts_query.compile(dialect=postgresql.dialect()).params.values()
+    assert "word_similarity" not in str(rank.compile(dialect=postgresql.dialect()))
+
+
+def test_search_facets_are_returned_with_the_page(notes_client, monkeypatch):
+    from app.services import note_service
+
+    def fake_search_notes(db, user_id, search_query, limit=20, summary=False, **filters):
+        return [(0.5, _note(3))]
+
+    calls = {}
+
+    def fake_search_facets(db, user_id, search_query, **filters):
+        calls.update(filters)
+        return {
+            "note_type": [{"value": "snippet", "count": 1}],
+            "tags": [],
+            "language": [{"value": "sql", "count": 1}],
+        }
+
+    monkeypatch.setattr(note_service.note_repo, "search_notes", fake_search_notes)
+    monkeypatch.setattr(note_service.note_repo, "search_facets", fake_search_facets)
+
+    response = notes_client.get(
+        "/notes/search?q=postgres&facets=true&mode=prefix&tag=SQL",
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [note["id"] for note in body["data"]] == [3]
+    assert body["facets"]["note_type"] == [{"value": "snippet", "count": 1}]
+    assert body["facets"]["language"] == [{"value": "sql", "count": 1}]
+    assert calls["prefix"] is True and calls["tag"] == "sql"
+
+
+def test_search_rank_is_double_precision_where_selected_and_compared():
+    from sqlalchemy.dialects import postgresql
+
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class CapturingQuery:
+        def filter(self, *clauses):
+            return self
+
+    for prefix in (False, True):
+        _, _, rank = note_repo._ranked_match(CapturingQuery(), parse_query("docker"), prefix=prefix)
+        selected = str(rank.compile(dialect=postgresql.dialect()))
+        resume = str(note_repo._after_rank(rank, (0.1, 7)).compile(dialect=postgresql.dialect()))
+
+        assert selected.startswith("CAST(") and selected.endswith("AS FLOAT(53))")
+        assert resume.count(selected) == 2
+
+
+def test_search_pages_through_notes_tied_at_the_page_boundary():
+    from app.repositories import note_repo
+    from app.search_query import parse_query
+
+    class FakeQuery:
+        def filter(self, *args):
+            return self
+
+        def order_by(self, *args):
+            return self
+
+        def limit(self, value):
+            return self
+
+        def all(self):
+            return notes
+
+    # Seven identical notes: every rank ties, so only the id breaks them.
+    notes = [
+        SimpleNamespace(**{**vars(_note(note_id)), "title": "docker", "content": "misc"})
+        for note_id in range(1, 8)
+    ]
+    plan = parse_query("docker")
+    seen, after = [], None
+    while page := note_repo._fallback_ranked(FakeQuery(), plan, 3, after=after):
+        seen += [note.id for _, note in page]
+        after = (page[-1][0], page[-1][1].id)
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+
+def test_process_pool_hashes_and_verifies():
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    async def round_trip():
+        hashed = await hasher.hash("abc12345")
+        return hashed, await hasher.verify("abc12345", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        hashed, ok, wrong = asyncio.run(round_trip())
+    finally:
+        hasher.shutdown()
+
+    assert hashed.startswith("$2b$")
+    assert ok is True and wrong is False
+    assert hasher.stats()["pending"] == 0
+
+
+def test_dead_worker_returns_503_and_the_pool_is_rebuilt():
+    import os
+
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    async def crash_then_hash():
+        with pytest.raises(HTTPException) as crashed:
+            await hasher._run(os._exit, 1)
+        return crashed.value, await hasher.hash("abc12345")
+
+    try:
+        error, hashed = asyncio.run(crash_then_hash())
+        start_method = hasher._pool()._mp_context.get_start_method()
+    finally:
+        hasher.shutdown()
+
+    assert error.status_code == 503 and error.headers == {"Retry-After": "1"}
+    assert hashed.startswith("$2b$")
+    assert hasher.stats()["restarts"] == 1
+    assert start_method in ("forkserver", "spawn")
+
+
+def test_saturated_hasher_sheds_load_with_503():
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    release = threading.Event()
+
+    async def burst():
+        first = asyncio.create_task(hasher._run(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as rejected:
+                await hasher.verify("abc12345", "$2b$12$unused")
+        finally:
+            release.set()
+        await first
+        return rejected.value
+
+    error = asyncio.run(burst())
+
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+    assert hasher.stats() == {"workers": 0, "max_pending": 1, "pending": 0, "rejected": 1, "restarts": 0}
+
+
+def test_login_releases_the_db_connection_before_hashing(monkeypatch):
+    from app.repositories import session_repo, user_repo
+    from app.services import auth_service
+    from app.services.password_hasher import password_hasher
+
+    events = []
+    db = SimpleNamespace(rollback=lambda: events.append("rollback"))
+
+    async def fake_verify(password, hashed_password):
+        events.append("verify")
+        return True, None
+
+    monkeypatch.setattr(
+        user_repo,
+        "get_by_email",
+        lambda db, email: events.append("lookup") or SimpleNamespace(id=1, hashed_password="hash"),
+    )
+    monkeypatch.setattr(password_hasher, "verify_and_update", fake_verify)
+    monkeypatch.setattr(user_repo, "update_refresh_token", lambda db, user_id, refresh_token_hash: None)
+    monkeypatch.setattr(session_repo, "create", lambda db, **kwargs: events.append("session"))
+
+    asyncio.run(auth_service.authenticate_user(db, "ada@example.com", "abc12345"))
+
+    assert events == ["lookup", "rollback", "verify", "session"]
+
+
+def test_context_flags_hashes_with_other_costs_or_schemes():
+    from app.services.security import build_password_context
+
+    old = build_password_context(bcrypt_rounds=4)
+    current = build_password_context(bcrypt_rounds=5)
+    stored = old.hash("abc12345")
+
+    assert current.needs_update(stored)
+    assert not old.needs_update(stored)
+    assert build_password_context("argon2").needs_update(stored)
+    with pytest.raises(ValueError):
+        build_password_context("md5_crypt")
+
+    verified, new_hash = current.verify_and_update("abc12345", stored)
+    assert verified and new_hash.startswith("$2b$05$")
+    assert current.verify_and_update("wrong", stored) == (False, None)
+
+
+def test_verify_and_update_rehashes_argon2_with_other_parallelism(monkeypatch):
+    from app.services import security
+
+    # argon2-cffi may be missing, so verification is faked; the parallelism
+    # check only reads the hash string and the configured handler.
+    context = security.build_password_context("argon2", argon2_parallelism=2)
+    monkeypatch.setattr(
+        security,
+        "pwd_context",
+        SimpleNamespace(
+            verify_and_update=lambda plain, hashed: (True, None),
+            hash=lambda plain: "$argon2id$v=19$m=65536,t=3,p=2$c2FsdA$new",
+            handler=context.handler,
+        ),
+    )
+
+    stale = "$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$old"
+    current = "$argon2id$v=19$m=65536,t=3,p=2$c2FsdA$old"
+    assert security.verify_and_update("abc12345", stale) == (
+        True,
+        "$argon2id$v=19$m=65536,t=3,p=2$c2FsdA$new",
+    )
+    assert security.verify_and_update("abc12345", current) == (True, None)
+
+
+def test_login_stores_the_upgraded_hash_with_the_session(monkeypatch):
+    from app.repositories import session_repo, user_repo
+    from app.services import auth_service
+    from app.services.password_hasher import password_hasher
+
+    events = []
+
+    async def fake_verify_and_update(password, hashed_password):
+        return True, "$2b$12$upgraded"
+
+    monkeypatch.setattr(
+        user_repo, "get_by_email", lambda db, email: SimpleNamespace(id=1, hashed_password="$2b$10$old")
+    )
+    monkeypatch.setattr(password_hasher, "verify_and_update", fake_verify_and_update)
+    monkeypatch.setattr(
+        user_repo,
+        "update_password_hash",
+        lambda db, user_id, hashed_password: events.append(("rehash", user_id, hashed_password)),
+    )
+    monkeypatch.setattr(session_repo, "create", lambda db, **kwargs: events.append("session"))
+
+    asyncio.run(auth_service.authenticate_user(SimpleNamespace(rollback=lambda: None), "ada@example.com", "pw"))
+
+    assert events == [("rehash", 1, "$2b$12$upgraded"), "session"]
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+def _user(**overrides):
+    payload = {
+        "id": 5,
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "username": "ada",
+        "bio": None,
+        "website_url": None,
+        "github_url": None,
+        "twitter_url": None,
+        "avatar_url": None,
+        "role": "user",
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "hashed_password": "secret-hash",
+    }
+    payload.update(overrides)
+    return SimpleNamespace(**payload)
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    from app.cache import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_get_current_principal_skips_db_on_cache_hit(monkeypatch):
+    from app import dependencies
+    from app.repositories import user_repo
+
+    lookups = []
+    monkeypatch.setattr(dependencies, "verify_access_token", lambda token: {"sub": "5"})
+    monkeypatch.setattr(
+        user_repo,
+        "get_by_id",
+        lambda db, user_id: lookups.append(user_id) or _user(id=user_id),
+    )
+
+    first = dependencies.get_current_principal(token="token", db=None)
+    second = dependencies.get_current_principal(token="token", db=None)
+
+    assert lookups == [5]
+    assert first is second
+    assert first.username == "ada"
+    assert not hasattr(first, "hashed_password")
+
+
+def test_update_profile_invalidates_cached_principal(monkeypatch):
+    from app import dependencies
+    from app.cache import principal_cache
+    from app.repositories import user_repo
+
+    class FakeSession:
+        def commit(self):
+            pass
+
+        def refresh(self, obj):
+            pass
+
+    user = _user()
+    principal_cache.set(user.id, dependencies.Principal.from_user(user))
+
+    user_repo.update_profile(FakeSession(), user, name="Ada Byron")
+
+    assert principal_cache.get(user.id) is None
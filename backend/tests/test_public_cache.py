@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def _public_body(**overrides):
+    payload = {
+        "title": "Published",
+        "content": "Body",
+        "tags": [],
+        "share_uuid": "share-uuid",
+        "is_published": True,
+        "is_community": False,
+        "like_count": 2,
+        "view_count": 5,
+        "created_at": datetime(2026, 1, 4, tzinfo=timezone.utc),
+        "updated_at": datetime(2026, 1, 5, tzinfo=timezone.utc),
+    }
+    payload.update(overrides)
+    return payload
+
+
+def _patch_public_note_repo(monkeypatch, lookups):
+    from app.services import note_service
+
+    def fake_get_by_share_uuid(db, share_uuid):
+        lookups.append(share_uuid)
+        return SimpleNamespace(id=3, user_id=1, is_published=True, share_uuid=share_uuid)
+
+    monkeypatch.setattr(note_service.note_repo, "get_by_share_uuid", fake_get_by_share_uuid)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_public_note_response",
+        lambda db, note: _public_body(share_uuid=note.share_uuid),
+    )
+    monkeypatch.setattr(note_service.view_counter, "record", lambda note_ids: None)
+
+
+def test_etag_matching_uses_weak_comparison():
+    from app.services.response_cache import etag_matches, weak_etag
+
+    etag = weak_etag("a", 1)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_public_note_is_cached_and_revalidates_with_304(notes_client, monkeypatch):
+    lookups = []
+    _patch_public_note_repo(monkeypatch, lookups)
+
+    first = notes_client.get("/notes/public/share-uuid")
+    etag = first.headers["etag"]
+    second = notes_client.get("/notes/public/share-uuid")
+    revalidated = notes_client.get(
+        "/notes/public/share-uuid",
+        headers={"If-None-Match": etag},
+    )
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert second.json()["view_count"] == first.json()["view_count"] + 1
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert lookups == ["share-uuid"]
+
+
+def test_toggle_like_invalidates_public_note_cache(notes_client, monkeypatch):
+    from app.services import note_service, response_cache
+
+    lookups = []
+    _patch_public_note_repo(monkeypatch, lookups)
+    notes_client.get("/notes/public/share-uuid")
+    assert response_cache.public_note_cache.get("share-uuid") is not None
+
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_by_note_id",
+        lambda db, note_id: SimpleNamespace(
+            id=3, user_id=2, share_uuid="share-uuid", is_published=True, is_community=True
+        ),
+    )
+    monkeypatch.setattr(note_service.note_repo, "get_like", lambda db, note_id, user_id: None)
+    monkeypatch.setattr(note_service.note_repo, "create_like", lambda db, note_id, user_id: 3)
+
+    note_service.toggle_like(None, user_id=1, note_id=3)
+
+    assert response_cache.public_note_cache.get("share-uuid") is None
+
+
+def test_profile_update_invalidates_cached_public_profile(notes_client, monkeypatch):
+    from app.repositories import user_repo
+    from app.routers import profiles
+    from app.services import profile_service, response_cache
+
+    user = SimpleNamespace(
+        id=1,
+        username="ada",
+        name="Ada",
+        bio=None,
+        website_url=None,
+        github_url=None,
+        twitter_url=None,
+        avatar_url=None,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+    monkeypatch.setattr(user_repo, "get_by_username", lambda db, username: user)
+    monkeypatch.setattr(
+        profile_service.note_repo,
+        "get_public_note_summaries_for_user",
+        lambda db, user_id, cursor=None, limit=20: [],
+    )
+    monkeypatch.setattr(
+        profile_service.note_repo,
+        "get_public_note_totals_for_user",
+        lambda db, user_id: {"note_count": 0, "like_count": 0, "view_count": 0},
+    )
+    monkeypatch.setattr(user_repo, "update_profile", lambda db, user, **fields: user)
+
+    app = FastAPI()
+    app.include_router(profiles.router)
+    client = TestClient(app)
+
+    lookups = []
+    _patch_public_note_repo(monkeypatch, lookups)
+    notes_client.get("/notes/public/share-uuid")
+    etag = client.get("/u/ada").headers["etag"]
+    assert client.get("/u/ada", headers={"If-None-Match": etag}).status_code == 304
+    assert response_cache.cached_public_note("share-uuid") is not None
+
+    profile_service.update_my_profile(None, user, name="Ada Lovelace")
+
+    # The note page embeds the author's name, so it goes too.
+    assert response_cache.cached_profile("ada") is None
+    assert response_cache.cached_public_note("share-uuid") is None
+
+
+def test_note_write_invalidates_profile_cached_under_any_username(monkeypatch):
+    from app.services import response_cache
+
+    entry = response_cache.CachedResponse(body={}, etag='W/"x"', user_id=1)
+    response_cache.public_profile_cache.set("old-name", entry)
+    # Nothing maps user 1 back to "old-name"; the generation is enough.
+    response_cache.invalidate_public_profile(1)
+
+    assert response_cache.cached_profile("old-name") is None
@@ -34,11 +34,15 @@ def test_public_profile_endpoint_returns_published_notes(monkeypatch):
             "twitter_url": None,
             "avatar_url": None,
             "created_at": datetime(2026, 1, 5, tzinfo=timezone.utc),
+            "note_count": 1,
+            "like_count": 2,
+            "view_count": 5,
             "public_notes": [
                 {
                     "id": 7,
                     "title": "Published note",
-                    "content": "Public profile body",
+                    "excerpt": "Public profile body",
+                    "content_length": 19,
                     "share_uuid": "share-uuid",
                     "tags": ["math"],
                     "note_type": "guide",
@@ -50,6 +54,7 @@ def test_public_profile_endpoint_returns_published_notes(monkeypatch):
                     "updated_at": None,
                 }
             ],
+            "next_cursor": None,
         },
     )
 
@@ -64,4 +69,99 @@ def test_public_profile_endpoint_returns_published_notes(monkeypatch):
     assert response.json()["bio"] == "Mathematical notes and computing guides."
     assert response.json()["public_notes"][0]["share_uuid"] == "share-uuid"
     assert response.json()["public_notes"][0]["note_type"] == "guide"
-    assert response.json()["public_notes"][0]["content"] == "Public profile body"
+    assert response.json()["public_notes"][0]["excerpt"] == "Public profile body"
+    assert "content" not in response.json()["public_notes"][0]
+    assert response.json()["note_count"] == 1
+
+
+def test_public_profile_notes_paginate_by_keyset(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.repositories import user_repo
+    from app.routers import profiles
+    from app.services import profile_service
+
+    calls = []
+
+    def fake_summaries(db, user_id, cursor=None, limit=20):
+        calls.append((user_id, cursor, limit))
+        return [
+            {
+                "id": note_id,
+                "title": f"Note {note_id}",
+                "excerpt": "Short",
+                "content_length": 5,
+                "share_uuid": f"share-{note_id}",
+                "tags": [],
+                "created_at": datetime(2026, 1, 6, tzinfo=timezone.utc),
+            }
+            for note_id in (9, 8, 7)
+        ][:limit]
+
+    monkeypatch.setattr(user_repo, "get_by_username", lambda db, username: SimpleNamespace(id=4))
+    monkeypatch.setattr(
+        profile_service.note_repo, "get_public_note_summaries_for_user", fake_summaries
+    )
+
+    app = FastAPI()
+    app.include_router(profiles.router)
+    client = TestClient(app)
+
+    response = client.get("/u/Ada/notes?cursor=10&limit=2")
+
+    assert response.status_code == 200
+    assert [note["id"] for note in response.json()["data"]] == [9, 8]
+    assert response.json()["next_cursor"] == 8
+    assert calls == [(4, 10, 3)]
+
+
+def test_profile_totals_are_computed_once_with_the_cached_profile(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.repositories import user_repo
+    from app.services import profile_service
+
+    user = SimpleNamespace(
+        id=4,
+        username="ada",
+        name="Ada",
+        bio=None,
+        website_url=None,
+        github_url=None,
+        twitter_url=None,
+        avatar_url=None,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+    totals_calls = []
+
+    def fake_totals(db, user_id):
+        totals_calls.append(user_id)
+        return {"note_count": 0, "like_count": 0, "view_count": 0}
+
+    monkeypatch.setattr(user_repo, "get_by_username", lambda db, username: user)
+    monkeypatch.setattr(
+        profile_service.note_repo,
+        "get_public_note_summaries_for_user",
+        lambda db, user_id, cursor=None, limit=20: [],
+    )
+    monkeypatch.setattr(profile_service.note_repo, "get_public_note_totals_for_user", fake_totals)
+
+    profile_service.get_public_profile(None, username="ada")
+    profile_service.get_public_profile(None, username="ada")
+    profile_service.get_public_profile_notes(None, username="ada", cursor=10)
+
+    assert totals_calls == [4]
+
+
+def test_public_profile_notes_returns_404_for_unknown_user(monkeypatch):
+    from app.repositories import user_repo
+    from app.routers import profiles
+
+    monkeypatch.setattr(user_repo, "get_by_username", lambda db, username: None)
+
+    app = FastAPI()
+    app.include_router(profiles.router)
+    client = TestClient(app)
+
+    assert client.get("/u/ghost/notes").status_code == 404
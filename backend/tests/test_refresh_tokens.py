@@ -1,5 +1,15 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
+import pytest
+from fastapi import HTTPException
+
+
+class _FakeSession:
+    def rollback(self):
+        pass
+
 
 def test_login_returns_refresh_token_and_stores_hash(monkeypatch):
     from app.repositories import user_repo
@@ -19,7 +29,7 @@ def test_login_returns_refresh_token_and_stores_hash(monkeypatch):
         raising=False,
     )
 
-    result = auth_service.authenticate_user(None, "ada@example.com", "abc12345")
+    result = asyncio.run(auth_service.authenticate_user(None, "ada@example.com", "abc12345"))
 
     assert set(result) == {
         "access_token",
@@ -49,8 +59,8 @@ def test_login_creates_session_when_db_available(monkeypatch):
     monkeypatch.setattr(
         user_repo,
         "update_refresh_token",
-        lambda db, user_id, refresh_token_hash: saved.update(
-            {"user_id": user_id, "refresh_token_hash": refresh_token_hash}
+        lambda db, user_id, refresh_token_hash, commit=True: saved.update(
+            {"user_id": user_id, "refresh_token_hash": refresh_token_hash, "commit": commit}
         ),
         raising=False,
     )
@@ -61,12 +71,21 @@ def test_login_creates_session_when_db_available(monkeypatch):
         raising=False,
     )
 
-    result = auth_service.authenticate_user(object(), "ada@example.com", "abc12345")
+    result = asyncio.run(auth_service.authenticate_user(_FakeSession(), "ada@example.com", "abc12345"))
 
     assert sessions["user_id"] == 1
     assert sessions["session_id"]
     assert verify_token_hash(result["refresh_token"], sessions["refresh_token_hash"])
+    # The legacy users.refresh_token column is left alone by default.
+    assert saved == {}
+
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "REFRESH_TOKEN_LEGACY_COLUMN", True)
+    result = asyncio.run(auth_service.authenticate_user(_FakeSession(), "ada@example.com", "abc12345"))
+
     assert verify_token_hash(result["refresh_token"], saved["refresh_token_hash"])
+    assert saved["commit"] is False
 
 
 def test_login_remember_me_extends_refresh_session(monkeypatch):
@@ -93,8 +112,8 @@ def test_login_remember_me_extends_refresh_session(monkeypatch):
         raising=False,
     )
 
-    result = auth_service.authenticate_user(
-        object(), "ada@example.com", "abc12345", remember_me=True
+    result = asyncio.run(
+        auth_service.authenticate_user(_FakeSession(), "ada@example.com", "abc12345", remember_me=True)
     )
 
     assert result["remember_me"] is True
@@ -123,6 +142,7 @@ def test_refresh_preserves_remember_me_duration(monkeypatch):
         id="session-1",
         user_id=1,
         refresh_token_hash=hash_token(refresh_token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
     )
     rotated = {}
 
@@ -142,7 +162,7 @@ def test_refresh_preserves_remember_me_duration(monkeypatch):
     monkeypatch.setattr(
         session_repo,
         "rotate",
-        lambda db, **kwargs: rotated.update(kwargs),
+        lambda db, **kwargs: rotated.update(kwargs) or True,
         raising=False,
     )
 
@@ -156,6 +176,10 @@ def test_refresh_preserves_remember_me_duration(monkeypatch):
     assert rotated["expires_at"] > now + timedelta(days=29)
 
 
+async def _fake_authenticate_user(db, email, password, **kwargs):
+    return _login_cookie_test_tokens(kwargs.get("remember_me", False))
+
+
 def _login_cookie_test_tokens(remember_me: bool) -> dict:
     days = 30 if remember_me else 7
     return {
@@ -183,9 +207,7 @@ def test_login_with_remember_me_sets_persistent_refresh_cookie(auth_client, monk
     monkeypatch.setattr(
         auth_service,
         "authenticate_user",
-        lambda db, email, password, **kwargs: _login_cookie_test_tokens(
-            kwargs.get("remember_me", False)
-        ),
+        _fake_authenticate_user,
         raising=False,
     )
 
@@ -205,9 +227,7 @@ def test_login_without_remember_me_sets_session_refresh_cookie(auth_client, monk
     monkeypatch.setattr(
         auth_service,
         "authenticate_user",
-        lambda db, email, password, **kwargs: _login_cookie_test_tokens(
-            kwargs.get("remember_me", False)
-        ),
+        _fake_authenticate_user,
         raising=False,
     )
 
@@ -232,6 +252,7 @@ def test_refresh_rotates_session_token(monkeypatch):
         id="session-1",
         user_id=1,
         refresh_token_hash=hash_token(refresh_token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
     )
     rotated = {}
 
@@ -251,14 +272,15 @@ def test_refresh_rotates_session_token(monkeypatch):
     monkeypatch.setattr(
         session_repo,
         "rotate",
-        lambda db, **kwargs: rotated.update(kwargs),
+        lambda db, **kwargs: rotated.update(kwargs) or True,
         raising=False,
     )
 
     result = auth_service.refresh_access_token(object(), refresh_token)
 
     assert result["refresh_token"] != refresh_token
-    assert rotated["session"] is session
+    assert rotated["session_id"] == "session-1"
+    assert rotated["current_hash"] == session.refresh_token_hash
     assert verify_token_hash(result["refresh_token"], rotated["refresh_token_hash"])
 
 
@@ -278,6 +300,7 @@ def test_refresh_rejects_stale_token_after_rotation(monkeypatch):
         id="session-1",
         user_id=1,
         refresh_token_hash=hash_token(current_token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
     )
     revoked = {}
 
@@ -299,7 +322,7 @@ def test_refresh_rejects_stale_token_after_rotation(monkeypatch):
         auth_service.refresh_access_token(object(), stale_token)
 
     assert excinfo.value.status_code == 401
-    assert revoked["session"] is session
+    assert revoked["session_id"] == "session-1"
 
 
 def test_refresh_endpoint_returns_rotated_tokens(auth_client, monkeypatch):
@@ -420,3 +443,69 @@ def test_logout_endpoint_succeeds_without_refresh_token(auth_client, monkeypatch
     response = auth_client.post("/auth/logout")
 
     assert response.status_code == 204
+
+
+@pytest.fixture
+def session_db():
+    """SQLite session over just the users/user_sessions tables, recording
+    every statement sent to the database."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.user import User
+    from app.models.user_session import UserSession
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    UserSession.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Ada", email="ada@example.com", hashed_password="x", username="ada"))
+    db.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement.split()[0]),
+    )
+    db.statements = statements
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_login_and_refresh_are_one_transaction_of_few_statements(session_db):
+    from app.services import auth_service
+
+    login = auth_service._start_session(session_db, 1, "pytest", "127.0.0.1", False)
+    assert session_db.statements == ["INSERT"]
+
+    session_db.statements.clear()
+    rotated = auth_service.refresh_access_token(session_db, login["refresh_token"])
+    # Login cached the session, so rotation is a single guarded UPDATE.
+    assert session_db.statements == ["UPDATE"]
+
+    session_db.statements.clear()
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(session_db, login["refresh_token"])
+    # Reuse of the rotated-out token still revokes the session.
+    assert session_db.statements == ["SELECT", "UPDATE"]
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(session_db, rotated["refresh_token"])
+
+
+def test_refresh_moves_a_pre_session_token_onto_a_session(session_db):
+    from app.models.user import User
+    from app.services import auth_service
+    from app.services.security import hash_token
+
+    legacy_token = auth_service.create_refresh_token({"sub": "1"})
+    session_db.get(User, 1).refresh_token = hash_token(legacy_token)
+    session_db.commit()
+
+    rotated = auth_service.refresh_access_token(session_db, legacy_token)
+
+    assert session_db.get(User, 1).refresh_token is None
+    auth_service.refresh_access_token(session_db, rotated["refresh_token"])
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(session_db, legacy_token)
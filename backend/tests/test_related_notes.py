@@ -0,0 +1,249 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+
+class RecordingSession:
+    """Looks like a Postgres-bound Session; records every statement executed."""
+
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+    def query(self, *entities):
+        raise AssertionError("Postgres path must not fall back to ORM queries")
+
+
+def _row(**overrides):
+    payload = {
+        "id": 3,
+        "title": "Compose networking",
+        "content": "Body",
+        "tags": ["docker"],
+        "note_type": "guide",
+        "language": None,
+        "source_url": None,
+        "share_uuid": "related-uuid",
+        "is_published": True,
+        "is_community": True,
+        "like_count": 4,
+        "view_count": 9,
+        "created_at": None,
+        "updated_at": None,
+        "score": 10,
+    }
+    payload.update(overrides)
+    return SimpleNamespace(**payload)
+
+
+def test_related_notes_rank_in_a_single_statement():
+    from app.repositories import note_repo
+
+    source = SimpleNamespace(id=1, user_id=7, tags=["docker", "devops"], note_type="guide")
+    db = RecordingSession([_row()])
+
+    related = note_repo.get_related_public_notes(db, note=source, limit=3)
+
+    assert len(db.statements) == 1
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "&&" in sql
+    assert "note_likes" not in sql
+    assert "search_vector" not in sql
+    assert related == [
+        {
+            "title": "Compose networking",
+            "content": "Body",
+            "tags": ["docker"],
+            "note_type": "guide",
+            "language": None,
+            "source_url": None,
+            "share_uuid": "related-uuid",
+            "is_published": True,
+            "is_community": True,
+            "like_count": 4,
+            "view_count": 9,
+            "created_at": None,
+            "updated_at": None,
+        }
+    ]
+
+
+class _NoopSession:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_refresher_cascades_to_referrers_and_new_neighbours(monkeypatch):
+    from app.repositories import note_repo
+    from app.services.related_notes import RelatedNotesRefresher
+
+    notes = {
+        1: SimpleNamespace(id=1, is_published=True, share_uuid="a"),
+        2: SimpleNamespace(id=2, is_published=True, share_uuid="b"),
+        3: SimpleNamespace(id=3, is_published=True, share_uuid="c"),
+        4: SimpleNamespace(id=4, is_published=True, share_uuid="d"),
+    }
+    written = {}
+    monkeypatch.setattr(note_repo, "get_by_note_id", lambda db, note_id: notes.get(note_id))
+    monkeypatch.setattr(note_repo, "get_related_referrers", lambda db, note_id: [4])
+    monkeypatch.setattr(
+        note_repo,
+        "rank_related_note_ids",
+        lambda db, note, limit: [(other, 8) for other in (1, 2, 3) if other != note.id][:limit],
+    )
+    monkeypatch.setattr(
+        note_repo,
+        "replace_related",
+        lambda db, note_id, ranked: written.update({note_id: ranked}),
+    )
+    refresher = RelatedNotesRefresher(size=2, session_factory=_NoopSession)
+
+    refresher.schedule([1], cascade=True)
+
+    assert refresher.run_pending() == 4
+    assert sorted(written) == [1, 2, 3, 4]
+    assert written[1] == [(2, 8), (3, 8)]
+    assert refresher.pending() == 0
+
+
+def test_refresher_clears_list_of_unpublished_note(monkeypatch):
+    from app.repositories import note_repo
+    from app.services.related_notes import RelatedNotesRefresher
+
+    written = {}
+    monkeypatch.setattr(
+        note_repo,
+        "get_by_note_id",
+        lambda db, note_id: SimpleNamespace(id=note_id, is_published=False, share_uuid="a"),
+    )
+    monkeypatch.setattr(
+        note_repo,
+        "replace_related",
+        lambda db, note_id, ranked: written.update({note_id: ranked}),
+    )
+    refresher = RelatedNotesRefresher(size=3, session_factory=_NoopSession)
+    refresher.schedule([5])
+
+    refresher.run_pending()
+
+    assert written == {5: []}
+
+
+def test_related_endpoint_reads_materialized_list(monkeypatch):
+    from datetime import datetime, timezone
+
+    from app.services import note_service
+    from app.services.related_notes import RelatedNotesRefresher
+
+    refresher = RelatedNotesRefresher(size=10, session_factory=_NoopSession)
+    monkeypatch.setattr(note_service, "related_notes_refresher", refresher)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_by_share_uuid",
+        lambda db, share_uuid: SimpleNamespace(id=1, is_published=True),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_materialized_related",
+        lambda db, note_id, limit: ([{"share_uuid": "b"}], datetime.now(timezone.utc)),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_related_public_notes",
+        lambda db, note, limit: (_ for _ in ()).throw(AssertionError("ranked live")),
+    )
+
+    assert note_service.get_related_public_notes(None, share_uuid="a") == [{"share_uuid": "b"}]
+    assert refresher.pending() == 0
+
+
+def test_related_endpoint_ranks_live_and_schedules_when_missing(monkeypatch):
+    from app.services import note_service
+    from app.services.related_notes import RelatedNotesRefresher
+
+    refresher = RelatedNotesRefresher(size=10, session_factory=_NoopSession)
+    monkeypatch.setattr(note_service, "related_notes_refresher", refresher)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_by_share_uuid",
+        lambda db, share_uuid: SimpleNamespace(id=1, is_published=True),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_materialized_related",
+        lambda db, note_id, limit: ([], None),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_related_public_notes",
+        lambda db, note, limit: [{"share_uuid": "live"}],
+    )
+
+    assert note_service.get_related_public_notes(None, share_uuid="a") == [{"share_uuid": "live"}]
+    assert refresher.pending() == 1
+
+
+def test_related_endpoint_treats_empty_materialized_list_as_fresh(monkeypatch):
+    from datetime import datetime, timezone
+
+    from app.services import note_service
+    from app.services.related_notes import RelatedNotesRefresher
+
+    refresher = RelatedNotesRefresher(size=10, session_factory=_NoopSession)
+    monkeypatch.setattr(note_service, "related_notes_refresher", refresher)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_by_share_uuid",
+        lambda db, share_uuid: SimpleNamespace(id=1, is_published=True),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_materialized_related",
+        lambda db, note_id, limit: ([], datetime.now(timezone.utc)),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_related_public_notes",
+        lambda db, note, limit: (_ for _ in ()).throw(AssertionError("ranked live")),
+    )
+
+    assert note_service.get_related_public_notes(None, share_uuid="a") == []
+    assert refresher.pending() == 0
+
+
+def test_related_endpoint_ranks_live_without_scheduling_above_stored_size(monkeypatch):
+    from app.services import note_service
+    from app.services.related_notes import RelatedNotesRefresher
+
+    refresher = RelatedNotesRefresher(size=10, session_factory=_NoopSession)
+    monkeypatch.setattr(note_service, "related_notes_refresher", refresher)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_by_share_uuid",
+        lambda db, share_uuid: SimpleNamespace(id=1, is_published=True),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_materialized_related",
+        lambda db, note_id, limit: (_ for _ in ()).throw(AssertionError("read stored list")),
+    )
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_related_public_notes",
+        lambda db, note, limit: [{"share_uuid": "live"}],
+    )
+
+    limit = note_service.get_settings().NOTE_RELATED_SIZE + 1
+    assert note_service.get_related_public_notes(None, share_uuid="a", limit=limit) == [
+        {"share_uuid": "live"}
+    ]
+    assert refresher.pending() == 0
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+def _note(note_id: int):
+    return SimpleNamespace(
+        id=note_id,
+        user_id=1,
+        title=f"Cached Result {note_id}",
+        content="PostgreSQL search body",
+        tags=[],
+        is_pinned=False,
+        share_uuid=None,
+        is_published=False,
+        is_community=False,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+def _patch_search(monkeypatch):
+    from app.services import note_service
+
+    calls = {"search": 0, "hydrate": []}
+
+    def fake_search_notes(db, user_id, search_query, limit=20, summary=False, **filters):
+        calls["search"] += 1
+        return [(0.9, _note(4)), (0.5, _note(2))]
+
+    def fake_get_notes_by_ids(db, user_id, note_ids, summary=False):
+        calls["hydrate"].append(note_ids)
+        return [_note(note_id) for note_id in note_ids]
+
+    monkeypatch.setattr(note_service.note_repo, "search_notes", fake_search_notes)
+    monkeypatch.setattr(note_service.note_repo, "get_notes_by_ids", fake_get_notes_by_ids)
+    return calls
+
+
+def test_repeated_search_skips_ranking_and_loads_rows_by_id(monkeypatch):
+    from app.services import note_service
+
+    calls = _patch_search(monkeypatch)
+
+    first = note_service.search_notes(None, user_id=1, query="Docker  Compose", limit=1)
+    again = note_service.search_notes(None, user_id=1, query="docker compose", limit=1)
+
+    assert calls["search"] == 1
+    assert calls["hydrate"] == [[4]]
+    assert [note.id for note in again["data"]] == [note.id for note in first["data"]] == [4]
+    assert again["next_cursor"] == first["next_cursor"] is not None
+
+
+def test_cache_key_includes_filters_and_cursor(monkeypatch):
+    from app.services import note_service
+
+    calls = _patch_search(monkeypatch)
+
+    note_service.search_notes(None, user_id=1, query="docker")
+    note_service.search_notes(None, user_id=1, query="docker", tag="devops")
+    note_service.search_notes(None, user_id=1, query="docker", mode="prefix")
+    note_service.search_notes(None, user_id=2, query="docker")
+
+    assert calls["search"] == 4
+
+
+def test_note_writes_invalidate_the_owners_cached_searches(monkeypatch):
+    from app.services import note_service
+
+    calls = _patch_search(monkeypatch)
+    monkeypatch.setattr(note_service.note_repo, "create", lambda db, **fields: _note(9))
+    monkeypatch.setattr(note_service.embedding_indexer, "schedule", lambda note_ids: None)
+
+    note_service.search_notes(None, user_id=1, query="docker")
+    note_service.search_notes(None, user_id=2, query="docker")
+    note_service.create_note(None, user_id=1, title="Docker", content="Body", tags=[])
+    note_service.search_notes(None, user_id=1, query="docker")
+    note_service.search_notes(None, user_id=2, query="docker")
+
+    assert calls["search"] == 3
+
+
+def test_highlighted_searches_are_not_cached(monkeypatch):
+    from app.services import note_service
+
+    searches = []
+
+    def fake_search_note_hits(db, max_fragments=2, max_words=24, **filters):
+        searches.append(filters["search_query"])
+        return []
+
+    monkeypatch.setattr(note_service.note_repo, "search_note_hits", fake_search_note_hits)
+
+    note_service.search_notes(None, user_id=1, query="docker", highlight=True)
+    note_service.search_notes(None, user_id=1, query="docker", highlight=True)
+
+    assert searches == ["docker", "docker"]
+
+
+def test_facets_are_cached_with_their_page(monkeypatch):
+    from app.services import note_service
+
+    calls = _patch_search(monkeypatch)
+    facet_calls = []
+
+    def fake_search_facets(db, user_id, search_query, **filters):
+        facet_calls.append(search_query)
+        return {"note_type": [{"value": "note", "count": 2}], "tags": [], "language": []}
+
+    monkeypatch.setattr(note_service.note_repo, "search_facets", fake_search_facets)
+
+    plain = note_service.search_notes(None, user_id=1, query="docker")
+    first = note_service.search_notes(None, user_id=1, query="docker", facets=True)
+    again = note_service.search_notes(None, user_id=1, query="docker", facets=True)
+
+    assert "facets" not in plain
+    assert calls["search"] == 2
+    assert facet_calls == ["docker"]
+    assert again["facets"] == first["facets"] == {
+        "note_type": [{"value": "note", "count": 2}],
+        "tags": [],
+        "language": [],
+    }
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.search_query import parse_query
+
+
+def _utc(*parts):
+    return datetime(*parts, tzinfo=timezone.utc)
+
+
+def _note(**overrides):
+    base = {
+        "id": 1,
+        "title": "Compose file reference",
+        "content": "misc",
+        "tags": ["docker"],
+        "note_type": "snippet",
+        "language": "Python",
+        "created_at": _utc(2026, 1, 10),
+        "updated_at": None,
+    }
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+def test_parse_query_splits_field_clauses_from_free_text():
+    plan = parse_query('tag:docker lang:Python type:snippet "compose file" -deprecated updated:>2026-01 up')
+
+    assert plan.tags == ["docker"]
+    assert plan.language == "python"
+    assert plan.note_type == "snippet"
+    assert plan.words == ["up"]
+    assert plan.phrases == ["compose file"]
+    assert plan.excluded == ["deprecated"]
+    assert plan.updated_from == _utc(2026, 2, 1) and plan.updated_until is None
+    assert plan.websearch_text() == 'up "compose file" -"deprecated"'
+    assert plan.scoring_terms == ["up", "compose", "file"]
+
+
+def test_parse_query_lowercases_note_type_like_the_search_cache_key():
+    assert parse_query("type:Snippet").note_type == "snippet"
+    assert parse_query("docker", note_type="Guide").note_type == "guide"
+
+
+def test_search_tokens_are_defined_once():
+    from app.repositories import note_repo
+    from app.search_index import tokenize
+    from app.services.embeddings import HashingEmbedder
+
+    text = "FastAPI + C# docker-compose node.js"
+    assert note_repo._search_terms(text) == parse_query(text).terms == tokenize(text)
+    embedder = HashingEmbedder(dimensions=32)
+    assert embedder.embed([text]) == embedder.embed([" ".join(tokenize(text))])
+
+
+def test_parse_query_date_ranges_cover_the_whole_period():
+    assert (parse_query("updated:2026-02").updated_from, parse_query("updated:2026-02").updated_until) == (
+        _utc(2026, 2, 1),
+        _utc(2026, 3, 1),
+    )
+    assert parse_query("updated:<=2026-12").updated_until == _utc(2027, 1, 1)
+    assert parse_query("updated:>=2026-03-31").updated_from == _utc(2026, 3, 31)
+    assert parse_query("updated:<2026").updated_until == _utc(2026, 1, 1)
+
+
+def test_parse_query_keeps_invalid_clauses_as_text_and_merges_explicit_filters():
+    plan = parse_query("foo:bar updated:soon -type:guide", note_type="note", tag="CI", language="SQL")
+
+    assert plan.words == ["foo:bar", "updated:soon"]
+    assert plan.excluded == ["type:guide"]
+    assert (plan.note_type, plan.tags, plan.language) == ("note", ["ci"], "sql")
+    assert plan.updated_from is None and plan.updated_until is None
+    assert parse_query("   ").is_empty
+
+
+def test_planner_pushes_each_clause_to_its_index(monkeypatch):
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import Session
+
+    from app.repositories import note_repo
+
+    monkeypatch.setattr(note_repo, "_is_postgres", lambda db: True)
+    plan = parse_query('tag:docker lang:Python type:snippet "compose file" -deprecated updated:>2026-01')
+
+    base = note_repo._search_base_query(Session(), 1, plan)
+    query, _, _ = note_repo._ranked_match(base, plan)
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "notes.tags @> " in sql
+    assert "notes.note_type = " in sql
+    assert "lower(notes.language) = " in sql
+    assert "coalesce(notes.updated_at, notes.created_at) >= " in sql
+    assert "notes.search_vector @@ websearch_to_tsquery(" in sql
+    assert '"compose file" -"deprecated"' in compiled.params.values()
+    assert not any("tag:" in str(value) for value in compiled.params.values())
+
+
+def test_filter_only_queries_list_matching_notes_newest_first():
+    from app.search_index import UserSearchIndex
+
+    index = UserSearchIndex.build(
+        [
+            _note(id=1),
+            _note(id=2, tags=["k8s"]),
+            _note(id=3, updated_at=_utc(2026, 3, 2)),
+        ]
+    )
+    plan = parse_query("tag:docker updated:2026-03")
+
+    assert index.search(
+        plan.scoring_terms,
+        tags=plan.tags,
+        updated_from=plan.updated_from,
+        updated_until=plan.updated_until,
+    ) == [(0.0, 3)]
+
+
+def test_fallback_index_requires_phrases_and_drops_exclusions():
+    from app.search_index import UserSearchIndex
+
+    index = UserSearchIndex.build(
+        [
+            _note(id=1, title="Compose file reference"),
+            _note(id=2, title="File compose order", content="misc"),
+            _note(id=3, title="Compose file reference", content="deprecated syntax"),
+        ]
+    )
+    plan = parse_query('"compose file" -deprecated')
+
+    ranked = index.search(plan.scoring_terms, phrases=plan.phrase_terms, excluded=plan.excluded_terms)
+    assert [note_id for _, note_id in ranked] == [1]
@@ -1,6 +1,8 @@
+from datetime import datetime, timezone
 from types import SimpleNamespace
 
 from app.repositories import note_repo
+from app.search_query import parse_query
 
 
 def _rankable_note(**overrides):
@@ -11,6 +13,8 @@ def _rankable_note(**overrides):
         "tags": ["devops", "docker"],
         "note_type": "guide",
         "language": "yaml",
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "updated_at": None,
     }
     base.update(overrides)
     return SimpleNamespace(**base)
@@ -41,3 +45,266 @@ def test_fallback_search_score_boosts_phrase_matches():
     scattered_hit = _rankable_note(title="Docker Notes", content="compose file tips")
 
     assert note_repo._fallback_search_score(phrase_hit, terms) > note_repo._fallback_search_score(scattered_hit, terms)
+
+
+def test_fallback_headline_escapes_html_and_marks_hits():
+    headline = note_repo._fallback_headline(
+        "Use <script> tags with docker compose carefully",
+        ["docker"],
+        max_fragments=2,
+        max_words=6,
+    )
+
+    assert "<script>" not in headline
+    assert "&lt;script&gt;" in headline
+    assert "<mark>docker</mark>" in headline
+
+
+def test_fallback_headline_limits_fragments_and_words():
+    words = ["docker"] + ["filler"] * 20 + ["docker"] + ["filler"] * 20 + ["docker"]
+    headline = note_repo._fallback_headline(" ".join(words), ["docker"], max_fragments=2, max_words=5)
+    fragments = headline.split(note_repo.HEADLINE_DELIMITER)
+
+    assert len(fragments) == 2
+    assert all(len(fragment.split()) == 5 for fragment in fragments)
+
+
+def test_postgres_rank_uses_cover_density_with_field_weights():
+    from sqlalchemy import func
+    from sqlalchemy.dialects import postgresql
+
+    compiled = note_repo._search_rank(func.websearch_to_tsquery("english", "docker")).compile(
+        dialect=postgresql.dialect()
+    )
+
+    assert str(compiled).startswith("ts_rank_cd(CAST(ARRAY[")
+    # {D, C, B, A}: a title hit must outweigh the same hit in the body.
+    assert list(compiled.params.values())[:4] == [0.1, 0.2, 0.4, 1.0]
+
+
+def test_search_index_ranks_with_field_weights_and_prefixes():
+    from app.search_index import UserSearchIndex
+
+    index = UserSearchIndex.build(
+        [
+            _rankable_note(id=1, title="Docker runbook", content="misc", tags=[]),
+            _rankable_note(id=2, title="Containers", content="misc", tags=["docker"]),
+            _rankable_note(id=3, title="Misc", content="docker docker docker", tags=[]),
+            _rankable_note(id=4, title="Sourdough", content="rye flour", tags=["baking"]),
+        ]
+    )
+
+    ranked = sorted(index.search(["docker"]), reverse=True)
+    assert [note_id for _, note_id in ranked] == [1, 2, 3]
+    assert {note_id for _, note_id in index.search(["dock"])} == {1, 2, 3}
+    assert index.search(["docker"], tags=["docker"]) == [ranked[1]]
+
+
+def test_search_index_boosts_phrases_and_applies_writes():
+    from app.search_index import UserSearchIndex
+
+    index = UserSearchIndex.build(
+        [
+            _rankable_note(id=1, title="Compose Docker", content="misc", tags=[]),
+            _rankable_note(id=2, title="Docker Compose", content="misc", tags=[]),
+        ]
+    )
+    scores = dict((note_id, score) for score, note_id in index.search(["docker", "compose"]))
+    assert scores[2] > scores[1]
+
+    index.add(_rankable_note(id=1, title="Kubernetes", content="misc", tags=[]))
+    index.remove(2)
+    assert index.search(["docker"]) == []
+    assert [note_id for _, note_id in index.search(["kube"])] == [1]
+
+
+def test_fallback_search_builds_the_index_once_and_loads_only_the_page():
+    from app.search_index import fallback_search_index
+
+    notes = {
+        note_id: _rankable_note(id=note_id, title=f"Docker {note_id}", content="misc", tags=[])
+        for note_id in (1, 2, 3)
+    }
+
+    class FakeQuery:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def filter(self, *clauses):
+            return self
+
+        def all(self):
+            return self.rows
+
+    class FakeSession:
+        builds = 0
+
+        def query(self, *columns):
+            FakeSession.builds += 1
+            return FakeQuery(list(notes.values()))
+
+    class PageQuery(FakeQuery):
+        def filter(self, clause):
+            # Note.id.in_([...]) → keep only the requested ids.
+            wanted = clause.right.value
+            return FakeQuery([notes[note_id] for note_id in wanted])
+
+    db = FakeSession()
+    first = note_repo._fallback_search(db, PageQuery([]), 7, parse_query("docker"), 2)
+    second = note_repo._fallback_search(
+        db, PageQuery([]), 7, parse_query("docker"), 2, after=(first[-1][0], first[-1][1].id)
+    )
+
+    assert FakeSession.builds == 1
+    assert fallback_search_index.get(7) is not None
+    assert [note.id for _, note in first] == [3, 2]
+    assert [note.id for _, note in second] == [1]
+
+
+def test_batch_scores_match_the_per_note_scorer():
+    notes = [
+        _rankable_note(id=1),
+        _rankable_note(id=2, title="docker compose up", content="Docker COMPOSE docker docker docker docker docker"),
+        _rankable_note(id=3, title=None, content=None, tags=None, note_type="snippet", language=None),
+        _rankable_note(id=4, title="İstanbul ΟΔΟΣ", content="compose", tags=["Docker-Compose", "yaml"]),
+        _rankable_note(id=5, title="Guide", content="unrelated", tags=[], note_type="docker", language="Docker"),
+        _rankable_note(id=6, title="composed", content="x\x00docker", tags=["compose"]),
+    ]
+    for query in ("docker", "docker compose", "compose yaml guide", "c# +", "istanbul οδος"):
+        terms = note_repo._search_terms(query)
+        expected = [note_repo._fallback_search_score(note, terms) for note in notes]
+
+        assert note_repo._fallback_search_scores(notes, terms) == expected
+
+
+def test_batch_scores_match_across_chunk_boundaries():
+    words = ["docker", "compose", "Docker", "postgres", "yaml", "guide", "misc", "DOCKER-compose"]
+    notes = [
+        _rankable_note(
+            id=index,
+            title=" ".join(words[(index + offset) % len(words)] for offset in range(index % 4)),
+            content=" ".join(words[(index * 3 + offset) % len(words)] for offset in range(index % 11)),
+            tags=[words[index % len(words)].lower()] if index % 3 else [],
+            note_type=["note", "guide", "docker"][index % 3],
+            language=[None, "YAML", "docker"][index % 3],
+        )
+        for index in range(700)
+    ]
+    terms = note_repo._search_terms("docker compose yaml")
+
+    assert note_repo._fallback_search_scores(notes, terms) == [
+        note_repo._fallback_search_score(note, terms) for note in notes
+    ]
+
+
+def test_fallback_facets_count_every_match_with_filters_applied():
+    notes = [
+        _rankable_note(id=1, title="Docker compose", tags=["devops", "docker"], note_type="guide", language="YAML"),
+        _rankable_note(id=2, title="Docker build", tags=["docker"], note_type="snippet", language="bash"),
+        _rankable_note(id=3, title="Dockerfile lint", tags=["docker", "ci"], note_type="snippet", language="Bash"),
+        _rankable_note(id=4, title="Unrelated", content="misc", tags=["misc"], note_type="snippet", language="bash"),
+    ]
+
+    class FakeSession:
+        bind = None
+
+        def query(self, *columns):
+            return SimpleNamespace(filter=lambda *clauses: SimpleNamespace(all=lambda: notes))
+
+    facets = note_repo.search_facets(FakeSession(), user_id=9, search_query="dock")
+    assert facets == {
+        "note_type": [{"value": "snippet", "count": 2}, {"value": "guide", "count": 1}],
+        "tags": [
+            {"value": "docker", "count": 3},
+            {"value": "ci", "count": 1},
+            {"value": "devops", "count": 1},
+        ],
+        "language": [{"value": "bash", "count": 2}, {"value": "yaml", "count": 1}],
+    }
+
+    narrowed = note_repo.search_facets(
+        FakeSession(), user_id=9, search_query="dock", note_type="snippet", tag_limit=1
+    )
+    assert narrowed["note_type"] == [{"value": "snippet", "count": 2}]
+    assert narrowed["tags"] == [{"value": "docker", "count": 2}]
+
+
+def test_postgres_facets_group_the_match_in_one_statement(monkeypatch):
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import Session
+
+    statements = []
+
+    class CapturingSession(Session):
+        def execute(self, statement, *args, **kwargs):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return SimpleNamespace(
+                all=lambda: [("note_type", "snippet", 3), ("language", "bash", 2), ("tags", "docker", 3)]
+            )
+
+    monkeypatch.setattr(note_repo, "_is_postgres", lambda db: True)
+    facets = note_repo.search_facets(CapturingSession(), user_id=1, search_query="docker", tag="devops")
+
+    assert len(statements) == 1
+    sql = statements[0]
+    assert sql.startswith("WITH matched AS")
+    assert sql.count("websearch_to_tsquery(") == 1
+    assert sql.count("UNION ALL") == 2 and "unnest(matched.tags)" in sql
+    assert facets["note_type"] == [{"value": "snippet", "count": 3}]
+    assert facets["language"] == [{"value": "bash", "count": 2}]
+    assert facets["tags"] == [{"value": "docker", "count": 3}]
+
+
+def test_prefix_headline_highlights_with_the_query_that_matched(monkeypatch):
+    import pytest
+    from sqlalchemy.orm import Session
+    from sqlalchemy.sql import visitors
+    from sqlalchemy.sql.functions import Function
+
+    statements = []
+    matched = []
+    ranked_match = note_repo._ranked_match
+
+    def recording_ranked_match(query, plan, prefix=False):
+        result = ranked_match(query, plan, prefix)
+        matched.append(result[1])
+        return result
+
+    class Captured(Exception):
+        pass
+
+    class CapturingSession(Session):
+        def execute(self, statement, *args, **kwargs):
+            statements.append(statement)
+            raise Captured
+
+    monkeypatch.setattr(note_repo, "_is_postgres", lambda db: True)
+    monkeypatch.setattr(note_repo, "_ranked_match", recording_ranked_match)
+    with pytest.raises(Captured):
+        note_repo.search_note_hits(CapturingSession(), user_id=1, search_query="compose", prefix=True)
+
+    (headline,) = [
+        element
+        for element in visitors.iterate(statements[0])
+        if isinstance(element, Function) and element.name == "ts_headline"
+    ]
+    config, _, ts_query, _ = headline.clauses
+    assert config.value == note_repo.SEARCH_CONFIG
+    # The stemmed prefix query that matched, not a separate one.
+    assert ts_query is matched[0]
+
+
+def test_headline_options_keep_min_words_below_max_words():
+    assert "MaxWords=24, MinWords=8" in note_repo._headline_options(2, 24)
+    assert "MaxWords=3, MinWords=1" in note_repo._headline_options(2, 3)
+    assert "MaxWords=2, MinWords=1" in note_repo._headline_options(2, 2)
+
+
+def test_settings_reject_headline_max_words_below_two():
+    import pytest
+    from pydantic import ValidationError
+
+    from app.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(SEARCH_HEADLINE_MAX_WORDS=1)
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+
+def _record(session_id="s1", user_id=1, refresh_token_hash="h1"):
+    from app.session_cache import SessionRecord
+
+    return SessionRecord(session_id, user_id, refresh_token_hash, datetime.now(timezone.utc) + timedelta(days=1))
+
+
+class _Broadcast:
+    """Stands in for LISTEN/NOTIFY: every subscribed worker receives every message."""
+
+    def __init__(self):
+        self.handlers = []
+        self.published = []
+
+    def channel(self):
+        broadcast = self
+
+        class Channel:
+            def publish(self, db, message):
+                broadcast.published.append(message)
+                for handler in broadcast.handlers:
+                    handler(message)
+
+            def start(self, handler, on_gap):
+                broadcast.handlers.append(handler)
+
+            def stop(self):
+                pass
+
+        return Channel()
+
+
+def test_revocations_fan_out_to_every_worker():
+    from app.session_cache import SessionCache
+
+    broadcast = _Broadcast()
+    worker_a = SessionCache(maxsize=10, ttl=60, channel=broadcast.channel())
+    worker_b = SessionCache(maxsize=10, ttl=60, channel=broadcast.channel())
+    worker_a.start()
+    worker_b.start()
+    for worker in (worker_a, worker_b):
+        worker.set(_record("s1"))
+        worker.set(_record("s2"))
+        worker.set(_record("s3", user_id=2))
+
+    worker_a.invalidate(None, "s1")
+    assert worker_b.get("s1") is None and worker_b.get("s2") is not None
+
+    worker_a.invalidate_user(None, 1)
+    assert worker_b.get("s2") is None and worker_a.get("s2") is None
+    assert worker_b.get("s3") is not None
+    assert broadcast.published == ["session:s1", "user:1"]
+    assert worker_b.stats()["invalidations_received"] == 2
+
+
+def test_user_revocation_during_a_load_is_not_cached_over():
+    from app.session_cache import InProcessChannel, SessionCache
+
+    cache = SessionCache(maxsize=10, ttl=60, channel=InProcessChannel())
+    cache.start()
+    generation = cache.generation(1)
+    cache.invalidate_user(None, 1)
+    cache.set(_record("s1"), generation)
+
+    assert cache.get("s1") is None
+
+
+def test_postgres_channel_notifies_inside_the_callers_transaction():
+    from app.session_cache import PostgresNotifyChannel
+
+    executed = []
+    db = SimpleNamespace(execute=lambda statement, params: executed.append((str(statement), params)))
+
+    PostgresNotifyChannel("postgresql://unused").publish(db, "session:s1")
+
+    assert executed == [
+        (
+            "SELECT pg_notify(:channel, :payload)",
+            {"channel": "user_session_invalidations", "payload": "session:s1"},
+        )
+    ]
+
+
+def make_channel(settings):
+    from app.session_cache import InProcessChannel
+
+    return InProcessChannel()
+
+
+def test_channel_setting_accepts_a_factory_path():
+    from app.session_cache import InProcessChannel, _build_channel
+
+    settings = SimpleNamespace(SESSION_CACHE_CHANNEL=f"{__name__}:make_channel")
+    assert isinstance(_build_channel(settings), InProcessChannel)
+    with pytest.raises(ValueError):
+        _build_channel(SimpleNamespace(SESSION_CACHE_CHANNEL="redis"))
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.user import User
+    from app.models.user_session import UserSession
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    UserSession.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, name="Ada", email="ada@example.com", hashed_password="x", username="ada"))
+    session.commit()
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement.split()[0]),
+    )
+    session.statements = statements
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_stale_cache_never_accepts_a_rotated_out_token(db):
+    from app.models.user_session import UserSession
+    from app.services import auth_service
+    from app.session_cache import session_cache
+
+    login = auth_service._start_session(db, 1, None, None, False)
+    session_id = auth_service.verify_refresh_token(login["refresh_token"])["sid"]
+    first = session_cache.get(session_id)
+
+    # Another worker rotates the session; this worker's cache still holds
+    # the first hash. The current token is still accepted...
+    second = auth_service.refresh_access_token(db, login["refresh_token"])
+    session_cache.set(first)
+    db.statements.clear()
+    third = auth_service.refresh_access_token(db, second["refresh_token"])
+    assert db.statements == ["SELECT", "UPDATE"]
+
+    # ...and replaying the first token, which the stale cache would match,
+    # is still caught as reuse and revokes the session.
+    session_cache.set(first)
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(db, login["refresh_token"])
+    assert db.get(UserSession, session_id).revoked_at is not None
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(db, third["refresh_token"])
+
+
+def test_logout_revokes_through_the_cache(db):
+    from app.models.user_session import UserSession
+    from app.services import auth_service
+    from app.session_cache import session_cache
+
+    login = auth_service._start_session(db, 1, None, None, False)
+    session_id = auth_service.verify_refresh_token(login["refresh_token"])["sid"]
+    db.statements.clear()
+
+    auth_service.logout_refresh_token(db, login["refresh_token"])
+
+    assert db.statements == ["UPDATE"]
+    assert db.get(UserSession, session_id).revoked_at is not None
+    assert session_cache.get(session_id) is None
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def session_factory():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.user import User
+    from app.models.user_session import UserSession
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    UserSession.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, name="Ada", email="ada@example.com", hashed_password="x", username="ada"))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def _add_sessions(factory, **days_ago):
+    """One session per keyword: `expired_N` expired N days ago, `revoked_N`
+    was revoked N days ago, anything else is live."""
+    from app.models.user_session import UserSession
+
+    now = datetime.now(timezone.utc)
+    with factory() as db:
+        for name, days in days_ago.items():
+            expires_at = now + timedelta(days=7)
+            revoked_at = None
+            if name.startswith("expired"):
+                expires_at = now - timedelta(days=days)
+            elif name.startswith("revoked"):
+                revoked_at = now - timedelta(days=days)
+            db.add(
+                UserSession(
+                    id=name,
+                    user_id=1,
+                    refresh_token_hash="hash",
+                    expires_at=expires_at,
+                    revoked_at=revoked_at,
+                )
+            )
+        db.commit()
+
+
+def _session_ids(factory):
+    from app.models.user_session import UserSession
+
+    with factory() as db:
+        return sorted(session_id for (session_id,) in db.query(UserSession.id))
+
+
+def test_reaper_deletes_stale_sessions_in_bounded_batches(session_factory):
+    from app.services.session_reaper import SessionReaper
+
+    _add_sessions(
+        session_factory,
+        expired_30=30,
+        expired_10=10,
+        expired_1=1,
+        revoked_20=20,
+        revoked_2=2,
+        live=0,
+    )
+    reaper = SessionReaper(retention_days=7, batch_size=2, session_factory=session_factory)
+
+    assert reaper.run() == 3
+    assert _session_ids(session_factory) == ["expired_1", "live", "revoked_2"]
+
+    stats = reaper.stats()
+    assert (stats["runs"], stats["last_purged"], stats["purged_total"], stats["last_batches"]) == (1, 3, 3, 2)
+
+    assert reaper.run() == 0
+    assert reaper.stats()["purged_total"] == 3
+
+
+def test_delete_stale_batch_stops_at_the_limit(session_factory):
+    from app.repositories import session_repo
+
+    _add_sessions(session_factory, expired_9=9, expired_8=8, revoked_9=9)
+
+    with session_factory() as db:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        assert session_repo.delete_stale_batch(db, cutoff=cutoff, limit=2) == 2
+        assert session_repo.delete_stale_batch(db, cutoff=cutoff, limit=2) == 1
@@ -0,0 +1,98 @@
+import pytest
+
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    def rollback(self):
+        self.log.append("rollback")
+
+    def close(self):
+        self.log.append("close")
+
+
+def test_view_counter_aggregates_and_flushes_in_one_batch(monkeypatch):
+    from app.repositories import note_repo
+    from app.services.view_counter import ViewCounter
+
+    log = []
+    writes = []
+    monkeypatch.setattr(note_repo, "apply_view_deltas", lambda db, deltas: writes.append(deltas))
+    counter = ViewCounter(flush_threshold=100, session_factory=lambda: FakeSession(log))
+
+    counter.record([1])
+    counter.record([1, 2])
+    counter.record([1])
+
+    assert counter.pending_for(1) == 3
+    assert counter.stats()["pending_views"] == 4
+    assert writes == []
+
+    assert counter.flush() == 4
+    assert writes == [{1: 3, 2: 1}]
+    assert counter.pending_for(1) == 0
+    assert counter.stats()["pending_views"] == 0
+    assert counter.stats()["flushed_views_total"] == 4
+    assert log == ["close"]
+
+
+def test_view_counter_wakes_the_flusher_when_threshold_reached(monkeypatch):
+    from app.repositories import note_repo
+    from app.services.view_counter import ViewCounter
+
+    def failing_apply(db, deltas):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(note_repo, "apply_view_deltas", failing_apply)
+    counter = ViewCounter(flush_threshold=3, session_factory=lambda: FakeSession([]))
+
+    counter.record([5, 6])
+    assert counter.wait_for_flush(0) is False
+    # Reaching the threshold neither writes nor raises on the request path.
+    counter.record([5])
+
+    assert counter.wait_for_flush(0) is True
+    assert counter.wait_for_flush(0) is False
+    assert counter.pending_for(5) == 2
+
+
+def test_view_counter_requeues_batch_when_flush_fails(monkeypatch):
+    from app.repositories import note_repo
+    from app.services.view_counter import ViewCounter
+
+    log = []
+
+    def failing_apply(db, deltas):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(note_repo, "apply_view_deltas", failing_apply)
+    counter = ViewCounter(flush_threshold=100, session_factory=lambda: FakeSession(log))
+    counter.record([9, 9])
+
+    with pytest.raises(RuntimeError):
+        counter.flush()
+
+    assert counter.pending_for(9) == 2
+    assert log == ["rollback", "close"]
+
+
+def test_public_note_records_view_without_writing(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import note_service
+    from app.services.view_counter import ViewCounter
+
+    counter = ViewCounter(flush_threshold=100, session_factory=lambda: FakeSession([]))
+    monkeypatch.setattr(note_service, "view_counter", counter)
+    note = SimpleNamespace(id=4, user_id=1, is_published=True)
+    monkeypatch.setattr(note_service.note_repo, "get_by_share_uuid", lambda db, share_uuid: note)
+    monkeypatch.setattr(
+        note_service.note_repo,
+        "get_public_note_response",
+        lambda db, note: {"share_uuid": "abc", "view_count": 10, "like_count": 0},
+    )
+
+    assert note_service.get_public_note(None, share_uuid="abc")["view_count"] == 11
+    assert note_service.get_public_note(None, share_uuid="abc")["view_count"] == 12
+    assert counter.stats()["pending_views"] == 2